@@ -11,7 +11,13 @@ from routes.auth_routes import auth_bp
 from routes.superadmin import superadmin_bp
 from routes.admin import admin_bp  #  Importar desde routes.admin (usa el __init__.py)
 from routes.curso_routes import curso_bp
+from routes.catalogos_routes import catalogos_bp
 from database.db import init_db
+from utils.json_provider import init_json
+from utils.idempotencia import init_idempotencia
+from services.catalogos import init_catalogos
+from services.carga_docente import init_carga_docente
+from utils.paginacion import init_listados
 from extensions import mail
 from routes.docentes import docentes_bp  #  importa el módulo docentes
 # Determina qué configuración usar leyendo la variable FLASK_CONFIG de tu .env
@@ -26,15 +32,23 @@ app.config.from_object(config_by_name[config_name])
 # Habilita CORS para permitir peticiones desde tu frontend
 CORS(app)
 
+# Serialización JSON (orjson si está instalado; fechas/horas/Decimal nativos)
+init_json(app)
+
 # Inicializa las extensiones con la aplicación
 mail.init_app(app)
 init_db(app)
+init_idempotencia(app)  # Idempotency-Key en POST/PUT/PATCH/DELETE
+init_catalogos(app)  # Datos de referencia (ubigeo, escuelas, ...) en memoria
+init_carga_docente(app)  # Triggers de carga horaria por docente
+init_listados(app)  # Índices de los listados paginados (CREATE INDEX CONCURRENTLY)
 
 # Registra los Blueprints (los diferentes módulos de tu API)
 app.register_blueprint(auth_bp, url_prefix="/auth")
 app.register_blueprint(superadmin_bp, url_prefix="/superadmin")
 app.register_blueprint(admin_bp, url_prefix="/admin")  # Ahora incluye todos los sub-blueprints
 app.register_blueprint(curso_bp, url_prefix="/curso")
+app.register_blueprint(catalogos_bp, url_prefix="/catalogos")
 app.register_blueprint(docentes_bp, url_prefix="/api")  # ya tiene su propio url_prefix
 app.register_blueprint(alumno_bp, url_prefix="/alumno")
 
@@ -1,21 +1,68 @@
 import psycopg2
 from flask import g
 import os
+import threading
+import uuid
+
+# Nombres de los esquemas auxiliares ya creados en este proceso
+_esquemas_aplicados = set()
+_lock_esquemas = threading.Lock()
+
+def conectar():
+    """Abre una conexión nueva (fuera de g), para trabajos que gestionan su propio ciclo de vida."""
+    return psycopg2.connect(
+        host=os.getenv("DB_HOST", "localhost"),
+        database=os.getenv("DB_NAME", "SUN_BLACK"),
+        user=os.getenv("DB_USER", "postgres"),
+        password=os.getenv("DB_PASS", "123456"),
+        connect_timeout=5
+    )
 
 def get_db():
     if "db" not in g:
-        g.db = psycopg2.connect(
-            host=os.getenv("DB_HOST", "localhost"),
-            database=os.getenv("DB_NAME", "SUN_BLACK"),
-            user=os.getenv("DB_USER", "postgres"),
-            password=os.getenv("DB_PASS", "123456"),
-            connect_timeout=5   
-        )
+        g.db = conectar()
     return g.db
 
+def asegurar_esquema(nombre, ddl):
+    """
+    Ejecuta una sola vez por proceso el DDL de las tablas auxiliares de un módulo.
+    Usa su propia conexión para no confirmar la transacción en curso del endpoint.
+    El DDL debe ser idempotente (CREATE ... IF NOT EXISTS).
+    """
+    if nombre in _esquemas_aplicados:
+        return
+    with _lock_esquemas:
+        if nombre in _esquemas_aplicados:
+            return
+        conn = conectar()
+        try:
+            with conn.cursor() as cur:
+                cur.execute(ddl)
+            conn.commit()
+            _esquemas_aplicados.add(nombre)
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+def iterar_consulta(conn, consulta, parametros=None, tamano_lote=2000, cursor_factory=None):
+    """
+    Recorre el resultado con un cursor de servidor (con nombre), trayendo filas por
+    lotes: la memoria no crece con el tamaño de la consulta.
+    """
+    cur = conn.cursor(name=f"iter_{uuid.uuid4().hex}", cursor_factory=cursor_factory)
+    cur.itersize = tamano_lote
+    try:
+        cur.execute(consulta, parametros)
+        for fila in cur:
+            yield fila
+    finally:
+        cur.close()
+
 def init_db(app):
     @app.teardown_appcontext
     def close_connection(exception):
         db = g.pop("db", None)
         if db is not None:
-            db.close()
\ No newline at end of file
+            db.close()
@@ -55,5 +55,21 @@ try:
 except ImportError as e:
     print(f"⚠️ Warning: No se pudo importar horarios_bp - {e}")
 
+# 7. ORDEN DE MÉRITO
+try:
+    from .orden_merito import orden_merito_bp
+    admin_bp.register_blueprint(orden_merito_bp, url_prefix="")
+    print(" orden_merito_bp registrado correctamente")
+except ImportError as e:
+    print(f"⚠️ Warning: No se pudo importar orden_merito_bp - {e}")
+
+# 8. BÚSQUEDA DE PERSONAS
+try:
+    from .busqueda import busqueda_bp
+    admin_bp.register_blueprint(busqueda_bp, url_prefix="")
+    print(" busqueda_bp registrado correctamente")
+except ImportError as e:
+    print(f"⚠️ Warning: No se pudo importar busqueda_bp - {e}")
+
 # Exportar el blueprint principal
 __all__ = ["admin_bp"]
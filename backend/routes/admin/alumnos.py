@@ -4,6 +4,9 @@ from database.db import get_db
 from utils.security import hash_password
 from psycopg2.extras import RealDictCursor
 from datetime import datetime
+from utils.paginacion import ErrorListado, Listado, aplicar_cabeceras, consulta_completa, es_paginado, paginar
+from utils.json_stream import respuesta_json_stream
+from services import catalogos
 
 # Crear el Blueprint
 alumnos_bp = Blueprint("alumnos", __name__)
@@ -334,40 +337,80 @@ def obtener_asignaciones_disponibles(alumno_id):
 # ===========================
 # LISTAR ALUMNOS
 # ===========================
+LISTADO_ALUMNOS = Listado(
+    "alumnos",
+    """
+        SELECT 
+            e.estudiante_id,
+            e.codigo_universitario,
+            p.nombres,
+            p.apellidos,
+            p.dni,
+            p.telefono,
+            u.correo AS correo_institucional,
+            esc.nombre_escuela,
+            esc.facultad,
+            u.estado
+        FROM estudiante e
+        JOIN persona p ON e.persona_id = p.persona_id
+        JOIN usuario u ON p.usuario_id = u.usuario_id
+        JOIN escuela esc ON e.escuela_id = esc.escuela_id
+    """,
+    llave="estudiante_id",
+    orden={
+        # Activos primero; cualquier otro estado (o NULL) después, como antes
+        "estado": "CASE WHEN t.estado = 'ACTIVO' THEN 0 ELSE 1 END",
+        "apellidos": "t.apellidos",
+        "nombres": "t.nombres",
+        "codigo": "t.codigo_universitario",
+        "escuela": "t.nombre_escuela",
+    },
+    orden_defecto=[("estado", "asc"), ("apellidos", "asc"), ("nombres", "asc")],
+    filtros={
+        "estado": ("t.estado", "="),
+        "dni": ("t.dni", "="),
+        "codigo": ("t.codigo_universitario", "contiene"),
+        "nombre": ("t.nombres || ' ' || t.apellidos", "contiene"),
+        "escuela": ("t.nombre_escuela", "contiene"),
+        "facultad": ("t.facultad", "contiene"),
+    },
+    indices=(
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_persona_apellidos_nombres ON persona (apellidos, nombres)",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_estudiante_persona ON estudiante (persona_id)",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_estudiante_codigo_id ON estudiante (codigo_universitario, estudiante_id)",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_usuario_estado ON usuario (estado)",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_usuario_estado_activo "
+        "ON usuario ((CASE WHEN estado = 'ACTIVO' THEN 0 ELSE 1 END))",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_escuela_nombre ON escuela (nombre_escuela)",
+    ),
+)
+
+
 @alumnos_bp.route("/alumnos", methods=["GET"])
 def listar_alumnos():
-    """Obtiene la lista completa de alumnos (ACTIVOS e INACTIVOS)"""
+    """
+    Lista los alumnos (ACTIVOS e INACTIVOS).
+    Filtros y paginación opcionales: ?estado=&nombre=&escuela=&limite=&cursor=&ordenar=&total=
+    Sin paginación el listado completo se envía en streaming.
+    """
     conn = None
     cur = None
     
     try:
+        if not es_paginado(request.args):
+            consulta, parametros = consulta_completa(LISTADO_ALUMNOS, request.args)
+            return respuesta_json_stream(consulta, parametros, clave="alumnos")
+
         conn = get_db()
         cur = conn.cursor(cursor_factory=RealDictCursor)
         
-        cur.execute("""
-            SELECT 
-                e.estudiante_id,
-                e.codigo_universitario,
-                p.nombres,
-                p.apellidos,
-                p.dni,
-                p.telefono,
-                u.correo AS correo_institucional,
-                esc.nombre_escuela,
-                esc.facultad,
-                u.estado
-            FROM estudiante e
-            JOIN persona p ON e.persona_id = p.persona_id
-            JOIN usuario u ON p.usuario_id = u.usuario_id
-            JOIN escuela esc ON e.escuela_id = esc.escuela_id
-            ORDER BY 
-                CASE WHEN u.estado = 'ACTIVO' THEN 0 ELSE 1 END,
-                p.apellidos, p.nombres
-        """)
-        
-        alumnos = cur.fetchall()
-        return jsonify({"alumnos": alumnos}), 200
+        alumnos, meta = paginar(cur, LISTADO_ALUMNOS, request.args)
+        respuesta = jsonify({"alumnos": alumnos})
+        aplicar_cabeceras(respuesta, meta, request.base_url, request.args)
+        return respuesta, 200
         
+    except ErrorListado as e:
+        return jsonify({"error": f"⚠️ {e}"}), 400
     except Exception as e:
         print(f"❌ Error al listar alumnos: {e}")
         return jsonify({"error": str(e)}), 500
@@ -431,35 +474,12 @@ def obtener_alumno(estudiante_id):
 # ===========================
 @alumnos_bp.route("/escuelas", methods=["GET"])
 def obtener_escuelas():
-    """Obtiene la lista de todas las escuelas"""
-    conn = None
-    cur = None
-    
+    """Obtiene la lista de todas las escuelas (desde la caché de catálogos)"""
     try:
-        conn = get_db()
-        cur = conn.cursor()
-        
-        cur.execute("SELECT escuela_id, nombre_escuela, facultad FROM escuela ORDER BY nombre_escuela")
-        escuelas = cur.fetchall()
-        
-        return jsonify({
-            "escuelas": [
-                {
-                    "escuela_id": row[0],
-                    "nombre_escuela": row[1],
-                    "facultad": row[2]
-                } for row in escuelas
-            ]
-        }), 200
-        
+        return jsonify({"escuelas": catalogos.obtener("escuelas")}), 200
     except Exception as e:
         print(f"❌ Error al obtener escuelas: {e}")
         return jsonify({"error": str(e)}), 500
-    finally:
-        if cur:
-            cur.close()
-        if conn:
-            conn.close()
 
 # ===========================
 # MODIFICAR ALUMNO
@@ -1,7 +1,11 @@
 from flask import Blueprint, request, jsonify
 from psycopg2.extras import RealDictCursor
+from psycopg2 import errors
 from database.db import get_db
 from datetime import datetime, timedelta
+from services.horarios import asegurar_franjas, cruce_sin_restriccion, mensaje_conflicto
+from utils.paginacion import ErrorListado, Listado, aplicar_cabeceras, consulta_completa, es_paginado, paginar
+from utils.json_stream import respuesta_json_stream
 
 asignaciones_bp = Blueprint("asignaciones", __name__)
 
@@ -144,6 +148,8 @@ def crear_asignacion():
     cur = conn.cursor()
 
     try:
+        restricciones = asegurar_franjas()
+
         # Obtener horas del curso
         cur.execute(
             "SELECT horas_teoricas, horas_practicas FROM curso WHERE curso_id = %s", 
@@ -180,34 +186,6 @@ def crear_asignacion():
             if cantidad_estudiantes > aula[0]:
                 return jsonify({"error": f"Capacidad insuficiente en aula teórica (Capacidad: {aula[0]})"}), 400
 
-            # Validar conflicto de aula (overlap de horarios)
-            cur.execute("""
-                SELECT 1 FROM asignaciones 
-                WHERE dia = %s 
-                AND aula_id = %s
-                AND (
-                    (hora_inicio < %s AND hora_fin > %s) OR
-                    (hora_inicio < %s AND hora_fin > %s) OR
-                    (hora_inicio >= %s AND hora_fin <= %s)
-                )
-            """, (dia_1, aula_id_teorica, hora_fin_1, hora_inicio_1, hora_fin_1, hora_inicio_1, hora_inicio_1, hora_fin_1))
-            if cur.fetchone():
-                return jsonify({"error": f"El aula teórica ya está ocupada el {dia_1} entre {hora_inicio_1} y {hora_fin_1}."}), 400
-
-            # Validar conflicto de docente
-            cur.execute("""
-                SELECT 1 FROM asignaciones 
-                WHERE dia = %s 
-                AND docente_id = %s
-                AND (
-                    (hora_inicio < %s AND hora_fin > %s) OR
-                    (hora_inicio < %s AND hora_fin > %s) OR
-                    (hora_inicio >= %s AND hora_fin <= %s)
-                )
-            """, (dia_1, docente_id, hora_fin_1, hora_inicio_1, hora_fin_1, hora_inicio_1, hora_inicio_1, hora_fin_1))
-            if cur.fetchone():
-                return jsonify({"error": f"El docente ya tiene una clase el {dia_1} entre {hora_inicio_1} y {hora_fin_1}."}), 400
-            
             # Validar duplicado curso + sección en mismo horario
             cur.execute("""
                 SELECT 1 FROM asignaciones
@@ -249,34 +227,6 @@ def crear_asignacion():
             if cantidad_estudiantes > aula[0]:
                 return jsonify({"error": f"Capacidad insuficiente en aula práctica (Capacidad: {aula[0]})"}), 400
 
-            # Validar conflicto de aula
-            cur.execute("""
-                SELECT 1 FROM asignaciones 
-                WHERE dia = %s 
-                AND aula_id = %s
-                AND (
-                    (hora_inicio < %s AND hora_fin > %s) OR
-                    (hora_inicio < %s AND hora_fin > %s) OR
-                    (hora_inicio >= %s AND hora_fin <= %s)
-                )
-            """, (dia_2, aula_id_practica, hora_fin_2, hora_inicio_2, hora_fin_2, hora_inicio_2, hora_inicio_2, hora_fin_2))
-            if cur.fetchone():
-                return jsonify({"error": f"El aula práctica ya está ocupada el {dia_2} entre {hora_inicio_2} y {hora_fin_2}."}), 400
-
-            # Validar conflicto de docente
-            cur.execute("""
-                SELECT 1 FROM asignaciones 
-                WHERE dia = %s 
-                AND docente_id = %s
-                AND (
-                    (hora_inicio < %s AND hora_fin > %s) OR
-                    (hora_inicio < %s AND hora_fin > %s) OR
-                    (hora_inicio >= %s AND hora_fin <= %s)
-                )
-            """, (dia_2, docente_id, hora_fin_2, hora_inicio_2, hora_fin_2, hora_inicio_2, hora_inicio_2, hora_fin_2))
-            if cur.fetchone():
-                return jsonify({"error": f"El docente ya tiene una clase el {dia_2} entre {hora_inicio_2} y {hora_fin_2}."}), 400
-            
             # Validar duplicado curso + sección
             cur.execute("""
                 SELECT 1 FROM asignaciones
@@ -303,21 +253,39 @@ def crear_asignacion():
             return jsonify({"error": "⚠️ No se han proporcionado bloques válidos para la asignación."}), 400
 
         # ==================== INSERCIÓN ====================
+        # Los cruces de aula y docente los rechaza la base de datos (restricciones de exclusión);
+        # si alguna restricción no existe se validan por consulta antes de insertar
         last_id = None
         for asig in asignaciones_a_insertar:
-            cur.execute("""
-                INSERT INTO asignaciones (
+            bloque = "teórica" if asig['tipo'] == 'TEORICO' else "práctica"
+            cruce = cruce_sin_restriccion(
+                cur, restricciones, seccion_id, docente_id, asig['aula_id'],
+                asig['dia'], asig['hora_inicio'], asig['hora_fin']
+            )
+            if cruce:
+                conn.rollback()
+                return jsonify({"error": mensaje_conflicto(
+                    cruce, bloque, asig['dia'], asig['hora_inicio'], asig['hora_fin']
+                )}), 400
+            try:
+                cur.execute("""
+                    INSERT INTO asignaciones (
+                        curso_id, seccion_id, docente_id, cantidad_estudiantes,
+                        observaciones, dia, hora_inicio, hora_fin, aula_id, tipo
+                    )
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                    RETURNING asignacion_id
+                """, (
                     curso_id, seccion_id, docente_id, cantidad_estudiantes,
-                    observaciones, dia, hora_inicio, hora_fin, aula_id, tipo
-                )
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                RETURNING asignacion_id
-            """, (
-                curso_id, seccion_id, docente_id, cantidad_estudiantes,
-                f"{observaciones} ({asig['tipo']})" if observaciones else asig['tipo'], 
-                asig['dia'], asig['hora_inicio'], asig['hora_fin'], 
-                asig['aula_id'], asig['tipo']
-            ))
+                    f"{observaciones} ({asig['tipo']})" if observaciones else asig['tipo'], 
+                    asig['dia'], asig['hora_inicio'], asig['hora_fin'], 
+                    asig['aula_id'], asig['tipo']
+                ))
+            except errors.ExclusionViolation as e:
+                conn.rollback()
+                return jsonify({"error": mensaje_conflicto(
+                    e, bloque, asig['dia'], asig['hora_inicio'], asig['hora_fin']
+                )}), 400
             last_id = cur.fetchone()[0]
 
         conn.commit()
@@ -336,29 +304,62 @@ def crear_asignacion():
         conn.close()
 
         
+LISTADO_ASIGNACIONES = Listado(
+    "asignaciones",
+    """
+        SELECT 
+            a.asignacion_id,
+            a.curso_id,
+            a.seccion_id,
+            a.docente_id,
+            a.cantidad_estudiantes,
+            a.observaciones,
+            a.aula_id,
+            a.dia,
+            a.hora_inicio,
+            a.hora_fin,
+            a.tipo
+        FROM asignaciones a
+    """,
+    llave="asignacion_id",
+    orden={"id": "t.asignacion_id"},
+    orden_defecto=[("id", "desc")],
+    filtros={
+        "curso_id": ("t.curso_id", "=", int),
+        "seccion_id": ("t.seccion_id", "=", int),
+        "docente_id": ("t.docente_id", "=", int),
+        "aula_id": ("t.aula_id", "=", int),
+        "dia": ("t.dia", "="),
+        "tipo": ("t.tipo", "="),
+    },
+)
+
+
 @asignaciones_bp.route("/listar-asignaciones", methods=["GET"])
 def listar_asignaciones():
+    """
+    Filtros y paginación opcionales: ?curso_id=&seccion_id=&docente_id=&limite=&cursor=&total=
+    Sin paginación el listado completo se envía en streaming.
+    """
+    if not es_paginado(request.args):
+        try:
+            consulta, parametros = consulta_completa(LISTADO_ASIGNACIONES, request.args)
+            return respuesta_json_stream(consulta, parametros)
+        except ErrorListado as e:
+            return jsonify({"error": f"⚠️ {e}"}), 400
+        except Exception as e:
+            print(f"Error SQL: {e}") # Ver en consola
+            return jsonify({"error": f"Error al listar asignaciones: {str(e)}"}), 500
+
     conn = get_db()
     cur = conn.cursor(cursor_factory=RealDictCursor)
     try:
-        cur.execute("""
-            SELECT 
-                a.asignacion_id,
-                a.curso_id,
-                a.seccion_id,
-                a.docente_id,
-                a.cantidad_estudiantes,
-                a.observaciones,
-                a.aula_id,
-                a.dia,
-                a.hora_inicio::text,  -- Convertimos a texto para evitar error de JSON
-                a.hora_fin::text,     -- Convertimos a texto para evitar error de JSON
-                a.tipo
-            FROM asignaciones a
-            ORDER BY a.asignacion_id DESC
-        """)
-        asignaciones = cur.fetchall()
-        return jsonify(asignaciones)
+        asignaciones, meta = paginar(cur, LISTADO_ASIGNACIONES, request.args)
+        respuesta = jsonify(asignaciones)
+        aplicar_cabeceras(respuesta, meta, request.base_url, request.args)
+        return respuesta
+    except ErrorListado as e:
+        return jsonify({"error": f"⚠️ {e}"}), 400
     except Exception as e:
         print(f"Error SQL: {e}") # Ver en consola
         return jsonify({"error": f"Error al listar asignaciones: {str(e)}"}), 500
@@ -394,8 +395,11 @@ def editar_asignacion(asignacion_id):
 
     conn = get_db()
     cur = conn.cursor()
+    bloque_actual = None
 
     try:
+        restricciones = asegurar_franjas()
+
         # A. Identificar el GRUPO original (Curso + Sección) usando el ID que llegó
         cur.execute("SELECT curso_id, seccion_id FROM asignaciones WHERE asignacion_id=%s", (asignacion_id,))
         original = cur.fetchone()
@@ -422,36 +426,56 @@ def editar_asignacion(asignacion_id):
         # C. ACTUALIZAR BLOQUE TEÓRICO
         # Buscamos la fila TEORICO que coincida con el CURSO/SECCION ORIGINAL
         if horas_teo > 0 and dia_1:
+            bloque_actual = ("teórica", dia_1, hora_ini_1, hora_fin_1)
             cur.execute("""
                 UPDATE asignaciones
                 SET curso_id = %s, seccion_id = %s, docente_id = %s, cantidad_estudiantes = %s, observaciones = %s,
                     dia = %s, hora_inicio = %s, hora_fin = %s, aula_id = %s
                 WHERE curso_id = %s AND seccion_id = %s AND tipo = 'TEORICO'
+                RETURNING asignacion_id
             """, (
                 nuevo_curso_id, nuevo_seccion_id, nuevo_docente_id, nuevo_estudiantes, observaciones,
                 dia_1, hora_ini_1, hora_fin_1, aula_1,
                 old_curso_id, old_seccion_id # Usamos los IDs viejos para encontrar la fila
             ))
+            actualizadas = [fila[0] for fila in cur.fetchall()]
+            cruce = cruce_sin_restriccion(cur, restricciones, nuevo_seccion_id, nuevo_docente_id, aula_1,
+                                          dia_1, hora_ini_1, hora_fin_1, actualizadas)
+            if cruce:
+                conn.rollback()
+                return jsonify({"error": mensaje_conflicto(cruce, *bloque_actual)}), 400
             # Si no actualizó nada (ej. antes no había teórico), podrías decidir insertar, 
             # pero por ahora asumimos que la estructura existe.
 
         # D. ACTUALIZAR BLOQUE PRÁCTICO
         # Buscamos la fila PRACTICO que coincida con el CURSO/SECCION ORIGINAL
         if horas_prac > 0 and dia_2:
+            bloque_actual = ("práctica", dia_2, hora_ini_2, hora_fin_2)
             cur.execute("""
                 UPDATE asignaciones
                 SET curso_id = %s, seccion_id = %s, docente_id = %s, cantidad_estudiantes = %s, observaciones = %s,
                     dia = %s, hora_inicio = %s, hora_fin = %s, aula_id = %s
                 WHERE curso_id = %s AND seccion_id = %s AND tipo = 'PRACTICO'
+                RETURNING asignacion_id
             """, (
                 nuevo_curso_id, nuevo_seccion_id, nuevo_docente_id, nuevo_estudiantes, observaciones,
                 dia_2, hora_ini_2, hora_fin_2, aula_2,
                 old_curso_id, old_seccion_id
             ))
+            actualizadas = [fila[0] for fila in cur.fetchall()]
+            cruce = cruce_sin_restriccion(cur, restricciones, nuevo_seccion_id, nuevo_docente_id, aula_2,
+                                          dia_2, hora_ini_2, hora_fin_2, actualizadas)
+            if cruce:
+                conn.rollback()
+                return jsonify({"error": mensaje_conflicto(cruce, *bloque_actual)}), 400
 
         conn.commit()
         return jsonify({"mensaje": "✅ Asignación(es) actualizada(s) correctamente."}), 200
 
+    except errors.ExclusionViolation as e:
+        conn.rollback()
+        return jsonify({"error": mensaje_conflicto(e, *bloque_actual)}), 400
+
     except Exception as e:
         conn.rollback()
         print(f"Error editando: {e}")
@@ -0,0 +1,35 @@
+from flask import Blueprint, request, jsonify
+from database.db import get_db
+from services.busqueda_personas import LIMITE_DEFECTO, ErrorBusqueda, buscar_personas
+
+busqueda_bp = Blueprint('busqueda', __name__)
+
+
+# -----------------------------
+# BÚSQUEDA DE ESTUDIANTES Y DOCENTES
+# -----------------------------
+@busqueda_bp.route("/buscar-personas", methods=["GET"])
+def buscar():
+    """
+    Typeahead por nombre, DNI, código universitario / de docente o correo.
+    ?q=texto&tipo=estudiante|docente&limite=20
+    """
+    conn = get_db()
+    cur = conn.cursor()
+    try:
+        resultados = buscar_personas(
+            cur,
+            request.args.get("q"),
+            tipo=request.args.get("tipo") or None,
+            limite=request.args.get("limite", LIMITE_DEFECTO),
+        )
+        return jsonify({"total": len(resultados), "resultados": resultados}), 200
+
+    except ErrorBusqueda as e:
+        return jsonify({"error": f"⚠️ {e}"}), 400
+    except Exception as e:
+        print("❌ Error en la búsqueda de personas:", e)
+        return jsonify({"error": str(e)}), 500
+    finally:
+        cur.close()
+        conn.close()
@@ -14,6 +14,11 @@ from psycopg2.extras import RealDictCursor
 import psycopg2 
 from datetime import datetime, date
 from psycopg2 import errors 
+from services.carga_docente import asegurar_carga_docente, resumen_carga
+from services.periodos import periodo_activo
+from services import catalogos
+from utils.paginacion import ErrorListado, Listado, aplicar_cabeceras, consulta_completa, es_paginado, paginar
+from utils.json_stream import respuesta_json_stream
 
 docentes_bp = Blueprint('docentes', __name__)
 
@@ -259,55 +264,31 @@ def generar_correo_inst(nombres, apellidos):
 
 @docentes_bp.route("/departamentos", methods=["GET"])
 def obtener_departamentos_ubigeo():
-    conn = None; cur = None
     try:
-        conn = get_db(); cur = conn.cursor(cursor_factory=RealDictCursor)
-        cur.execute("SELECT departamento_id, nombre_departamento FROM departamento_geo ORDER BY nombre_departamento")
-        return jsonify({"departamentos": cur.fetchall()}) 
+        return jsonify({"departamentos": catalogos.obtener("departamentos")})
     except (Exception, psycopg2.Error) as e:
         return jsonify({"error": str(e)}), 500
-    finally:
-        if cur: cur.close()
-        if conn: conn.close()
 
 @docentes_bp.route("/provincias/<string:id_departamento>", methods=["GET"])
 def obtener_provincias_ubigeo(id_departamento):
-    conn = None; cur = None
     try:
-        conn = get_db(); cur = conn.cursor(cursor_factory=RealDictCursor)
-        cur.execute("SELECT provincia_id, nombre_provincia FROM provincia WHERE departamento_id = %s ORDER BY nombre_provincia", (id_departamento,))
-        return jsonify({"provincias": cur.fetchall()})
+        return jsonify({"provincias": catalogos.provincias_de(id_departamento)})
     except (Exception, psycopg2.Error) as e:
         return jsonify({"error": str(e)}), 500
-    finally:
-        if cur: cur.close()
-        if conn: conn.close()
 
 @docentes_bp.route("/distritos/<string:id_provincia>", methods=["GET"])
 def obtener_distritos_ubigeo(id_provincia):
-    conn = None; cur = None
     try:
-        conn = get_db(); cur = conn.cursor(cursor_factory=RealDictCursor)
-        cur.execute("SELECT distrito_id, nombre_distrito FROM distrito WHERE provincia_id = %s ORDER BY nombre_distrito", (id_provincia,))
-        return jsonify({"distritos": cur.fetchall()})
+        return jsonify({"distritos": catalogos.distritos_de(id_provincia)})
     except (Exception, psycopg2.Error) as e:
         return jsonify({"error": str(e)}), 500
-    finally:
-        if cur: cur.close()
-        if conn: conn.close()
 
 @docentes_bp.route("/escuelas", methods=["GET"])
 def obtener_escuelas():
-    conn = None; cur = None
     try:
-        conn = get_db(); cur = conn.cursor(cursor_factory=RealDictCursor)
-        cur.execute("SELECT escuela_id, nombre_escuela, facultad FROM escuela ORDER BY nombre_escuela")
-        return jsonify({"escuelas": cur.fetchall()})
+        return jsonify({"escuelas": catalogos.obtener("escuelas")})
     except (Exception, psycopg2.Error) as e:
         return jsonify({"error": str(e)}), 500
-    finally:
-        if cur: cur.close()
-        if conn: conn.close()
 
     # ===========================
 # CREAR DOCENTE (CON TODAS LAS VALIDACIONES)
@@ -472,42 +453,73 @@ def crear_docente():
 # ==========================
 # LISTAR DOCENTES
 # ==========================
+LISTADO_DOCENTES = Listado(
+    "docentes",
+    """
+    SELECT 
+        doc.docente_id, u.usuario_id, p.nombres, p.apellidos, p.dni, p.telefono, p.fecha_nacimiento,
+        u.correo, COALESCE(doc.estado, FALSE) AS estado, e.nombre_escuela, e.escuela_id, d.direccion_detalle AS direccion_desc, 
+        d.id_direccion, dist.distrito_id AS id_distrito, dist.nombre_distrito AS distrito,
+        prov.provincia_id AS id_provincia, prov.nombre_provincia AS provincia,
+        dep.departamento_id AS id_departamento, dep.nombre_departamento AS departamento,
+        doc.codigo_docente
+    FROM docente doc
+    LEFT JOIN persona p ON doc.persona_id = p.persona_id
+    LEFT JOIN usuario u ON p.usuario_id = u.usuario_id 
+    LEFT JOIN escuela e ON doc.escuela_id = e.escuela_id
+    LEFT JOIN direccion d ON doc.id_direccion = d.id_direccion
+    LEFT JOIN distrito dist ON d.id_distrito = dist.distrito_id
+    LEFT JOIN provincia prov ON dist.provincia_id = prov.provincia_id
+    LEFT JOIN departamento_geo dep ON prov.departamento_id = dep.departamento_id
+    LEFT JOIN usuario_rol ur ON u.usuario_id = ur.usuario_id
+    LEFT JOIN rol r ON ur.rol_id = r.rol_id
+    WHERE r.nombre_rol = 'Docente' 
+    """,
+    llave="docente_id",
+    orden={
+        "apellidos": "t.apellidos",
+        "nombres": "t.nombres",
+        "codigo": "t.codigo_docente",
+        "escuela": "t.nombre_escuela",
+    },
+    orden_defecto=[("apellidos", "asc"), ("nombres", "asc")],
+    filtros={
+        "estado": ("t.estado", "booleano"),
+        "escuela_id": ("t.escuela_id", "=", int),
+        "dni": ("t.dni", "="),
+        "codigo": ("t.codigo_docente", "contiene"),
+        "nombre": ("t.nombres || ' ' || t.apellidos", "contiene"),
+    },
+    indices=(
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_persona_apellidos_nombres ON persona (apellidos, nombres)",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_docente_escuela ON docente (escuela_id)",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_docente_codigo_id ON docente (codigo_docente, docente_id)",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_escuela_nombre ON escuela (nombre_escuela)",
+    ),
+)
+
+
 @docentes_bp.route("/docentes", methods=["GET"])
 def listar_docentes():
+    """
+    Lista los docentes. Filtros y paginación opcionales:
+    ?estado=&escuela_id=&nombre=&limite=&cursor=&ordenar=&total=
+    Sin paginación el listado completo se envía en streaming.
+    """
     conn = None; cur = None
     try:
+        if not es_paginado(request.args):
+            consulta, parametros = consulta_completa(LISTADO_DOCENTES, request.args)
+            return respuesta_json_stream(consulta, parametros)
+
         conn = get_db(); cur = conn.cursor(cursor_factory=RealDictCursor)
-        cur.execute("""
-        SELECT 
-            doc.docente_id, u.usuario_id, p.nombres, p.apellidos, p.dni, p.telefono, p.fecha_nacimiento,
-            u.correo, doc.estado, e.nombre_escuela, e.escuela_id, d.direccion_detalle AS direccion_desc, 
-            d.id_direccion, dist.distrito_id AS id_distrito, dist.nombre_distrito AS distrito,
-            prov.provincia_id AS id_provincia, prov.nombre_provincia AS provincia,
-            dep.departamento_id AS id_departamento, dep.nombre_departamento AS departamento,
-            doc.codigo_docente
-        FROM docente doc
-        LEFT JOIN persona p ON doc.persona_id = p.persona_id
-        LEFT JOIN usuario u ON p.usuario_id = u.usuario_id 
-        LEFT JOIN escuela e ON doc.escuela_id = e.escuela_id
-        LEFT JOIN direccion d ON doc.id_direccion = d.id_direccion
-        LEFT JOIN distrito dist ON d.id_distrito = dist.distrito_id
-        LEFT JOIN provincia prov ON dist.provincia_id = prov.provincia_id
-        LEFT JOIN departamento_geo dep ON prov.departamento_id = dep.departamento_id
-        LEFT JOIN usuario_rol ur ON u.usuario_id = ur.usuario_id
-        LEFT JOIN rol r ON ur.rol_id = r.rol_id
-        WHERE r.nombre_rol = 'Docente' 
-        ORDER BY p.apellidos, p.nombres
-        """)
-        docentes = cur.fetchall()
-        
-        for docente in docentes:
-            if docente.get('fecha_nacimiento'):
-                docente['fecha_nacimiento'] = docente['fecha_nacimiento'].isoformat() if hasattr(docente['fecha_nacimiento'], 'isoformat') else None
-            if 'estado' in docente:
-                docente['estado'] = docente['estado'] is True
-        
-        return jsonify(docentes)
+        docentes, meta = paginar(cur, LISTADO_DOCENTES, request.args)
+        respuesta = jsonify(docentes)
+        aplicar_cabeceras(respuesta, meta, request.base_url, request.args)
+        return respuesta
         
+    except ErrorListado as e:
+        return jsonify({"error": f"⚠️ {e}"}), 400
     except (Exception, psycopg2.Error) as e:
         print(f"Error en listar_docentes: {str(e)}")
         return jsonify({"error": str(e)}), 500
@@ -684,27 +696,55 @@ def eliminar_docente(usuario_id):
 @docentes_bp.route("/docentes-activos", methods=["GET"])
 def listar_docentes_activos():
     """
-    Lista solo los docentes con estado = TRUE para dropdown o selects
+    Lista solo los docentes con estado = TRUE para dropdown o selects, con su carga
+    horaria del periodo (?periodo=, por defecto el más reciente con secciones activas).
+    Filtros opcionales: ?max_horas=, ?min_franjas_libres=; ?ordenar=carga|libres|nombre.
     """
     conn = None; cur = None
     try:
         conn = get_db()
         cur = conn.cursor(cursor_factory=RealDictCursor)
-        
+        asegurar_carga_docente()
+
+        periodo = request.args.get("periodo")
+        if not periodo:
+            periodo = periodo_activo(cur)
+
         cur.execute("""
             SELECT 
                 doc.docente_id, 
                 p.nombres, 
                 p.apellidos, 
                 doc.codigo_docente,
-                CONCAT(p.nombres, ' ', p.apellidos) as nombre_completo
+                CONCAT(p.nombres, ' ', p.apellidos) as nombre_completo,
+                cd.bloques, cd.minutos_semanales, cd.franjas_ocupadas,
+                cd.secciones, cd.cursos, cd.estudiantes
             FROM docente doc
             INNER JOIN persona p ON doc.persona_id = p.persona_id
+            LEFT JOIN carga_docente cd ON cd.docente_id = doc.docente_id AND cd.periodo = %s
             WHERE doc.estado = TRUE
             ORDER BY p.apellidos, p.nombres
-        """)
+        """, (periodo,))
         
-        docentes_activos = cur.fetchall()
+        docentes_activos = []
+        for fila in cur.fetchall():
+            docente = {k: fila[k] for k in ("docente_id", "nombres", "apellidos", "codigo_docente", "nombre_completo")}
+            docente["periodo"] = periodo or None
+            docente.update(resumen_carga(fila))
+            docentes_activos.append(docente)
+
+        max_horas = request.args.get("max_horas", type=float)
+        if max_horas is not None:
+            docentes_activos = [d for d in docentes_activos if d["horas_semanales"] <= max_horas]
+        min_libres = request.args.get("min_franjas_libres", type=int)
+        if min_libres is not None:
+            docentes_activos = [d for d in docentes_activos if d["franjas_libres"] >= min_libres]
+
+        ordenar = request.args.get("ordenar")
+        if ordenar == "carga":
+            docentes_activos.sort(key=lambda d: d["horas_semanales"])
+        elif ordenar == "libres":
+            docentes_activos.sort(key=lambda d: -d["franjas_libres"])
         
         return jsonify(docentes_activos), 200
         
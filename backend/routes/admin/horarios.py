@@ -1,5 +1,25 @@
 # Dentro de: routes/admin/horarios.py
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, request
+from psycopg2 import errors
+from psycopg2.extras import execute_values
+from database.db import get_db
+from services.horarios import (
+    HORARIOS_VALIDOS, DIAS, RESTRICCION_DOCENTE, asegurar_franjas, hora_fin_bloque
+)
+from services.generador_horarios import (
+    ErrorGenerador, TIEMPO_LIMITE_DEFECTO, cargar_problema, generar_horario
+)
+from services.ocupacion_aulas import buscar_aulas_libres
+from services.conflictos import cargar_bloques, detectar_conflictos, validar_cambios
+from services.importar_horarios import (
+    ErrorImportacion, insertar_bloques, interpretar_filas, validar_importacion
+)
+from services.periodos import ErrorPeriodo, clonar_periodo
+from services.horario_semanal import grilla_semanal, obtener_bloques
+from services.utilizacion_aulas import (
+    ErrorOptimizacion, aplicar_reubicaciones, mapa_utilizacion, proponer_reubicaciones
+)
+from utils.hojas_calculo import ErrorHoja, leer_hoja
 
 # Define el Blueprint (esto arregla el error de importación)
 horarios_bp = Blueprint('horarios', __name__, url_prefix='/horarios')
@@ -9,4 +29,464 @@ horarios_bp = Blueprint('horarios', __name__, url_prefix='/horarios')
 def index():
     return jsonify({"mensaje": "Bienvenido a la sección de horarios"})
 
-# Aquí puedes añadir el resto de tus rutas CRUD para horarios...
\ No newline at end of file
+
+# -----------------------------
+# GENERAR HORARIO (VISTA PREVIA)
+# -----------------------------
+@horarios_bp.route("/horarios/generar", methods=["POST"])
+def generar():
+    """
+    Propone un horario para las secciones activas de un periodo. No escribe en la BD.
+    Body: {"periodo": "2025-I", "estudiantes": 30, "tiempo_limite": 10, "dias": [...],
+           "secciones": [...], "cursos": [...], "docentes": [...],
+           "docentes_por_curso": {"curso_id": [docente_id, ...]},
+           "tipos_aula": {"PRACTICO": [tipo_aula_id, ...]}}
+    """
+    data = request.get_json() or {}
+    conn = get_db()
+    cur = conn.cursor()
+    try:
+        problema = cargar_problema(cur, data)
+        tiempo_limite = data.get("tiempo_limite", TIEMPO_LIMITE_DEFECTO)
+        resultado = generar_horario(problema, tiempo_limite)
+        return jsonify(resultado), 200
+
+    except ErrorGenerador as e:
+        return jsonify({"error": str(e)}), 400
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": f"Parámetros inválidos: {str(e)}"}), 400
+    except Exception as e:
+        print(f"Error generando horario: {e}")
+        return jsonify({"error": f"Error interno del servidor: {str(e)}"}), 500
+    finally:
+        cur.close()
+        conn.close()
+
+
+# -----------------------------
+# CONFIRMAR HORARIO (INSERCIÓN MASIVA)
+# -----------------------------
+@horarios_bp.route("/horarios/confirmar", methods=["POST"])
+def confirmar():
+    """
+    Inserta en una sola transacción las asignaciones de la vista previa.
+    Body: {"asignaciones": [{curso_id, seccion_id, docente_id, aula_id, dia, hora_inicio, tipo, estudiantes}]}
+    La hora de fin se recalcula con las horas del curso; aula (operativa, capacidad) y
+    docente (activo) se revalidan y los cruces los rechaza la BD.
+    """
+    data = request.get_json() or {}
+    bloques = data.get("asignaciones") or []
+    if not bloques:
+        return jsonify({"error": "⚠️ No hay asignaciones para confirmar."}), 400
+
+    for i, bloque in enumerate(bloques, 1):
+        faltantes = [campo for campo in ("curso_id", "seccion_id", "docente_id", "aula_id", "dia", "hora_inicio", "tipo")
+                     if not bloque.get(campo)]
+        if faltantes:
+            return jsonify({"error": f"⚠️ Fila {i}: faltan campos ({', '.join(faltantes)})."}), 400
+        if bloque["dia"] not in DIAS:
+            return jsonify({"error": f"⚠️ Fila {i}: día '{bloque['dia']}' no válido."}), 400
+        if bloque["hora_inicio"] not in HORARIOS_VALIDOS:
+            return jsonify({"error": f"⚠️ Fila {i}: hora de inicio '{bloque['hora_inicio']}' fuera de la grilla."}), 400
+        if bloque["tipo"] not in ("TEORICO", "PRACTICO"):
+            return jsonify({"error": f"⚠️ Fila {i}: tipo debe ser TEORICO o PRACTICO."}), 400
+
+    conn = get_db()
+    cur = conn.cursor()
+    try:
+        asegurar_franjas()
+
+        cur.execute("""
+            SELECT curso_id, COALESCE(horas_teoricas, 0), COALESCE(horas_practicas, 0)
+            FROM curso WHERE curso_id = ANY(%s)
+        """, (list({int(b["curso_id"]) for b in bloques}),))
+        horas = {fila[0]: {"TEORICO": fila[1], "PRACTICO": fila[2]} for fila in cur.fetchall()}
+
+        # La vista previa vuelve del cliente: aula y docente se revalidan contra la BD
+        cur.execute("""
+            SELECT aula_id, COALESCE(capacidad, 0), UPPER(COALESCE(estado, '')) = 'OPERATIVO'
+            FROM aula WHERE aula_id = ANY(%s)
+        """, (list({int(b["aula_id"]) for b in bloques}),))
+        aulas = {fila[0]: (fila[1], fila[2]) for fila in cur.fetchall()}
+        cur.execute("""
+            SELECT docente_id, COALESCE(estado, FALSE)
+            FROM docente WHERE docente_id = ANY(%s)
+        """, (list({int(b["docente_id"]) for b in bloques}),))
+        docentes = {fila[0]: fila[1] for fila in cur.fetchall()}
+
+        filas = []
+        for i, bloque in enumerate(bloques, 1):
+            duracion = horas.get(int(bloque["curso_id"]), {}).get(bloque["tipo"], 0)
+            if duracion <= 0:
+                return jsonify({"error": f"⚠️ Fila {i}: el curso no existe o no tiene horas {bloque['tipo'].lower()}s."}), 400
+            aula = aulas.get(int(bloque["aula_id"]))
+            if not aula or not aula[1]:
+                return jsonify({"error": f"⚠️ Fila {i}: el aula no existe o no está operativa."}), 400
+            estudiantes = int(bloque.get("estudiantes") or 0)
+            if estudiantes > aula[0]:
+                return jsonify({"error": f"⚠️ Fila {i}: el aula tiene capacidad para {aula[0]} y el bloque tiene {estudiantes} estudiantes."}), 400
+            if not docentes.get(int(bloque["docente_id"])):
+                return jsonify({"error": f"⚠️ Fila {i}: el docente no existe o está inactivo."}), 400
+            if HORARIOS_VALIDOS.index(bloque["hora_inicio"]) + duracion > len(HORARIOS_VALIDOS):
+                return jsonify({"error": f"⚠️ Fila {i}: la duración ({duracion} h) no entra en la jornada desde las {bloque['hora_inicio']}."}), 400
+            bloque["fila"] = i
+            bloque["hora_fin"] = hora_fin_bloque(bloque["hora_inicio"], duracion)
+            filas.append((
+                bloque["curso_id"], bloque["seccion_id"], bloque["docente_id"],
+                estudiantes, bloque.get("observaciones") or bloque["tipo"],
+                bloque["dia"], bloque["hora_inicio"], bloque["hora_fin"],
+                bloque["aula_id"], bloque["tipo"]
+            ))
+
+        # Validación previa: cruces de aula, docente y sección contra el horario vigente y entre filas
+        reporte = validar_cambios(cur, bloques)
+        if reporte["total"]:
+            return jsonify({
+                "error": f"El horario tiene {reporte['total']} cruce(s); no se registró ninguna asignación.",
+                **reporte
+            }), 409
+
+        ids = execute_values(cur, """
+            INSERT INTO asignaciones (
+                curso_id, seccion_id, docente_id, cantidad_estudiantes,
+                observaciones, dia, hora_inicio, hora_fin, aula_id, tipo
+            )
+            VALUES %s
+            RETURNING asignacion_id
+        """, filas, page_size=500, fetch=True)
+
+        conn.commit()
+        return jsonify({
+            "mensaje": f"✅ Horario confirmado. ({len(ids)} bloque(s) creado(s))",
+            "asignacion_ids": [fila[0] for fila in ids]
+        }), 201
+
+    except errors.ExclusionViolation as e:
+        conn.rollback()
+        recurso = "un docente" if e.diag.constraint_name == RESTRICCION_DOCENTE else "un aula"
+        return jsonify({
+            "error": f"El horario tiene un cruce de {recurso}; no se registró ninguna asignación.",
+            "detalle": e.diag.message_detail
+        }), 409
+    except (TypeError, ValueError) as e:
+        conn.rollback()
+        return jsonify({"error": f"Datos inválidos: {str(e)}"}), 400
+    except Exception as e:
+        conn.rollback()
+        print(f"Error confirmando horario: {e}")
+        return jsonify({"error": f"Error interno del servidor: {str(e)}"}), 500
+    finally:
+        cur.close()
+        conn.close()
+
+
+# -----------------------------
+# AULAS LIBRES
+# -----------------------------
+@horarios_bp.route("/horarios/aulas-libres", methods=["GET"])
+def aulas_libres():
+    """
+    ?dia=Lunes&hora_inicio=08:00&horas=2&capacidad=30[&tipo_aula_id=&pabellon_id=&periodo=]
+    Sin periodo se usa el vigente (el más reciente con secciones activas).
+    Responde desde el índice de ocupación en memoria.
+    """
+    dia = request.args.get("dia")
+    hora_inicio = request.args.get("hora_inicio")
+    horas = request.args.get("horas", 1, type=int)
+    capacidad = request.args.get("capacidad", 0, type=int)
+
+    if dia not in DIAS:
+        return jsonify({"error": f"⚠️ Día no válido. Opciones: {', '.join(DIAS)}"}), 400
+    if hora_inicio not in HORARIOS_VALIDOS:
+        return jsonify({"error": f"⚠️ La hora de inicio debe ser una de: {', '.join(HORARIOS_VALIDOS)}"}), 400
+    franja = HORARIOS_VALIDOS.index(hora_inicio)
+    if not horas or horas < 1 or franja + horas > len(HORARIOS_VALIDOS):
+        return jsonify({"error": "⚠️ La duración no entra en la jornada."}), 400
+
+    conn = get_db()
+    try:
+        periodo, aulas = buscar_aulas_libres(
+            conn, dia, franja, horas, capacidad,
+            tipo_aula_id=request.args.get("tipo_aula_id", type=int),
+            pabellon_id=request.args.get("pabellon_id", type=int),
+            periodo=request.args.get("periodo")
+        )
+        return jsonify({
+            "periodo": periodo or None,
+            "dia": dia,
+            "hora_inicio": hora_inicio,
+            "hora_fin": hora_fin_bloque(hora_inicio, horas),
+            "total": len(aulas),
+            "aulas": aulas
+        }), 200
+    except Exception as e:
+        print(f"Error buscando aulas libres: {e}")
+        return jsonify({"error": f"Error interno del servidor: {str(e)}"}), 500
+    finally:
+        conn.close()
+
+
+# -----------------------------
+# REPORTE DE CRUCES
+# -----------------------------
+@horarios_bp.route("/horarios/conflictos", methods=["GET"])
+def conflictos():
+    """Cruces de aula, docente y sección de un periodo (?periodo=) o de todos."""
+    periodo = request.args.get("periodo")
+    conn = get_db()
+    cur = conn.cursor()
+    try:
+        bloques = cargar_bloques(cur, [periodo] if periodo else None)
+        reporte = detectar_conflictos(bloques)
+        return jsonify({"periodo": periodo, "asignaciones_revisadas": len(bloques), **reporte}), 200
+    except Exception as e:
+        print(f"Error revisando cruces: {e}")
+        return jsonify({"error": f"Error interno del servidor: {str(e)}"}), 500
+    finally:
+        cur.close()
+        conn.close()
+
+
+# -----------------------------
+# IMPORTACIÓN MASIVA (CSV / XLSX)
+# -----------------------------
+@horarios_bp.route("/horarios/importar", methods=["POST"])
+def importar():
+    """
+    multipart/form-data: archivo (.csv o .xlsx), periodo (para resolver secciones por código),
+    simular=true para validar sin escribir. Todo o nada: si alguna fila falla no se inserta
+    ninguna y se devuelve el detalle por fila.
+    """
+    archivo = request.files.get("archivo")
+    if not archivo or not archivo.filename:
+        return jsonify({"error": "⚠️ Debe adjuntar un archivo CSV o XLSX."}), 400
+    periodo = request.form.get("periodo") or None
+    simular = request.form.get("simular", "false").lower() in ("1", "true", "si", "sí")
+
+    try:
+        registros = interpretar_filas(leer_hoja(archivo.read(), archivo.filename))
+    except (ErrorHoja, ErrorImportacion) as e:
+        return jsonify({"error": f"⚠️ {str(e)}"}), 400
+    if not registros:
+        return jsonify({"error": "⚠️ El archivo no contiene filas de datos."}), 400
+
+    conn = get_db()
+    cur = conn.cursor()
+    try:
+        asegurar_franjas()
+        bloques, errores = validar_importacion(cur, registros, periodo)
+        if errores:
+            return jsonify({
+                "error": f"❌ {len(errores)} fila(s) con errores; no se registró ninguna asignación.",
+                "filas_leidas": len(registros),
+                "filas_validas": len(bloques),
+                "errores": [{"fila": fila, "errores": mensajes} for fila, mensajes in sorted(errores.items())]
+            }), 422
+
+        if simular:
+            conn.rollback()
+            return jsonify({
+                "mensaje": f"✅ Simulación correcta: {len(bloques)} bloque(s) listos para importar.",
+                "filas_leidas": len(registros),
+                "asignaciones": bloques
+            }), 200
+
+        ids = insertar_bloques(cur, bloques)
+        conn.commit()
+        return jsonify({
+            "mensaje": f"✅ Importación completada. ({len(ids)} bloque(s) creado(s))",
+            "filas_leidas": len(registros),
+            "asignacion_ids": ids
+        }), 201
+
+    except errors.ExclusionViolation as e:
+        conn.rollback()
+        recurso = "un docente" if e.diag.constraint_name == RESTRICCION_DOCENTE else "un aula"
+        return jsonify({
+            "error": f"El archivo genera un cruce de {recurso}; no se registró ninguna asignación.",
+            "detalle": e.diag.message_detail
+        }), 409
+    except Exception as e:
+        conn.rollback()
+        print(f"Error importando horario: {e}")
+        return jsonify({"error": f"Error interno del servidor: {str(e)}"}), 500
+    finally:
+        cur.close()
+        conn.close()
+
+
+# -----------------------------
+# PASO DE PERIODO (CLONAR HORARIO)
+# -----------------------------
+@horarios_bp.route("/horarios/clonar-periodo", methods=["POST"])
+def clonar():
+    """
+    Copia el horario de un periodo a otro en una sola transacción.
+    Body: {"origen": "2025-I", "destino": "2026-I", "copiar_secciones": true, "simular": false}
+    Con simular=true devuelve el diff (copiadas / omitidas con motivo) y deshace todo.
+    """
+    data = request.get_json() or {}
+    simular = bool(data.get("simular", False))
+
+    conn = get_db()
+    cur = conn.cursor()
+    try:
+        asegurar_franjas()
+        resultado = clonar_periodo(
+            cur, data.get("origen"), data.get("destino"),
+            copiar_secciones=bool(data.get("copiar_secciones", True))
+        )
+
+        if simular:
+            conn.rollback()
+            for copia in resultado["copiadas"]:
+                copia.pop("asignacion_id", None)
+            for seccion in resultado["secciones_creadas"]:
+                seccion.pop("seccion_id", None)
+            mensaje = (f"Simulación: se copiarían {len(resultado['copiadas'])} asignación(es) "
+                       f"y se omitirían {len(resultado['omitidas'])}.")
+            return jsonify({"mensaje": mensaje, "simulacion": True, **resultado}), 200
+
+        conn.commit()
+        mensaje = (f"✅ Periodo {resultado['destino']} preparado: {len(resultado['copiadas'])} asignación(es) "
+                   f"copiada(s), {len(resultado['omitidas'])} omitida(s).")
+        return jsonify({"mensaje": mensaje, "simulacion": False, **resultado}), 201
+
+    except ErrorPeriodo as e:
+        conn.rollback()
+        return jsonify({"error": f"⚠️ {str(e)}"}), 400
+    except errors.ExclusionViolation as e:
+        conn.rollback()
+        recurso = "un docente" if e.diag.constraint_name == RESTRICCION_DOCENTE else "un aula"
+        return jsonify({
+            "error": f"La copia genera un cruce de {recurso}; no se registró ninguna asignación.",
+            "detalle": e.diag.message_detail
+        }), 409
+    except Exception as e:
+        conn.rollback()
+        print(f"Error clonando periodo: {e}")
+        return jsonify({"error": f"Error interno del servidor: {str(e)}"}), 500
+    finally:
+        cur.close()
+        conn.close()
+
+
+# -----------------------------
+# UTILIZACIÓN DE AULAS (MAPA DE CALOR)
+# -----------------------------
+@horarios_bp.route("/horarios/utilizacion-aulas", methods=["GET"])
+def utilizacion_aulas():
+    """?periodo=2025-I[&pabellon_id=] -> matriz día × franja por aula y por pabellón."""
+    conn = get_db()
+    cur = conn.cursor()
+    try:
+        resultado = mapa_utilizacion(
+            cur, request.args.get("periodo"), request.args.get("pabellon_id", type=int)
+        )
+        return jsonify(resultado), 200
+    except Exception as e:
+        print(f"Error calculando utilización de aulas: {e}")
+        return jsonify({"error": f"Error interno del servidor: {str(e)}"}), 500
+    finally:
+        cur.close()
+        conn.close()
+
+
+# -----------------------------
+# OPTIMIZADOR DE AULAS (BEST-FIT)
+# -----------------------------
+@horarios_bp.route("/horarios/optimizar-aulas", methods=["GET"])
+def propuestas_aulas():
+    """?periodo=2025-I[&mismo_pabellon=true] -> reubicaciones propuestas. No escribe en la BD."""
+    periodo = request.args.get("periodo")
+    if not periodo:
+        return jsonify({"error": "⚠️ El periodo es obligatorio."}), 400
+    mismo_pabellon = request.args.get("mismo_pabellon", "false").lower() == "true"
+
+    conn = get_db()
+    cur = conn.cursor()
+    try:
+        return jsonify(proponer_reubicaciones(cur, periodo, mismo_pabellon)), 200
+    except Exception as e:
+        print(f"Error proponiendo reubicaciones: {e}")
+        return jsonify({"error": f"Error interno del servidor: {str(e)}"}), 500
+    finally:
+        cur.close()
+        conn.close()
+
+
+@horarios_bp.route("/horarios/optimizar-aulas", methods=["POST"])
+def aplicar_aulas():
+    """
+    Aplica las reubicaciones en un solo UPDATE.
+    Body: {"periodo": "2025-I", "mismo_pabellon": false,
+           "cambios": [{"asignacion_id", "aula_actual_id", "aula_propuesta_id"}]}
+    Sin "cambios" se recalculan y aplican todas las propuestas del periodo.
+    """
+    data = request.get_json() or {}
+    conn = get_db()
+    cur = conn.cursor()
+    try:
+        asegurar_franjas()
+        cambios = data.get("cambios")
+        if cambios is None:
+            if not data.get("periodo"):
+                return jsonify({"error": "⚠️ Indique el periodo o la lista de cambios."}), 400
+            propuesta = proponer_reubicaciones(cur, data["periodo"], bool(data.get("mismo_pabellon")))
+            cambios = [{"asignacion_id": p["asignacion_id"], "aula_actual_id": p["aula_actual_id"],
+                        "aula_propuesta_id": p["aula_propuesta_id"]} for p in propuesta["propuestas"]]
+        if not cambios:
+            return jsonify({"mensaje": "No hay reubicaciones que aplicar.", "asignacion_ids": []}), 200
+
+        filas = [(int(c["asignacion_id"]), int(c["aula_actual_id"]), int(c["aula_propuesta_id"])) for c in cambios]
+        ids = aplicar_reubicaciones(cur, filas)
+        conn.commit()
+        return jsonify({
+            "mensaje": f"✅ {len(ids)} asignación(es) reubicada(s).",
+            "asignacion_ids": ids
+        }), 200
+
+    except ErrorOptimizacion as e:
+        conn.rollback()
+        return jsonify({"error": f"⚠️ {str(e)}; vuelva a generar la propuesta."}), 409
+    except errors.ExclusionViolation as e:
+        conn.rollback()
+        return jsonify({
+            "error": "Las reubicaciones generan un cruce de aula; no se aplicó ningún cambio.",
+            "detalle": e.diag.message_detail
+        }), 409
+    except (KeyError, TypeError, ValueError) as e:
+        conn.rollback()
+        return jsonify({"error": f"Datos inválidos: {str(e)}"}), 400
+    except Exception as e:
+        conn.rollback()
+        print(f"Error aplicando reubicaciones: {e}")
+        return jsonify({"error": f"Error interno del servidor: {str(e)}"}), 500
+    finally:
+        cur.close()
+        conn.close()
+
+
+# -----------------------------
+# HORARIO DE UN AULA
+# -----------------------------
+@horarios_bp.route("/horarios/aula/<int:aula_id>", methods=["GET"])
+def horario_aula(aula_id):
+    """Grilla semanal de un aula (?periodo= para acotar a un semestre)."""
+    periodo = request.args.get("periodo")
+    conn = get_db()
+    try:
+        bloques = [b for b in obtener_bloques(conn, "aula", aula_id)
+                   if not periodo or b["periodo"] == periodo]
+        return jsonify({
+            "aula_id": aula_id,
+            "periodo": periodo,
+            "total": len(bloques),
+            "bloques": bloques,
+            "grilla": grilla_semanal(bloques)
+        }), 200
+    except Exception as e:
+        print(f"Error obteniendo horario del aula: {e}")
+        return jsonify({"error": f"Error interno del servidor: {str(e)}"}), 500
+    finally:
+        conn.close()
@@ -0,0 +1,23 @@
+from flask import Blueprint, request, jsonify
+from services.orden_merito import obtener_orden_merito
+
+orden_merito_bp = Blueprint("orden_merito", __name__)
+
+# -----------------------------
+# ORDEN DE MÉRITO POR ESCUELA Y CICLO
+# -----------------------------
+@orden_merito_bp.route("/orden-merito/<int:escuela_id>/<string:ciclo>", methods=["GET"])
+def ver_orden_merito(escuela_id, ciclo):
+    """
+    Ranking por promedio ponderado (créditos) de la cohorte.
+    Se lee de la tabla materializada; solo se recalcula si cambiaron notas.
+    """
+    limite = request.args.get("limite", type=int)
+    if limite is not None and limite <= 0:
+        return jsonify({"error": "⚠️ El límite debe ser mayor a 0."}), 400
+
+    try:
+        return jsonify(obtener_orden_merito(escuela_id, ciclo.upper(), limite)), 200
+    except Exception as e:
+        print(f"Error en orden-merito: {str(e)}")
+        return jsonify({"error": f"Error al obtener el orden de mérito: {str(e)}"}), 500
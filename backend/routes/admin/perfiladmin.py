@@ -3,6 +3,7 @@ from flask import Blueprint, request, jsonify
 from database.db import get_db
 from utils.security import hash_password, verify_password
 from psycopg2.extras import RealDictCursor
+from services import catalogos
 
 perfiladmin_bp = Blueprint("perfiladmin_bp", __name__)
 
@@ -241,35 +242,9 @@ def marcar_login(usuario_id):
 # ===========================
 @perfiladmin_bp.route("/escuelas", methods=["GET"])
 def obtener_escuelas():
-    conn = None
-    cur = None
-    
     try:
-        conn = get_db()
-        cur = conn.cursor()
-        
-        cur.execute("""
-            SELECT escuela_id, nombre_escuela, facultad 
-            FROM escuela 
-            ORDER BY nombre_escuela
-        """)
-        escuelas = cur.fetchall()
-        
-        return jsonify({
-            "escuelas": [
-                {
-                    "escuela_id": row[0],
-                    "nombre_escuela": row[1],
-                    "facultad": row[2]
-                } for row in escuelas
-            ]
-        })
+        return jsonify({"escuelas": catalogos.obtener("escuelas")})
         
     except Exception as e:
         print(f"❌ Error al obtener escuelas: {e}")
         return jsonify({"error": str(e)}), 500
-    finally:
-        if cur:
-            cur.close()
-        if conn:
-            conn.close()
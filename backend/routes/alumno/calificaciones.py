@@ -1,5 +1,7 @@
 from flask import Blueprint, jsonify
 from database.db import get_db
+from psycopg2.extras import RealDictCursor
+from services.historial_academico import obtener_historial
 
 calificaciones_bp = Blueprint('calificaciones', __name__)
 
@@ -12,8 +14,9 @@ def obtener_mis_calificaciones(estudiante_id):
     cur = None
     try:
         conn = get_db()
-        cur = conn.cursor()
+        cur = conn.cursor(cursor_factory=RealDictCursor)
         
+        # Las notas (NUMERIC) y las fechas las serializa el proveedor JSON de la app
         query = """
         SELECT 
             cal.id,
@@ -57,32 +60,7 @@ def obtener_mis_calificaciones(estudiante_id):
         """
         
         cur.execute(query, (estudiante_id,))
-        rows = cur.fetchall()
-
-        calificaciones = []
-        for row in rows:
-            calificaciones.append({
-                "id": row[0],
-                "estudiante_id": row[1],
-                "estudiante": row[2],
-                "curso_id": row[3],
-                "curso_codigo": row[4],
-                "curso_nombre": row[5],
-                "curso_ciclo": row[6],
-                "docente_id": row[7],
-                "docente": row[8],
-
-                # Notas
-                "practicas": float(row[9]) if row[9] is not None else None,
-                "parcial": float(row[10]) if row[10] is not None else None,
-                "final": float(row[11]) if row[11] is not None else None,
-                "sustitutorio": float(row[12]) if row[12] is not None else None,
-                "aplazado": float(row[13]) if row[13] is not None else None,
-                "promedio": float(row[14]) if row[14] is not None else None,
-                "estado": row[15],
-                "fecha_registro": str(row[16]),
-                "fecha_modificacion": str(row[17])
-            })
+        calificaciones = cur.fetchall()
 
         return jsonify({"calificaciones": calificaciones}), 200
 
@@ -97,3 +75,30 @@ def obtener_mis_calificaciones(estudiante_id):
             cur.close()
         if conn:
             conn.close()
+
+
+@calificaciones_bp.route("/historial-academico/<int:estudiante_id>", methods=['GET'])
+def obtener_historial_academico(estudiante_id):
+    """
+    Historial académico: promedio ponderado por créditos de cada ciclo,
+    créditos acumulados y cursos aprobados (mantenido al registrar notas).
+    """
+    try:
+        return jsonify(obtener_historial(estudiante_id)), 200
+    except Exception as e:
+        print(f"❌ Error al obtener historial académico: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@calificaciones_bp.route("/resumen-academico/<int:estudiante_id>", methods=['GET'])
+def obtener_resumen_academico(estudiante_id):
+    """Solo el resumen acumulado (promedio ponderado general y créditos)."""
+    try:
+        historial = obtener_historial(estudiante_id)
+        return jsonify({
+            "estudiante_id": estudiante_id,
+            "resumen": historial["resumen"]
+        }), 200
+    except Exception as e:
+        print(f"❌ Error al obtener resumen académico: {e}")
+        return jsonify({'error': str(e)}), 500
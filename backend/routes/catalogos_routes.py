@@ -0,0 +1,26 @@
+# routes/catalogos_routes.py
+from flask import Blueprint, jsonify
+from services import catalogos
+from utils.cache_http import respuesta_condicional
+
+catalogos_bp = Blueprint("catalogos", __name__)
+
+
+# ===========================
+# PAQUETE DE ARRANQUE DE LOS FORMULARIOS
+# ===========================
+@catalogos_bp.route("/bootstrap/<string:rol>", methods=["GET"])
+def paquete_arranque(rol):
+    """
+    Todos los datos de referencia de los formularios del rol (admin | superadmin) en una
+    respuesta, con el ubigeo como árbol [id, nombre, hijos]. Responde 304 si el
+    If-None-Match coincide con la versión vigente.
+    """
+    if rol not in catalogos.CATALOGOS_ROL:
+        return jsonify({"error": f"Rol no válido. Opciones: {', '.join(catalogos.CATALOGOS_ROL)}"}), 400
+    try:
+        paquete = catalogos.paquete_rol(rol)
+        return respuesta_condicional(paquete["contenido"], "application/json", paquete["etag"])
+    except Exception as e:
+        print(f"❌ Error al armar el paquete de catálogos: {e}")
+        return jsonify({"error": "Error interno al obtener los catálogos."}), 500
@@ -3,6 +3,8 @@ from flask import Blueprint, request, jsonify
 from database.db import get_db
 from psycopg2.extras import RealDictCursor
 import re
+from services.cascada import ErrorCascada, eliminar_en_cascada
+from utils.paginacion import ErrorListado, Listado, aplicar_cabeceras, paginar
 
 curso_bp = Blueprint("curso", __name__)
 
@@ -126,24 +128,51 @@ def crear_curso():
 # ===========================
 # LISTAR TODOS LOS CURSOS (RUTA PRINCIPAL)
 # ===========================
+LISTADO_CURSOS = Listado(
+    "cursos",
+    """
+        SELECT c.curso_id, c.codigo, c.nombre, c.creditos, c.ciclo, 
+               c.horas_teoricas, c.horas_practicas, c.tipo, c.estado, c.fecha_creacion
+        FROM curso c
+    """,
+    llave="curso_id",
+    orden={
+        "nombre": "t.nombre",
+        "codigo": "t.codigo",
+        "creditos": "t.creditos",
+    },
+    orden_defecto=[("nombre", "asc")],
+    filtros={
+        "estado": ("t.estado", "booleano"),
+        "ciclo": ("t.ciclo", "="),
+        "tipo": ("t.tipo", "="),
+        "codigo": ("t.codigo", "contiene"),
+        "nombre": ("t.nombre", "contiene"),
+    },
+    indices=(
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_curso_nombre_id ON curso (nombre, curso_id)",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_curso_codigo_id ON curso (codigo, curso_id)",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_curso_creditos_id ON curso (creditos, curso_id)",
+    ),
+)
+
+
 @curso_bp.route("/", methods=["GET"])
 def listar_cursos():
+    """Filtros y paginación opcionales: ?estado=&ciclo=&nombre=&limite=&cursor=&ordenar=&total="""
     conn = None
     cur = None
     try:
         conn = get_db()
         cur = conn.cursor(cursor_factory=RealDictCursor)
         
-        cur.execute("""
-            SELECT c.curso_id, c.codigo, c.nombre, c.creditos, c.ciclo, 
-                   c.horas_teoricas, c.horas_practicas, c.tipo, c.estado, c.fecha_creacion
-            FROM curso c
-            ORDER BY c.nombre ASC
-        """)
-        
-        cursos = cur.fetchall()
-        return jsonify(cursos), 200
+        cursos, meta = paginar(cur, LISTADO_CURSOS, request.args)
+        respuesta = jsonify(cursos)
+        aplicar_cabeceras(respuesta, meta, request.base_url, request.args)
+        return respuesta, 200
     
+    except ErrorListado as e:
+        return jsonify({"error": f"⚠️ {e}"}), 400
     except Exception as e:
         print(f"❌ Error en listar_cursos: {e}")
         return jsonify({"error": "Error interno al obtener la lista de cursos."}), 500
@@ -255,9 +284,19 @@ def actualizar_curso(curso_id):
 # ===========================
 # ELIMINAR CURSO (CON ELIMINACIÓN EN CASCADA)
 # ===========================
+# Tablas que el borrado de un curso elimina aunque su FK no sea ON DELETE CASCADE
+TABLAS_ELIMINAR_CURSO = ("matriculas", "asignaciones", "seccion", "prerrequisito")
+
+
 @curso_bp.route("/eliminar/<int:curso_id>", methods=["DELETE"])
 def eliminar_curso(curso_id):
-    """Elimina un curso y todas sus dependencias (asignaciones, secciones, matrículas, etc.)."""
+    """
+    Elimina un curso y sus dependencias (asignaciones, matrículas, secciones, prerrequisitos).
+    El orden lo arma services.cascada desde las llaves foráneas; si otras tablas protegidas
+    (calificaciones, asistencias...) tienen registros se responde 409 con la lista.
+    ?simular=true solo cuenta.
+    """
+    simular = request.args.get("simular", "false").lower() == "true"
     conn = None
     cur = None
     try:
@@ -272,58 +311,42 @@ def eliminar_curso(curso_id):
 
         print(f"🗑️ Iniciando eliminación del curso: {curso[0]} - {curso[1]}")
 
-        # 1️⃣ Eliminar matrículas de las secciones de este curso
-        cur.execute("""
-            DELETE FROM matriculas 
-            WHERE asignacion_id IN (
-                SELECT asignacion_id FROM asignaciones WHERE curso_id = %s
-            )
-        """, (curso_id,))
-        matriculas_eliminadas = cur.rowcount
-        print(f"   ✓ Matrículas eliminadas: {matriculas_eliminadas}")
-
-        # 2️⃣ Eliminar asignaciones del curso
-        cur.execute("DELETE FROM asignaciones WHERE curso_id = %s", (curso_id,))
-        asignaciones_eliminadas = cur.rowcount
-        print(f"   ✓ Asignaciones eliminadas: {asignaciones_eliminadas}")
-
-        # 3️⃣ Eliminar secciones del curso (si existen)
-        try:
-            cur.execute("DELETE FROM seccion WHERE curso_id = %s", (curso_id,))
-            secciones_eliminadas = cur.rowcount
-            print(f"   ✓ Secciones eliminadas: {secciones_eliminadas}")
-        except Exception as e:
-            print(f"   ⚠️ No se encontraron secciones o no existen: {str(e)}")
-            secciones_eliminadas = 0
-
-        # 4️⃣ Eliminar prerrequisitos (donde este curso es requisito o es requerido)
-        try:
-            cur.execute("""
-                DELETE FROM prerrequisito 
-                WHERE id_curso = %s OR id_curso_requerido = %s
-            """, (curso_id, curso_id))
-            prerrequisitos_eliminados = cur.rowcount
-            print(f"   ✓ Prerrequisitos eliminados: {prerrequisitos_eliminados}")
-        except Exception as e:
-            print(f"   ⚠️ No se encontraron prerrequisitos: {str(e)}")
-            prerrequisitos_eliminados = 0
-
-        # 5️⃣ Finalmente eliminar el curso
-        cur.execute("DELETE FROM curso WHERE curso_id = %s", (curso_id,))
-        print(f"   ✓ Curso eliminado exitosamente")
+        resultado = eliminar_en_cascada(
+            cur, "curso", [curso_id], simular=simular,
+            permitidas=TABLAS_ELIMINAR_CURSO, relacionadas=[("seccion", "curso_id")]
+        )
+        conteos = resultado["conteos"]
+        for tabla in resultado["orden"]:
+            print(f"   ✓ {tabla}: {conteos[tabla]}")
+
+        detalles = {
+            "matriculas_eliminadas": conteos.get("matriculas", 0),
+            "asignaciones_eliminadas": conteos.get("asignaciones", 0),
+            "secciones_eliminadas": conteos.get("seccion", 0),
+            "prerrequisitos_eliminados": conteos.get("prerrequisito", 0)
+        }
+
+        if simular:
+            conn.rollback()
+            return jsonify({
+                "mensaje": "Simulación: no se eliminó nada.",
+                "detalles": detalles,
+                **resultado
+            }), 200
 
         conn.commit()
         
         return jsonify({
             "mensaje": "Curso y todas sus dependencias eliminadas exitosamente ✅",
-            "detalles": {
-                "matriculas_eliminadas": matriculas_eliminadas,
-                "asignaciones_eliminadas": asignaciones_eliminadas,
-                "secciones_eliminadas": secciones_eliminadas,
-                "prerrequisitos_eliminados": prerrequisitos_eliminados
-            }
+            "detalles": detalles,
+            "conteos": conteos,
+            "omitidas": resultado["omitidas"]
         }), 200
 
+    except ErrorCascada as e:
+        if conn:
+            conn.rollback()
+        return jsonify({"error": str(e), "dependientes": e.dependientes}), 409
     except Exception as e:
         if conn: 
             conn.rollback()
@@ -11,6 +11,8 @@ from .perfil_routes import perfil_bp
 from .material_routes import material_bp
 from .calendario_routes import calendario_bp
 from .asistencia_routes import asistencia_bp  # ⬅️ NUEVO
+from .tareas_routes import tareas_bp
+from .exportar_routes import exportar_bp
 
 # Registrar sub-blueprints
 docentes_bp.register_blueprint(calificaciones_bp, url_prefix="/calificaciones")
@@ -20,3 +22,5 @@ docentes_bp.register_blueprint(perfil_bp, url_prefix="/perfil")
 docentes_bp.register_blueprint(material_bp, url_prefix="/material")
 docentes_bp.register_blueprint(calendario_bp, url_prefix="/calendario")
 docentes_bp.register_blueprint(asistencia_bp, url_prefix="/asistencia")
+docentes_bp.register_blueprint(tareas_bp, url_prefix="/reportes/tareas")
+docentes_bp.register_blueprint(exportar_bp, url_prefix="/exportar")
@@ -1,5 +1,7 @@
 from flask import Blueprint, jsonify, request
 from database.db import get_db
+from services.reportes import construir_informe_asistencia
+from utils.json_stream import respuesta_json_stream
 from datetime import datetime, date
 
 asistencia_bp = Blueprint('asistencia', __name__)
@@ -326,24 +328,9 @@ def obtener_historial_asistencia(asignacion_id):
             ORDER BY sc.fecha DESC, sc.hora_inicio DESC
         """
         
-        cur.execute(query, (curso_id, seccion_id))
-        rows = cur.fetchall()
-        
-        historial = []
-        for row in rows:
-            historial.append({
-                'sesion_id': row[0],
-                'fecha': str(row[1]) if row[1] else None,
-                'hora_inicio': str(row[2]) if row[2] else None,
-                'hora_fin': str(row[3]) if row[3] else None,
-                'observaciones': row[4],
-                'total_estudiantes': row[5],
-                'presentes': row[6],
-                'ausentes': row[7],
-                'tardanzas': row[8]
-            })
-        
-        return jsonify({'historial': historial}), 200
+        # Se envía por partes desde un cursor de servidor (fechas y horas las
+        # serializa el proveedor JSON de la app)
+        return respuesta_json_stream(query, (curso_id, seccion_id), clave='historial')
         
     except Exception as e:
         print(f"❌ Error al obtener historial: {e}")
@@ -483,120 +470,11 @@ def obtener_informe_asistencia(asignacion_id):
         conn = get_db()
         cur = conn.cursor()
         
-        # 1. Obtener información del curso
-        cur.execute("""
-            SELECT c.nombre, s.codigo, a.docente_id
-            FROM asignaciones a
-            JOIN curso c ON a.curso_id = c.curso_id
-            JOIN secciones s ON a.seccion_id = s.seccion_id
-            WHERE a.asignacion_id = %s
-        """, (asignacion_id,))
-        
-        curso_info = cur.fetchone()
-        if not curso_info:
+        informe = construir_informe_asistencia(cur, asignacion_id)
+        if informe is None:
             return jsonify({'error': 'Curso no encontrado'}), 404
-        
-        # 2. Obtener todas las sesiones del curso
-        cur.execute("""
-            SELECT 
-                sc.sesion_id,
-                sc.fecha,
-                sc.hora_inicio,
-                sc.hora_fin
-            FROM sesion_clase sc
-            JOIN asignaciones a ON sc.curso_id = a.curso_id AND sc.seccion_id = a.seccion_id
-            WHERE a.asignacion_id = %s
-            ORDER BY sc.fecha ASC
-        """, (asignacion_id,))
-        
-        sesiones = []
-        for row in cur.fetchall():
-            sesiones.append({
-                'sesion_id': row[0],
-                'fecha': str(row[1]),
-                'hora_inicio': str(row[2]) if row[2] else None,
-                'hora_fin': str(row[3]) if row[3] else None
-            })
-        
-        # 3. Obtener estudiantes con su asistencia
-        cur.execute("""
-            SELECT 
-                e.estudiante_id,
-                p.nombres,
-                p.apellidos,
-                e.codigo_universitario,
-                m.matricula_id
-            FROM matriculas m
-            JOIN estudiante e ON m.estudiante_id = e.estudiante_id
-            JOIN persona p ON e.persona_id = p.persona_id
-            WHERE m.asignacion_id = %s
-            AND m.estado = 'ACTIVA'
-            ORDER BY p.apellidos, p.nombres
-        """, (asignacion_id,))
-        
-        estudiantes = []
-        for row in cur.fetchall():
-            estudiante_id = row[0]
-            matricula_id = row[4]
-            
-            # Obtener todas las asistencias del estudiante
-            cur.execute("""
-                SELECT 
-                    a.sesion_id,
-                    a.estado,
-                    sc.fecha
-                FROM asistencia a
-                JOIN sesion_clase sc ON a.sesion_id = sc.sesion_id
-                WHERE a.matricula_id = %s
-                ORDER BY sc.fecha ASC
-            """, (matricula_id,))
-            
-            asistencias_dict = {}
-            total_sesiones = 0
-            presentes = 0
-            ausentes = 0
-            tardanzas = 0
-            
-            for ast_row in cur.fetchall():
-                sesion_id = ast_row[0]
-                estado = ast_row[1]
-                fecha = str(ast_row[2])
-                
-                asistencias_dict[sesion_id] = estado
-                total_sesiones += 1
-                
-                if estado == 'Presente':
-                    presentes += 1
-                elif estado == 'Ausente':
-                    ausentes += 1
-                elif estado == 'Tardanza':
-                    tardanzas += 1
-            
-            # Calcular porcentaje
-            porcentaje = round((presentes / total_sesiones * 100), 2) if total_sesiones > 0 else 0
-            
-            estudiantes.append({
-                'estudiante_id': estudiante_id,
-                'nombres': row[1],
-                'apellidos': row[2],
-                'codigo_universitario': row[3],
-                'matricula_id': matricula_id,
-                'asistencias': asistencias_dict,
-                'total_sesiones': total_sesiones,
-                'presentes': presentes,
-                'ausentes': ausentes,
-                'tardanzas': tardanzas,
-                'porcentaje': porcentaje
-            })
-        
-        return jsonify({
-            'curso': {
-                'nombre': curso_info[0],
-                'seccion': curso_info[1]
-            },
-            'sesiones': sesiones,
-            'estudiantes': estudiantes
-        }), 200
+
+        return jsonify(informe), 200
         
     except Exception as e:
         print(f"❌ Error al obtener informe: {e}")
@@ -1,83 +1,42 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, request
 from database.db import get_db
+from services.horario_semanal import obtener_bloques
+from services.calendario_ics import ErrorCalendario, SEMANAS_PERIODO, inicio_periodo, obtener_feed
+from utils.cache_http import respuesta_condicional
 
 calendario_bp = Blueprint('calendario', __name__)
 
 @calendario_bp.route("/horario/<int:docente_id>", methods=['GET'])
 def horario_docente(docente_id):
     conn = None
-    cur = None
     try:
         conn = get_db() 
-        cur = conn.cursor()
-        
-        # Verificar si el docente tiene asignaciones
-        cur.execute("SELECT COUNT(*) FROM asignaciones WHERE docente_id = %s", (docente_id,))
-        count = cur.fetchone()[0]
-        print(f"✅ Asignaciones encontradas para docente {docente_id}: {count}")
-        
-        # Consulta SQL con LEFT JOIN para incluir asignaciones sin bloque horario
-        query = """
-            SELECT 
-                c.nombre AS curso,
-                c.codigo AS codigo_curso,
-                s.codigo AS seccion,
-                bh.dia,
-                bh.hora_inicio,
-                bh.hora_fin,
-                bh.codigo_bloque,
-                a.aula_id,
-                a.cantidad_estudiantes,
-                a.bloque_id,
-                CASE 
-                    WHEN bh.bloque_id IS NULL THEN 'Sin horario asignado'
-                    ELSE 'OK'
-                END AS estado_bloque
-            FROM asignaciones a
-            JOIN curso c ON a.curso_id = c.curso_id 
-            JOIN secciones s ON a.seccion_id = s.seccion_id
-            LEFT JOIN bloque_horario bh ON a.bloque_id = bh.bloque_id
-            WHERE a.docente_id = %s
-            ORDER BY 
-                CASE 
-                    WHEN bh.dia = 'Lunes' THEN 1
-                    WHEN bh.dia = 'Martes' THEN 2
-                    WHEN bh.dia = 'Miercoles' THEN 3
-                    WHEN bh.dia = 'Miércoles' THEN 3
-                    WHEN bh.dia = 'Jueves' THEN 4
-                    WHEN bh.dia = 'Viernes' THEN 5
-                    WHEN bh.dia = 'Sábado' THEN 6
-                    WHEN bh.dia = 'Sabado' THEN 6
-                    WHEN bh.dia = 'Domingo' THEN 7
-                    ELSE 8
-                END,
-                bh.hora_inicio NULLS LAST
-        """
-        
-        cur.execute(query, (docente_id,))
-        column_names = [desc[0] for desc in cur.description]
-        rows = cur.fetchall()
 
-        print(f"✅ Filas de horario encontradas: {len(rows)}")
+        # Día y hora salen de 'asignaciones' (ya no de bloque_horario); el servicio
+        # ordena los bloques y los guarda en caché hasta que cambien los datos.
+        bloques = obtener_bloques(conn, "docente", docente_id)
 
-        if not rows:
+        if not bloques:
             return jsonify({
                 'message': 'No se encontró horario para el docente.',
                 'docente_id': docente_id
             }), 404
 
-        # Convertir los resultados a lista de diccionarios
-        horario = []
-        for row in rows:
-            item = dict(zip(column_names, row))
-            # Convertir objetos time a strings
-            if 'hora_inicio' in item and item['hora_inicio']:
-                item['hora_inicio'] = str(item['hora_inicio'])
-            if 'hora_fin' in item and item['hora_fin']:
-                item['hora_fin'] = str(item['hora_fin'])
-            horario.append(item)
+        horario = [{
+            'curso': b['curso'],
+            'codigo_curso': b['codigo_curso'],
+            'seccion': b['seccion'],
+            'dia': b['dia'],
+            'hora_inicio': f"{b['hora_inicio']}:00" if b['hora_inicio'] else None,
+            'hora_fin': f"{b['hora_fin']}:00" if b['hora_fin'] else None,
+            'codigo_bloque': b['codigo_bloque'],
+            'tipo': b['tipo'],
+            'aula_id': b['aula_id'],
+            'cantidad_estudiantes': b['cantidad_estudiantes'],
+            'bloque_id': b['bloque_id'],
+            'estado_bloque': 'OK' if b['dia'] and b['hora_inicio'] else 'Sin horario asignado',
+        } for b in bloques]
 
-        print(f"✅ Horario generado exitosamente con {len(horario)} bloques")
         return jsonify(horario), 200
 
     except Exception as e:
@@ -92,8 +51,33 @@ def horario_docente(docente_id):
         }), 500
     
     finally:
-        if cur:
-            cur.close()
+        if conn:
+            conn.close()
+
+
+@calendario_bp.route("/horario/<int:docente_id>.ics", methods=['GET'])
+def calendario_docente(docente_id):
+    """Horario del docente en formato iCalendar (?inicio=AAAA-MM-DD&semanas=17), con ETag."""
+    conn = None
+    try:
+        conn = get_db()
+        feed = obtener_feed(
+            conn, "docente", docente_id, "Horario docente",
+            inicio_periodo(request.args.get('inicio')),
+            request.args.get('semanas', SEMANAS_PERIODO, type=int)
+        )
+        return respuesta_condicional(
+            feed["contenido"], "text/calendar", feed["etag"], feed["ultima_modificacion"],
+            nombre_archivo=f"horario-docente-{docente_id}.ics"
+        )
+
+    except ErrorCalendario as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        print(f"❌ Error al generar calendario del docente {docente_id}: {e}")
+        return jsonify({'error': 'Error al generar el calendario', 'detalle': str(e)}), 500
+
+    finally:
         if conn:
             conn.close()
 
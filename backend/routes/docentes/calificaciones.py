@@ -2,6 +2,7 @@ from flask import Blueprint, request, jsonify
 from database.db import get_db
 from psycopg2.extras import RealDictCursor
 from datetime import datetime
+from services.historial_academico import recalcular_historial
 
 calificaciones_bp = Blueprint("calificaciones", __name__)
 
@@ -89,6 +90,9 @@ def registrar_calificacion():
             ))
             mensaje = "✅ Calificación registrada correctamente"
 
+        # 📊 Mantener el historial académico (promedio ponderado del ciclo)
+        recalcular_historial(cur, estudiante_id, curso_id)
+
         conn.commit()
         return jsonify({"mensaje": mensaje, "promedio": promedio, "estado": estado}), 200
 
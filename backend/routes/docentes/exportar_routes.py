@@ -0,0 +1,246 @@
+from flask import Blueprint, Response, jsonify, request
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from database.db import get_db, conectar, iterar_consulta
+from services.historial_academico import SIN_CICLO
+from services.reportes import docente_tiene_asignacion
+from utils.hojas_calculo import MIMETYPES, generar_hoja
+import re
+
+exportar_bp = Blueprint('exportar', __name__)
+
+ESTADOS_ASISTENCIA = ('Presente', 'Ausente', 'Tardanza')
+
+# Última calificación registrada del estudiante en el curso
+_NOTA_VIGENTE = """
+    LEFT JOIN LATERAL (
+        SELECT cal.practicas, cal.parcial, cal.final, cal.sustitutorio, cal.promedio, cal.estado
+        FROM calificaciones cal
+        WHERE cal.estudiante_id = m.estudiante_id AND cal.curso_id = a.curso_id
+        ORDER BY COALESCE(cal.fecha_modificacion, cal.fecha_registro) DESC NULLS LAST
+        LIMIT 1
+    ) nota ON TRUE
+"""
+
+ENCABEZADOS_NOTAS = ['Práctica', 'Parcial', 'Final', 'Sustitutorio', 'Promedio', 'Estado']
+
+
+def _formato():
+    formato = request.args.get('formato', 'csv').lower()
+    return formato if formato in MIMETYPES else None
+
+
+def _nombre_archivo(*partes):
+    base = "_".join(str(p) for p in partes if p)
+    return re.sub(r'[^A-Za-z0-9_-]+', '-', base).strip('-') or 'exportacion'
+
+
+def _filas_streaming(consulta, parametros, transformar=None):
+    """
+    Filas leídas con cursor de servidor sobre una conexión propia: la del request
+    ya se habrá cerrado cuando la respuesta empiece a enviarse.
+    """
+    conn = conectar()
+    try:
+        for fila in iterar_consulta(conn, consulta, parametros):
+            yield transformar(fila) if transformar else fila
+    finally:
+        conn.close()
+
+
+def _respuesta(formato, nombre, encabezados, filas, hoja):
+    return Response(
+        generar_hoja(formato, encabezados, filas, hoja),
+        mimetype=MIMETYPES[formato],
+        headers={'Content-Disposition': f'attachment; filename="{nombre}.{formato}"'}
+    )
+
+
+def _datos_asignacion(cur, asignacion_id):
+    cur.execute("""
+        SELECT c.codigo, c.nombre, s.codigo
+        FROM asignaciones a
+        JOIN curso c ON a.curso_id = c.curso_id
+        JOIN secciones s ON a.seccion_id = s.seccion_id
+        WHERE a.asignacion_id = %s
+    """, (asignacion_id,))
+    return cur.fetchone()
+
+
+# 1. ACTA DE NOTAS DE UNA ASIGNACIÓN
+@exportar_bp.route("/calificaciones/<int:asignacion_id>", methods=['GET'])
+@jwt_required()
+def exportar_calificaciones(asignacion_id):
+    formato = _formato()
+    if not formato:
+        return jsonify({'error': 'Formato no válido. Use csv o xlsx'}), 400
+
+    conn = get_db()
+    cur = conn.cursor()
+    try:
+        datos = _datos_asignacion(cur, asignacion_id)
+        if not datos:
+            return jsonify({'error': 'Asignación no encontrada'}), 404
+        if not docente_tiene_asignacion(cur, get_jwt_identity(), asignacion_id):
+            return jsonify({'error': 'No tienes permisos para esta asignación'}), 403
+    except Exception as e:
+        print(f"❌ Error al exportar calificaciones: {e}")
+        return jsonify({'error': str(e)}), 500
+    finally:
+        cur.close()
+        conn.close()
+
+    consulta = f"""
+        SELECT e.codigo_universitario, p.apellidos, p.nombres,
+               nota.practicas, nota.parcial, nota.final, nota.sustitutorio, nota.promedio, nota.estado
+        FROM asignaciones a
+        JOIN matriculas m ON m.asignacion_id = a.asignacion_id AND m.estado = 'ACTIVA'
+        JOIN estudiante e ON m.estudiante_id = e.estudiante_id
+        JOIN persona p ON e.persona_id = p.persona_id
+        {_NOTA_VIGENTE}
+        WHERE a.asignacion_id = %s
+        ORDER BY p.apellidos, p.nombres
+    """
+    encabezados = ['Código', 'Apellidos', 'Nombres'] + ENCABEZADOS_NOTAS
+    return _respuesta(
+        formato, _nombre_archivo('acta', datos[0], datos[2]), encabezados,
+        _filas_streaming(consulta, (asignacion_id,)), 'Acta de notas'
+    )
+
+
+# 2. HOJA DE ASISTENCIA DE UNA ASIGNACIÓN (una columna por sesión)
+@exportar_bp.route("/asistencia/<int:asignacion_id>", methods=['GET'])
+@jwt_required()
+def exportar_asistencia(asignacion_id):
+    formato = _formato()
+    if not formato:
+        return jsonify({'error': 'Formato no válido. Use csv o xlsx'}), 400
+
+    conn = get_db()
+    cur = conn.cursor()
+    try:
+        datos = _datos_asignacion(cur, asignacion_id)
+        if not datos:
+            return jsonify({'error': 'Asignación no encontrada'}), 404
+        if not docente_tiene_asignacion(cur, get_jwt_identity(), asignacion_id):
+            return jsonify({'error': 'No tienes permisos para esta asignación'}), 403
+
+        # Las sesiones son pocas: definen las columnas de la hoja
+        cur.execute("""
+            SELECT sc.fecha
+            FROM sesion_clase sc
+            JOIN asignaciones a ON sc.curso_id = a.curso_id AND sc.seccion_id = a.seccion_id
+            WHERE a.asignacion_id = %s
+            ORDER BY sc.fecha, sc.sesion_id
+        """, (asignacion_id,))
+        fechas = [str(fila[0]) for fila in cur.fetchall()]
+    except Exception as e:
+        print(f"❌ Error al exportar asistencia: {e}")
+        return jsonify({'error': str(e)}), 500
+    finally:
+        cur.close()
+        conn.close()
+
+    consulta = """
+        WITH sesiones AS (
+            SELECT sc.sesion_id, sc.fecha
+            FROM sesion_clase sc
+            JOIN asignaciones a ON sc.curso_id = a.curso_id AND sc.seccion_id = a.seccion_id
+            WHERE a.asignacion_id = %(asignacion_id)s
+        )
+        SELECT e.codigo_universitario, p.apellidos, p.nombres,
+               array_agg(ast.estado ORDER BY ses.fecha, ses.sesion_id) FILTER (WHERE ses.sesion_id IS NOT NULL)
+        FROM matriculas m
+        JOIN estudiante e ON m.estudiante_id = e.estudiante_id
+        JOIN persona p ON e.persona_id = p.persona_id
+        LEFT JOIN sesiones ses ON TRUE
+        LEFT JOIN asistencia ast ON ast.matricula_id = m.matricula_id AND ast.sesion_id = ses.sesion_id
+        WHERE m.asignacion_id = %(asignacion_id)s AND m.estado = 'ACTIVA'
+        GROUP BY m.matricula_id, e.codigo_universitario, p.apellidos, p.nombres
+        ORDER BY p.apellidos, p.nombres
+    """
+
+    def transformar(fila):
+        estados = fila[3] or []
+        registradas = [estado for estado in estados if estado]
+        presentes = registradas.count('Presente')
+        porcentaje = round(presentes / len(registradas) * 100, 2) if registradas else 0
+        return (list(fila[:3]) + [estado or '' for estado in estados]
+                + [registradas.count(estado) for estado in ESTADOS_ASISTENCIA] + [porcentaje])
+
+    encabezados = (['Código', 'Apellidos', 'Nombres'] + fechas
+                   + ['Presentes', 'Ausentes', 'Tardanzas', '% Asistencia'])
+    return _respuesta(
+        formato, _nombre_archivo('asistencia', datos[0], datos[2]), encabezados,
+        _filas_streaming(consulta, {'asignacion_id': asignacion_id}, transformar), 'Asistencia'
+    )
+
+
+# 3. ACTAS DE TODO UN CICLO
+@exportar_bp.route("/calificaciones/ciclo/<string:ciclo>", methods=['GET'])
+def exportar_calificaciones_ciclo(ciclo):
+    """Una fila por estudiante y asignación del ciclo. Filtro opcional ?escuela_id="""
+    formato = _formato()
+    if not formato:
+        return jsonify({'error': 'Formato no válido. Use csv o xlsx'}), 400
+    escuela_id = request.args.get('escuela_id', type=int)
+
+    consulta = f"""
+        SELECT c.codigo, c.nombre, s.codigo,
+               e.codigo_universitario, p.apellidos, p.nombres,
+               nota.practicas, nota.parcial, nota.final, nota.sustitutorio, nota.promedio, nota.estado
+        FROM asignaciones a
+        JOIN curso c ON a.curso_id = c.curso_id
+        JOIN secciones s ON a.seccion_id = s.seccion_id
+        JOIN matriculas m ON m.asignacion_id = a.asignacion_id AND m.estado = 'ACTIVA'
+        JOIN estudiante e ON m.estudiante_id = e.estudiante_id
+        JOIN persona p ON e.persona_id = p.persona_id
+        {_NOTA_VIGENTE}
+        WHERE COALESCE(c.ciclo, %(sin_ciclo)s) = %(ciclo)s
+          AND (%(escuela_id)s::int IS NULL OR e.escuela_id = %(escuela_id)s)
+        ORDER BY c.codigo, s.codigo, p.apellidos, p.nombres
+    """
+    parametros = {'ciclo': ciclo, 'sin_ciclo': SIN_CICLO, 'escuela_id': escuela_id}
+    encabezados = ['Código curso', 'Curso', 'Sección', 'Código', 'Apellidos', 'Nombres'] + ENCABEZADOS_NOTAS
+    return _respuesta(
+        formato, _nombre_archivo('actas_ciclo', ciclo, escuela_id), encabezados,
+        _filas_streaming(consulta, parametros), f'Ciclo {ciclo}'
+    )
+
+
+# 4. RESUMEN DE ASISTENCIA DE TODO UN CICLO
+@exportar_bp.route("/asistencia/ciclo/<string:ciclo>", methods=['GET'])
+def exportar_asistencia_ciclo(ciclo):
+    """Totales de asistencia por estudiante y asignación del ciclo. Filtro opcional ?escuela_id="""
+    formato = _formato()
+    if not formato:
+        return jsonify({'error': 'Formato no válido. Use csv o xlsx'}), 400
+    escuela_id = request.args.get('escuela_id', type=int)
+
+    consulta = """
+        SELECT c.codigo, c.nombre, s.codigo,
+               e.codigo_universitario, p.apellidos, p.nombres,
+               COUNT(ast.sesion_id),
+               COUNT(*) FILTER (WHERE ast.estado = 'Presente'),
+               COUNT(*) FILTER (WHERE ast.estado = 'Ausente'),
+               COUNT(*) FILTER (WHERE ast.estado = 'Tardanza'),
+               COALESCE(ROUND(100.0 * COUNT(*) FILTER (WHERE ast.estado = 'Presente')
+                              / NULLIF(COUNT(ast.sesion_id), 0), 2), 0)
+        FROM asignaciones a
+        JOIN curso c ON a.curso_id = c.curso_id
+        JOIN secciones s ON a.seccion_id = s.seccion_id
+        JOIN matriculas m ON m.asignacion_id = a.asignacion_id AND m.estado = 'ACTIVA'
+        JOIN estudiante e ON m.estudiante_id = e.estudiante_id
+        JOIN persona p ON e.persona_id = p.persona_id
+        LEFT JOIN asistencia ast ON ast.matricula_id = m.matricula_id
+        WHERE COALESCE(c.ciclo, %(sin_ciclo)s) = %(ciclo)s
+          AND (%(escuela_id)s::int IS NULL OR e.escuela_id = %(escuela_id)s)
+        GROUP BY m.matricula_id, c.codigo, c.nombre, s.codigo, e.codigo_universitario, p.apellidos, p.nombres
+        ORDER BY c.codigo, s.codigo, p.apellidos, p.nombres
+    """
+    parametros = {'ciclo': ciclo, 'sin_ciclo': SIN_CICLO, 'escuela_id': escuela_id}
+    encabezados = ['Código curso', 'Curso', 'Sección', 'Código', 'Apellidos', 'Nombres',
+                   'Sesiones', 'Presentes', 'Ausentes', 'Tardanzas', '% Asistencia']
+    return _respuesta(
+        formato, _nombre_archivo('asistencia_ciclo', ciclo, escuela_id), encabezados,
+        _filas_streaming(consulta, parametros), f'Asistencia {ciclo}'
+    )
@@ -0,0 +1,87 @@
+from flask import Blueprint, jsonify, request, url_for
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from database.db import get_db
+from services.tareas_reportes import ErrorPermiso, ErrorTarea, encolar_reporte, obtener_tarea
+
+tareas_bp = Blueprint('tareas_reportes', __name__)
+
+
+def _con_enlaces(tarea):
+    tarea['url_estado'] = url_for('.estado_tarea', tarea_id=tarea['tarea_id'])
+    tarea['url_resultado'] = url_for('.descargar_resultado', tarea_id=tarea['tarea_id'])
+    return tarea
+
+
+# 1. ENCOLAR UN REPORTE
+@tareas_bp.route("", methods=['POST'])
+@jwt_required()
+def encolar_tarea():
+    """
+    Body: {"tipo": "informe_asistencia", "parametros": {"asignacion_id": 5}}
+    El docente es siempre el del token. Responde 202 con la tarea creada, o 200 si ya
+    hay un resultado vigente para los mismos datos.
+    """
+    data = request.get_json(silent=True) or {}
+    usuario_id = get_jwt_identity()
+    conn = get_db()
+    try:
+        tarea, reutilizada = encolar_reporte(conn, data.get('tipo'), data.get('parametros') or {}, usuario_id)
+        codigo = 200 if tarea['estado'] == 'COMPLETADO' else 202
+        respuesta = jsonify({**_con_enlaces(tarea), 'reutilizada': reutilizada})
+        respuesta.headers['Location'] = tarea['url_estado']
+        return respuesta, codigo
+
+    except ErrorPermiso as e:
+        return jsonify({'error': str(e)}), 403
+    except ErrorTarea as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        print(f"❌ Error al encolar reporte: {e}")
+        return jsonify({'error': str(e)}), 500
+    finally:
+        conn.close()
+
+
+# 2. CONSULTAR ESTADO
+@tareas_bp.route("/<string:tarea_id>", methods=['GET'])
+@jwt_required()
+def estado_tarea(tarea_id):
+    conn = get_db()
+    try:
+        tarea = obtener_tarea(conn, tarea_id, get_jwt_identity())
+        if not tarea:
+            return jsonify({'error': 'Tarea no encontrada'}), 404
+        return jsonify(_con_enlaces(tarea)), 200
+
+    except Exception as e:
+        print(f"❌ Error al consultar tarea: {e}")
+        return jsonify({'error': str(e)}), 500
+    finally:
+        conn.close()
+
+
+# 3. DESCARGAR RESULTADO
+@tareas_bp.route("/<string:tarea_id>/resultado", methods=['GET'])
+@jwt_required()
+def descargar_resultado(tarea_id):
+    conn = get_db()
+    try:
+        tarea = obtener_tarea(conn, tarea_id, get_jwt_identity(), con_resultado=True)
+        if not tarea:
+            return jsonify({'error': 'Tarea no encontrada'}), 404
+        if tarea['estado'] == 'FALLIDO':
+            return jsonify({'error': tarea['error'], 'estado': tarea['estado']}), 422
+        if tarea['estado'] != 'COMPLETADO':
+            return jsonify({'mensaje': 'El reporte aún se está generando', 'estado': tarea['estado']}), 202
+
+        respuesta = jsonify(tarea['resultado'])
+        if request.args.get('descargar', 'true').lower() != 'false':
+            nombre = f"{tarea['tipo']}_{tarea_id[:8]}.json"
+            respuesta.headers['Content-Disposition'] = f'attachment; filename="{nombre}"'
+        return respuesta, 200
+
+    except Exception as e:
+        print(f"❌ Error al descargar resultado: {e}")
+        return jsonify({'error': str(e)}), 500
+    finally:
+        conn.close()
@@ -13,6 +13,7 @@ from .prerrequisitos import prerrequisitos_bp
 from .pabellones import pabellones_bp
 from .aulas import aulas_bp
 from .secciones import secciones_bp  # 👈 Agrega esta línea
+from .impacto import impacto_bp
 
 # ====== Registrar los blueprints internos ======
 superadmin_bp.register_blueprint(admins_bp, url_prefix="/admins")
@@ -24,6 +25,7 @@ superadmin_bp.register_blueprint(prerrequisitos_bp, url_prefix="")
 superadmin_bp.register_blueprint(pabellones_bp, url_prefix="/pabellones")
 superadmin_bp.register_blueprint(aulas_bp, url_prefix="/aulas")
 superadmin_bp.register_blueprint(secciones_bp)
+superadmin_bp.register_blueprint(impacto_bp, url_prefix="")
 
 # 👇 Añade esto al final (import explícito)
 __all__ = ["superadmin_bp"]
\ No newline at end of file
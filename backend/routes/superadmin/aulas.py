@@ -2,6 +2,7 @@ from flask import Blueprint, request, jsonify
 from psycopg2.extras import RealDictCursor
 import psycopg2
 from database.db import get_db
+from utils.paginacion import ErrorListado, Listado, aplicar_cabeceras, paginar
 
 aulas_bp = Blueprint('aulas', __name__)
 
@@ -9,35 +10,62 @@ aulas_bp = Blueprint('aulas', __name__)
 # 🏫 GESTIÓN DE AULAS
 # ======================================================
 
+LISTADO_AULAS = Listado(
+    "aulas",
+    """
+        SELECT 
+            a.aula_id, 
+            a.codigo_a, 
+            a.nombre_aula,
+            a.capacidad, 
+            a.estado,
+            tac.nombre_tipo AS tipo,
+            pab.nombre_pabellon AS ubicacion 
+        FROM aula a
+        LEFT JOIN tipo_aula_cat tac ON a.tipo_aula_id = tac.tipo_aula_id
+        LEFT JOIN pabellon pab ON a.pabellon_id = pab.pabellon_id
+    """,
+    llave="aula_id",
+    orden={
+        "codigo": "t.codigo_a",
+        "nombre": "t.nombre_aula",
+        "capacidad": "t.capacidad",
+    },
+    orden_defecto=[("codigo", "asc")],
+    filtros={
+        "estado": ("t.estado", "="),
+        "tipo": ("t.tipo", "="),
+        "ubicacion": ("t.ubicacion", "contiene"),
+        "codigo": ("t.codigo_a", "contiene"),
+        "capacidad_min": ("t.capacidad", ">=", int),
+    },
+    indices=(
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_aula_codigo_id ON aula (codigo_a, aula_id)",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_aula_nombre_id ON aula (nombre_aula, aula_id)",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_aula_capacidad_id ON aula (capacidad, aula_id)",
+    ),
+)
+
+
 @aulas_bp.route('/aulas', methods=['GET'])
 def listar_aulas():
-    """Muestra el listado de todas las aulas con sus detalles de ubicación y tipo."""
+    """
+    Muestra el listado de aulas con sus detalles de ubicación y tipo.
+    Filtros y paginación opcionales: ?estado=&tipo=&capacidad_min=&limite=&cursor=&ordenar=
+    """
     conn = None
     cur = None
     try:
         conn = get_db()
         cur = conn.cursor(cursor_factory=RealDictCursor)
         
-        # --- CORRECCIÓN REALIZADA ---
-        # 1. Se eliminó 'a.ciclo' porque no existe en la tabla.
-        # 2. Se mantiene 'a.codigo_a' que es el código visual (ej: A-302).
-        cur.execute("""
-            SELECT 
-                a.aula_id, 
-                a.codigo_a, 
-                a.nombre_aula,
-                a.capacidad, 
-                a.estado,
-                tac.nombre_tipo AS tipo,
-                pab.nombre_pabellon AS ubicacion 
-            FROM aula a
-            LEFT JOIN tipo_aula_cat tac ON a.tipo_aula_id = tac.tipo_aula_id
-            LEFT JOIN pabellon pab ON a.pabellon_id = pab.pabellon_id
-            ORDER BY a.codigo_a ASC; 
-        """)
-        aulas = cur.fetchall()
-        return jsonify(aulas), 200
+        aulas, meta = paginar(cur, LISTADO_AULAS, request.args)
+        respuesta = jsonify(aulas)
+        aplicar_cabeceras(respuesta, meta, request.base_url, request.args)
+        return respuesta, 200
 
+    except ErrorListado as e:
+        return jsonify({"error": f"⚠️ {e}"}), 400
     except Exception as e:
         print(f"❌ Error al listar aulas: {e}")
         return jsonify({"error": "Error interno al listar las aulas."}), 500
@@ -1,16 +1,13 @@
 from flask import Blueprint, request, jsonify
 from datetime import datetime
 from database.db import get_db
+from psycopg2.extras import RealDictCursor
+from services.horarios import DIAS, HORARIOS_VALIDOS
+from services.cascada import ErrorCascada, eliminar_en_cascada
+from services.bloques import generar_grilla, prefijo_bloque, proximo_codigo, siguiente_codigo
 
 bloques_horarios_bp = Blueprint('bloques_horarios', __name__)
 
-# Secuencia válida de horarios académicos (cada 50 minutos)
-HORARIOS_VALIDOS = [
-    "08:00", "08:50", "09:40", "10:30", "11:20", "12:10",
-    "13:00", "13:50", "14:40", "15:30", "16:20", "17:10",
-    "18:00", "18:50", "19:40", "20:30", "21:20", "22:10"
-]
-
 @bloques_horarios_bp.route("/bloques-horarios", methods=["POST"])
 def crear_bloque_horario():
     """Crea un bloque horario automáticamente de 50 minutos"""
@@ -64,32 +61,8 @@ def crear_bloque_horario():
                 "error": f"⛔ Ya existe un bloque para {dia} entre {hora_inicio} y {hora_fin}."
             }), 400
 
-        # Determinar turno (M/T/N)
-        hora_obj = datetime.strptime(hora_inicio, "%H:%M")
-        turno = "M" if hora_obj.hour < 12 else "T" if hora_obj.hour < 19 else "N"
-
-        # Obtener el último número correlativo de ese día y turno
-        cur.execute("""
-            SELECT codigo_bloque 
-            FROM bloque_horario 
-            WHERE dia = %s AND codigo_bloque LIKE %s
-            ORDER BY bloque_id DESC
-            LIMIT 1;
-        """, (dia, f"{dia[:3].upper()}-{turno}%"))
-
-        ultimo_codigo = cur.fetchone()
-        
-        if ultimo_codigo and "-" in ultimo_codigo[0]:
-            try:
-                # Extraer solo los números del código
-                parte_numerica = ''.join(ch for ch in ultimo_codigo[0] if ch.isdigit())
-                siguiente_num = int(parte_numerica) + 1 if parte_numerica else 1
-            except:
-                siguiente_num = 1
-        else:
-            siguiente_num = 1
-
-        codigo_bloque = f"{dia[:3].upper()}-{turno}{siguiente_num}"
+        # Código correlativo del día y turno (M/T/N), reservado de forma atómica
+        codigo_bloque = siguiente_codigo(cur, dia, hora_inicio)
         print(f"📝 Código generado: {codigo_bloque}")
 
         # Insertar en BD
@@ -149,34 +122,18 @@ def obtener_proximo_codigo():
     if not dia or not hora_inicio:
         return jsonify({"error": "Faltan parámetros: día y hora_inicio"}), 400
 
-    formato = "%H:%M"
-    inicio = datetime.strptime(hora_inicio, formato)
-
-    # Determinar turno
-    turno = "M" if inicio.hour < 12 else "T" if inicio.hour < 19 else "N"
+    try:
+        datetime.strptime(hora_inicio, "%H:%M")
+    except ValueError:
+        return jsonify({"error": "⛔ La hora de inicio debe tener el formato HH:MM."}), 400
 
+    conn = None; cur = None
     try:
         conn = get_db()
         cur = conn.cursor()
 
-        # Buscar último correlativo
-        cur.execute("""
-            SELECT codigo_bloque
-            FROM bloque_horario
-            WHERE dia = %s AND codigo_bloque LIKE %s
-            ORDER BY bloque_id DESC
-            LIMIT 1;
-        """, (dia, f"{dia[:3].upper()}-{turno}%"))
-
-        ultimo = cur.fetchone()
-
-        if ultimo and "-" in ultimo[0]:
-            num = ''.join(ch for ch in ultimo[0] if ch.isdigit())
-            siguiente_num = int(num) + 1 if num else 1
-        else:
-            siguiente_num = 1
-
-        codigo_siguiente = f"{dia[:3].upper()}-{turno}{siguiente_num}"
+        # Siguiente número del contador del día y turno (sin reservarlo)
+        codigo_siguiente = proximo_codigo(cur, dia, hora_inicio)
 
         return jsonify({"codigo_sugerido": codigo_siguiente}), 200
 
@@ -187,6 +144,47 @@ def obtener_proximo_codigo():
         if cur: cur.close()
         if conn: conn.close()
         
+# ======================================================
+# GENERAR LA GRILLA SEMANAL COMPLETA DE BLOQUES
+# ======================================================
+@bloques_horarios_bp.route("/bloques-horarios/generar-grilla", methods=["POST"])
+def generar_grilla_bloques():
+    """
+    Crea todos los bloques de 50 min de la secuencia para los días indicados
+    (body opcional {"dias": [...]}, por defecto Lunes a Sábado) en una sola sentencia.
+    Los bloques que ya existen se omiten.
+    """
+    dias = (request.get_json(silent=True) or {}).get("dias") or DIAS
+    invalidos = [d for d in dias if d not in DIAS]
+    if invalidos:
+        return jsonify({"error": f"⚠️ Días no válidos: {', '.join(map(str, invalidos))}"}), 400
+
+    conn = None; cur = None
+    try:
+        conn = get_db()
+        cur = conn.cursor()
+        creados = generar_grilla(cur, dias)
+        conn.commit()
+
+        return jsonify({
+            "mensaje": f"✅ Grilla generada: {len(creados)} bloque(s) nuevo(s).",
+            "bloques": [
+                {"bloque_id": b[0], "dia": b[1], "hora_inicio": b[2], "hora_fin": b[3], "codigo_bloque": b[4]}
+                for b in creados
+            ]
+        }), 201
+
+    except Exception as e:
+        if conn:
+            conn.rollback()
+        print("❌ Error al generar grilla de bloques:", e)
+        return jsonify({"error": str(e)}), 500
+
+    finally:
+        if cur: cur.close()
+        if conn: conn.close()
+
+
 # ======================================================
 # LISTAR LOS BLOQUES DE HORARIOS 
 # ======================================================
@@ -194,39 +192,21 @@ def obtener_proximo_codigo():
 def listar_bloques_horarios():
     try:
         conn = get_db()
-        cur = conn.cursor()
+        cur = conn.cursor(cursor_factory=RealDictCursor)
 
+        # Horas en HH:MM como siempre las mostró el listado
         cur.execute("""
             SELECT 
                 bloque_id,
                 codigo_bloque,
                 dia,
-                hora_inicio,
-                hora_fin,
+                TO_CHAR(hora_inicio, 'HH24:MI') AS hora_inicio,
+                TO_CHAR(hora_fin, 'HH24:MI') AS hora_fin,
                 estado
             FROM bloque_horario
             ORDER BY bloque_id ASC;
         """)
-
-        data = cur.fetchall()
-        columnas = [desc[0] for desc in cur.description]
-
-        bloques = []
-        for fila in data:
-            bloque = dict(zip(columnas, fila))
-
-            # ✅ Convertir los objetos time a string (HH:MM)
-            if isinstance(bloque["hora_inicio"], (bytes, bytearray)):
-                bloque["hora_inicio"] = bloque["hora_inicio"].decode("utf-8")
-            else:
-                bloque["hora_inicio"] = str(bloque["hora_inicio"])[:5]
-
-            if isinstance(bloque["hora_fin"], (bytes, bytearray)):
-                bloque["hora_fin"] = bloque["hora_fin"].decode("utf-8")
-            else:
-                bloque["hora_fin"] = str(bloque["hora_fin"])[:5]
-
-            bloques.append(bloque)
+        bloques = cur.fetchall()
 
         return jsonify(bloques), 200
 
@@ -275,24 +255,17 @@ def editar_bloque_horario(bloque_id):
         if cur.fetchone()[0] > 0:
             return jsonify({"error": f"⛔ Ya existe un bloque para {dia} entre {hora_inicio} y {hora_fin}."}), 400
 
-        # 📌 Determinar nuevo turno y código si cambia hora/día
-        turno = "M" if inicio.hour < 12 else "T" if inicio.hour < 19 else "N"
-        cur.execute("""
-            SELECT codigo_bloque
-            FROM bloque_horario
-            WHERE dia = %s AND codigo_bloque LIKE %s
-            ORDER BY bloque_id DESC
-            LIMIT 1;
-        """, (dia, f"{dia[:3].upper()}-{turno}%"))
-        ultimo_codigo = cur.fetchone()
-
-        if ultimo_codigo and "-" in ultimo_codigo[0]:
-            parte_numerica = ''.join(ch for ch in ultimo_codigo[0] if ch.isdigit())
-            siguiente_num = int(parte_numerica) + 1 if parte_numerica else 1
-        else:
-            siguiente_num = 1
+        # 📌 Nuevo código solo si cambia el día o el turno
+        cur.execute("SELECT dia, TO_CHAR(hora_inicio, 'HH24:MI'), codigo_bloque FROM bloque_horario WHERE bloque_id = %s;",
+                    (bloque_id,))
+        actual = cur.fetchone()
+        if not actual:
+            return jsonify({"error": "❌ Bloque no encontrado."}), 404
 
-        codigo_bloque = f"{dia[:3].upper()}-{turno}{siguiente_num}"
+        if prefijo_bloque(actual[0], actual[1]) == prefijo_bloque(dia, hora_inicio):
+            codigo_bloque = actual[2]
+        else:
+            codigo_bloque = siguiente_codigo(cur, dia, hora_inicio)
 
         # ✏️ Actualizar bloque
         cur.execute("""
@@ -395,23 +368,28 @@ def verificar_secciones_activas_bloque(bloque_id):
 # ======================================================
 # DELETE - ELIMINAR BLOQUE DE HORARIO CON CASCADA COMPLETA
 # ======================================================
+# Tablas que el borrado de un bloque elimina aunque su FK no sea ON DELETE CASCADE
+TABLAS_ELIMINAR_BLOQUE = ("asistencia", "matriculas", "materiales", "asignaciones")
+
+
 @bloques_horarios_bp.route("/bloques-horarios/<int:bloque_id>", methods=["DELETE"])
 def eliminar_bloque_horario(bloque_id):
     """
     Elimina un bloque de horario junto con TODAS sus dependencias en cascada.
     
-    ORDEN DE ELIMINACIÓN (de hijos a padres):
-    1. asistencia (relacionada con matriculas)
-    2. matriculas (relacionadas con asignaciones)
-    3. materiales (relacionados con asignaciones)
-    4. sesion_clase (relacionadas con asignaciones/secciones)
-    5. asignaciones (relacionadas con bloque_horario)
-    6. bloque_horario (tabla principal)
+    El orden (de hijos a padres: asistencia, matrículas, materiales, asignaciones,
+    bloque_horario, ...) lo arma services.cascada a partir de las llaves foráneas,
+    con un DELETE por tabla. Solo se borran las tablas de TABLAS_ELIMINAR_BLOQUE y las
+    FK ON DELETE CASCADE; otros registros dependientes (calificaciones, historial...)
+    impiden el borrado y se devuelven en un 409.
+    Con ?simular=true solo devuelve cuántas filas se eliminarían.
     
     Reglas de negocio:
     - NO se puede eliminar si tiene secciones activas
     - SI se puede eliminar si solo tiene asignaciones sin secciones activas
     """
+    simular = request.args.get("simular", "false").lower() == "true"
+    conn = None; cur = None
     try:
         conn = get_db()
         cur = conn.cursor()
@@ -435,99 +413,41 @@ def eliminar_bloque_horario(bloque_id):
         secciones_activas = cur.fetchone()[0]
         # ✅ Ya NO bloqueamos, solo informamos en el frontend
 
-        # 3️⃣ Obtener todas las asignaciones relacionadas
-        cur.execute("""
-            SELECT asignacion_id 
-            FROM asignaciones 
-            WHERE bloque_id = %s;
-        """, (bloque_id,))
-        
-        asignaciones_ids = [row[0] for row in cur.fetchall()]
-        asignaciones_count = len(asignaciones_ids)
-
-        # 4️⃣ Obtener todas las secciones relacionadas
-        cur.execute("""
-            SELECT DISTINCT seccion_id 
-            FROM asignaciones 
-            WHERE bloque_id = %s;
-        """, (bloque_id,))
-        
-        secciones_ids = [row[0] for row in cur.fetchall()]
-
-        # 5️⃣ Obtener todas las matrículas relacionadas
-        matriculas_ids = []
-        for asignacion_id in asignaciones_ids:
-            cur.execute("""
-                SELECT matricula_id 
-                FROM matriculas 
-                WHERE asignacion_id = %s;
-            """, (asignacion_id,))
-            matriculas_ids.extend([row[0] for row in cur.fetchall()])
-        
-        matriculas_count = len(matriculas_ids)
-
-        # 🗑️ INICIO DE ELIMINACIÓN EN CASCADA (de hijos a padres)
-        
-        # 6️⃣ Eliminar asistencias relacionadas con las matrículas
-        asistencias_count = 0
-        for matricula_id in matriculas_ids:
-            cur.execute("""
-                DELETE FROM asistencia 
-                WHERE matricula_id = %s;
-            """, (matricula_id,))
-            asistencias_count += cur.rowcount
-
-        # 7️⃣ Eliminar matrículas relacionadas con las asignaciones
-        for asignacion_id in asignaciones_ids:
-            cur.execute("""
-                DELETE FROM matriculas 
-                WHERE asignacion_id = %s;
-            """, (asignacion_id,))
-
-        # 8️⃣ Eliminar materiales relacionados con cada asignación
-        materiales_count = 0
-        for asignacion_id in asignaciones_ids:
-            cur.execute("""
-                DELETE FROM materiales 
-                WHERE asignacion_id = %s;
-            """, (asignacion_id,))
-            materiales_count += cur.rowcount
-
-        # 9️⃣ Eliminar sesiones de clase relacionadas con las secciones
-        sesiones_count = 0
-        for seccion_id in secciones_ids:
-            cur.execute("""
-                DELETE FROM sesion_clase 
-                WHERE seccion_id = %s;
-            """, (seccion_id,))
-            sesiones_count += cur.rowcount
-
-        # 🔟 Eliminar asignaciones relacionadas con el bloque
-        cur.execute("""
-            DELETE FROM asignaciones 
-            WHERE bloque_id = %s;
-        """, (bloque_id,))
-
-        # 1️⃣1️⃣ Finalmente, eliminar el bloque de horario
-        cur.execute("""
-            DELETE FROM bloque_horario 
-            WHERE bloque_id = %s;
-        """, (bloque_id,))
+        # 🗑️ Eliminación en cascada (o solo conteo) guiada por las FK
+        resultado = eliminar_en_cascada(cur, "bloque_horario", [bloque_id], simular=simular,
+                                        permitidas=TABLAS_ELIMINAR_BLOQUE)
+        conteos = resultado["conteos"]
+        detalles = {
+            "asistencias_eliminadas": conteos.get("asistencia", 0),
+            "matriculas_eliminadas": conteos.get("matriculas", 0),
+            "materiales_eliminados": conteos.get("materiales", 0),
+            "sesiones_eliminadas": conteos.get("sesion_clase", 0),
+            "asignaciones_eliminadas": conteos.get("asignaciones", 0)
+        }
+
+        if simular:
+            conn.rollback()
+            return jsonify({
+                "mensaje": "Simulación: no se eliminó nada.",
+                "codigo_bloque": bloque[1],
+                "secciones_activas": secciones_activas,
+                "detalles": detalles,
+                **resultado
+            }), 200
 
         conn.commit()
 
         return jsonify({
             "mensaje": "🗑️ Bloque horario eliminado correctamente.",
             "codigo_bloque": bloque[1],
-            "detalles": {
-                "asistencias_eliminadas": asistencias_count,
-                "matriculas_eliminadas": matriculas_count,
-                "materiales_eliminados": materiales_count,
-                "sesiones_eliminadas": sesiones_count,
-                "asignaciones_eliminadas": asignaciones_count
-            }
+            "detalles": detalles,
+            "conteos": conteos
         }), 200
 
+    except ErrorCascada as e:
+        if conn:
+            conn.rollback()
+        return jsonify({"error": str(e), "dependientes": e.dependientes}), 409
     except Exception as e:
         if conn:
             conn.rollback()
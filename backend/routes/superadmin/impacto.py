@@ -0,0 +1,40 @@
+from flask import Blueprint, request, jsonify
+from database.db import get_db
+from services.impacto import ErrorImpacto, calcular_impacto
+
+impacto_bp = Blueprint('impacto', __name__)
+
+
+# ======================================================
+# IMPACTO DE DEPENDENCIAS PARA VARIAS ENTIDADES
+# ======================================================
+@impacto_bp.route("/impacto/<string:tipo>", methods=["GET", "POST"])
+def impacto_entidades(tipo):
+    """
+    Conteos de dependencias de muchas entidades en una sola consulta.
+    GET ?ids=1,2,3  o  POST {"ids": [1, 2, 3]}   (tipo: curso, bloque, seccion, aula, docente)
+    """
+    if request.method == "POST":
+        ids = (request.get_json(silent=True) or {}).get("ids") or []
+    else:
+        ids = [i for i in request.args.get("ids", "").split(",") if i.strip()]
+
+    conn = None; cur = None
+    try:
+        conn = get_db()
+        cur = conn.cursor()
+        impacto = calcular_impacto(cur, tipo, ids)
+        return jsonify({
+            "tipo": tipo,
+            "total": len(impacto),
+            "impacto": {str(k): v for k, v in impacto.items()}
+        }), 200
+
+    except ErrorImpacto as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        print("❌ Error al calcular impacto:", e)
+        return jsonify({"error": str(e)}), 500
+    finally:
+        if cur: cur.close()
+        if conn: conn.close()
@@ -3,28 +3,46 @@ from flask import Blueprint, request, jsonify
 from psycopg2.extras import RealDictCursor
 import psycopg2
 from database.db import get_db  
+from utils.paginacion import ErrorListado, Listado, aplicar_cabeceras, paginar
 
 secciones_bp = Blueprint('secciones', __name__)
 
+# ========== LISTADO ==========
+# código, ciclo y periodo son obligatorios al crear, así que sirven directo como claves de orden
+LISTADO_SECCIONES = Listado(
+    "secciones",
+    "SELECT seccion_id, codigo, ciclo_academico, periodo, estado FROM secciones",
+    llave="seccion_id",
+    orden={"periodo": "t.periodo", "ciclo": "t.ciclo_academico", "codigo": "t.codigo"},
+    orden_defecto=[("periodo", "desc"), ("ciclo", "asc"), ("codigo", "asc")],
+    filtros={
+        "periodo": ("t.periodo", "="),
+        "ciclo": ("t.ciclo_academico", "="),
+        "estado": ("t.estado", "="),
+        "codigo": ("t.codigo", "contiene"),
+    },
+    indices=(
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_secciones_periodo_ciclo ON secciones (periodo, ciclo_academico, codigo)",
+    ),
+)
+
 # ========== RUTAS ==========
 @secciones_bp.route('/secciones', methods=['GET'])
 def get_secciones():
-    """Obtener todas las secciones"""
+    """Obtener las secciones. Filtros y paginación opcionales: ?periodo=&ciclo=&estado=&limite=&cursor="""
     conn = None
     cur = None
     try:
         conn = get_db()
         cur = conn.cursor(cursor_factory=RealDictCursor)
         
-        cur.execute("""
-            SELECT seccion_id, codigo, ciclo_academico, periodo, estado 
-            FROM secciones 
-            ORDER BY periodo DESC, ciclo_academico, codigo
-        """)
-        
-        secciones = cur.fetchall()
-        return jsonify(secciones), 200
+        secciones, meta = paginar(cur, LISTADO_SECCIONES, request.args)
+        respuesta = jsonify(secciones)
+        aplicar_cabeceras(respuesta, meta, request.base_url, request.args)
+        return respuesta, 200
         
+    except ErrorListado as e:
+        return jsonify({"error": f"⚠️ {e}"}), 400
     except Exception as e:
         print(f"❌ Error al obtener secciones: {str(e)}")
         return jsonify({"error": "Error interno al obtener secciones."}), 500
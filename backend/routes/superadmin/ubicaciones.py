@@ -1,95 +1,61 @@
-from flask import Blueprint, jsonify
-from psycopg2.extras import RealDictCursor
-from database.db import get_db
+from flask import Blueprint, jsonify, request
+from services import catalogos
 
 ubicaciones_bp = Blueprint('ubicaciones_bp', __name__)
 
+# Los datos salen de la caché de catálogos (services/catalogos.py), sin consultar la BD
+
 # ✅ Listar todos los departamentos
 @ubicaciones_bp.route('/departamentos-geo', methods=['GET'])
 def obtener_departamentos_geo():
-    conn = None
-    cur = None
     try:
-        conn = get_db()
-        cur = conn.cursor()
-        cur.execute("SELECT departamento_id, nombre_departamento FROM departamento_geo ORDER BY nombre_departamento ASC;")
-        departamentos = [
-            {"departamento_id": row[0], "nombre_departamento": row[1]}
-            for row in cur.fetchall()
-        ]
-        return jsonify({"departamentos": departamentos}), 200
+        return jsonify({"departamentos": catalogos.obtener("departamentos")}), 200
     except Exception as e:
         print(f"❌ ERROR al obtener departamentos geo: {e}")
         return jsonify({"error": "Error interno. No se pudieron obtener los departamentos geográficos."}), 500
-    finally:
-        if cur: cur.close()
-        if conn: conn.close()
 
 # ✅ Listar provincias de un departamento
 @ubicaciones_bp.route('/provincias/<int:departamento_id>', methods=['GET'])
 def obtener_provincias(departamento_id):
-    conn = None
-    cur = None
     try:
-        conn = get_db()
-        cur = conn.cursor()
-        cur.execute("""
-            SELECT provincia_id, nombre_provincia 
-            FROM provincia 
-            WHERE departamento_id = %s 
-            ORDER BY nombre_provincia ASC;
-        """, (departamento_id,))
-        provincias = [
-            {"provincia_id": row[0], "nombre_provincia": row[1]}
-            for row in cur.fetchall()
-        ]
-        return jsonify({"provincias": provincias}), 200
+        return jsonify({"provincias": catalogos.provincias_de(departamento_id)}), 200
     except Exception as e:
         print(f"❌ ERROR al obtener provincias: {e}")
         return jsonify({"error": "Error interno al consultar provincias."}), 500
-    finally:
-        if cur: cur.close()
-        if conn: conn.close()
 
 
 # ✅ Listar todos los distritos
 @ubicaciones_bp.route('/distritos', methods=['GET'])
 def listar_distritos():
     try:
-        conn = get_db()
-        cur = conn.cursor(cursor_factory=RealDictCursor)
-        cur.execute("SELECT distrito_id, nombre_distrito FROM distrito ORDER BY nombre_distrito ASC")
-        distritos = cur.fetchall()
+        distritos = [
+            {"distrito_id": d["distrito_id"], "nombre_distrito": d["nombre_distrito"]}
+            for d in catalogos.obtener("distritos")
+        ]
         return jsonify({"distritos": distritos})
     except Exception as e:
         print("Error al listar distritos:", e)
         return jsonify({"error": str(e)}), 500
-    finally:
-        if cur: cur.close()
-        if conn: conn.close()
 
 # ✅ Listar distritos de una provincia específica
 @ubicaciones_bp.route('/distritos/<int:provincia_id>', methods=['GET'])
 def obtener_distritos_por_provincia(provincia_id):
-    conn = None
-    cur = None
     try:
-        conn = get_db()
-        cur = conn.cursor() 
-        cur.execute("""
-            SELECT distrito_id, nombre_distrito 
-            FROM distrito 
-            WHERE provincia_id = %s 
-            ORDER BY nombre_distrito ASC;
-        """, (provincia_id,))
-        distritos = [
-            {"distrito_id": row[0], "nombre_distrito": row[1]}
-            for row in cur.fetchall()
-        ]
-        return jsonify({"distritos": distritos}), 200
+        return jsonify({"distritos": catalogos.distritos_de(provincia_id)}), 200
     except Exception as e:
         print(f"❌ ERROR al obtener distritos: {e}")
         return jsonify({"error": "Error interno al obtener distritos."}), 500
-    finally:
-        if cur: cur.close()
-        if conn: conn.close()
\ No newline at end of file
+
+# ✅ Autocompletado de ubigeo: "mira" -> Miraflores, Lima, Lima (sin distinguir tildes)
+@ubicaciones_bp.route('/buscar', methods=['GET'])
+def buscar_ubigeo():
+    nivel = request.args.get('nivel') or None
+    if nivel and nivel not in catalogos.NIVELES_UBIGEO:
+        return jsonify({"error": f"Nivel no válido. Opciones: {', '.join(catalogos.NIVELES_UBIGEO)}"}), 400
+    limite = request.args.get('limite', catalogos.LIMITE_UBIGEO, type=int)
+    try:
+        resultados = catalogos.buscar_ubigeo(request.args.get('q', ''), nivel, limite)
+        return jsonify({"total": len(resultados), "resultados": resultados}), 200
+    except Exception as e:
+        print(f"❌ ERROR al buscar en ubigeo: {e}")
+        return jsonify({"error": "Error interno al buscar ubicaciones."}), 500
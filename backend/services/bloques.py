@@ -0,0 +1,106 @@
+# services/bloques.py
+# Códigos de bloque_horario ("LUN-M3"): un contador por prefijo (día + turno) en la
+# tabla contador_bloque. Asignar un código es un único INSERT ... ON CONFLICT DO UPDATE
+# ... RETURNING, atómico aunque haya altas concurrentes, en lugar de buscar el último
+# código con LIKE y parsearlo.
+from datetime import datetime
+
+from database.db import asegurar_esquema
+from services.horarios import DIAS, HORARIOS_VALIDOS
+
+ESQUEMA_CONTADOR = """
+    CREATE TABLE IF NOT EXISTS contador_bloque (
+        prefijo VARCHAR(20) PRIMARY KEY,
+        ultimo INT NOT NULL DEFAULT 0
+    );
+
+    -- Alinea los contadores con los códigos ya registrados
+    INSERT INTO contador_bloque (prefijo, ultimo)
+    SELECT regexp_replace(codigo_bloque, '[0-9]+$', ''),
+           MAX(substring(codigo_bloque FROM '[0-9]+$')::int)
+    FROM bloque_horario
+    WHERE codigo_bloque ~ '-.*[0-9]+$'
+    GROUP BY 1
+    ON CONFLICT (prefijo) DO UPDATE
+        SET ultimo = GREATEST(contador_bloque.ultimo, EXCLUDED.ultimo);
+"""
+
+
+def asegurar_contador():
+    """Crea (una vez por proceso) la tabla de contadores."""
+    asegurar_esquema("contador_bloque", ESQUEMA_CONTADOR)
+
+
+def turno_de(hora_inicio):
+    """M (antes de las 12), T (antes de las 19) o N."""
+    hora = datetime.strptime(hora_inicio[:5], "%H:%M").hour
+    return "M" if hora < 12 else "T" if hora < 19 else "N"
+
+
+def prefijo_bloque(dia, hora_inicio):
+    return f"{dia[:3].upper()}-{turno_de(hora_inicio)}"
+
+
+def siguiente_codigo(cur, dia, hora_inicio):
+    """Reserva y devuelve el siguiente código del día y turno (dentro de la transacción actual)."""
+    asegurar_contador()
+    prefijo = prefijo_bloque(dia, hora_inicio)
+    cur.execute("""
+        INSERT INTO contador_bloque (prefijo, ultimo) VALUES (%s, 1)
+        ON CONFLICT (prefijo) DO UPDATE SET ultimo = contador_bloque.ultimo + 1
+        RETURNING ultimo
+    """, (prefijo,))
+    return f"{prefijo}{cur.fetchone()[0]}"
+
+
+def proximo_codigo(cur, dia, hora_inicio):
+    """Código que recibiría el próximo bloque, sin reservarlo."""
+    asegurar_contador()
+    prefijo = prefijo_bloque(dia, hora_inicio)
+    cur.execute("SELECT ultimo FROM contador_bloque WHERE prefijo = %s", (prefijo,))
+    fila = cur.fetchone()
+    return f"{prefijo}{(fila[0] if fila else 0) + 1}"
+
+
+def generar_grilla(cur, dias=None):
+    """
+    Crea en una sola sentencia todos los bloques de 50 min de HORARIOS_VALIDOS para los
+    días indicados, salvo los que ya existen. Devuelve [(bloque_id, dia, inicio, fin, codigo)].
+    """
+    asegurar_contador()
+    filas = [
+        (dia, inicio, HORARIOS_VALIDOS[i + 1], prefijo_bloque(dia, inicio))
+        for dia in (dias or DIAS)
+        for i, inicio in enumerate(HORARIOS_VALIDOS[:-1])
+    ]
+    dias_f, inicios, fines, prefijos = (list(columna) for columna in zip(*filas))
+    cur.execute("""
+        WITH franjas AS (
+            SELECT f.dia, f.inicio, f.fin, f.prefijo, f.orden
+            FROM unnest(%s::text[], %s::time[], %s::time[], %s::text[])
+                 WITH ORDINALITY AS f(dia, inicio, fin, prefijo, orden)
+            WHERE NOT EXISTS (
+                SELECT 1 FROM bloque_horario b
+                WHERE b.dia = f.dia AND b.hora_inicio = f.inicio AND b.hora_fin = f.fin
+            )
+        ),
+        numeradas AS (
+            SELECT franjas.*,
+                   ROW_NUMBER() OVER (PARTITION BY prefijo ORDER BY orden) AS n,
+                   COUNT(*) OVER (PARTITION BY prefijo) AS total
+            FROM franjas
+        ),
+        contadores AS (
+            INSERT INTO contador_bloque (prefijo, ultimo)
+            SELECT prefijo, COUNT(*) FROM franjas GROUP BY prefijo
+            ON CONFLICT (prefijo) DO UPDATE SET ultimo = contador_bloque.ultimo + EXCLUDED.ultimo
+            RETURNING prefijo, ultimo
+        )
+        INSERT INTO bloque_horario (dia, hora_inicio, hora_fin, codigo_bloque)
+        SELECT nu.dia, nu.inicio, nu.fin, nu.prefijo || (c.ultimo - nu.total + nu.n)
+        FROM numeradas nu
+        JOIN contadores c ON c.prefijo = nu.prefijo
+        ORDER BY nu.orden
+        RETURNING bloque_id, dia, TO_CHAR(hora_inicio, 'HH24:MI'), TO_CHAR(hora_fin, 'HH24:MI'), codigo_bloque
+    """, (dias_f, inicios, fines, prefijos))
+    return cur.fetchall()
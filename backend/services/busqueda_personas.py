@@ -0,0 +1,148 @@
+# services/busqueda_personas.py
+# Búsqueda de estudiantes y docentes por nombre, DNI, código o correo.
+# El nombre se compara normalizado (minúsculas, sin tildes ni ñ) con índices de
+# trigramas (pg_trgm), así que tolera prefijos y errores de tipeo; DNI, códigos y
+# correo se buscan por prefijo con índices btree. Cada camino usa su propio índice y
+# los candidatos se unen y ordenan por puntaje, sin recorrer las tablas completas.
+from database.db import asegurar_esquema
+
+MIN_CARACTERES = 2
+LIMITE_DEFECTO = 20
+LIMITE_MAXIMO = 50
+TIPOS = ("estudiante", "docente")
+
+# Misma normalización en los índices y en la consulta (debe ser IMMUTABLE para indexar)
+ESQUEMA_BUSQUEDA = """
+    CREATE OR REPLACE FUNCTION normalizar_busqueda(texto TEXT) RETURNS TEXT AS $$
+        SELECT translate(lower(COALESCE(texto, '')),
+                         'áàäâéèëêíìïîóòöôúùüûñç', 'aaaaeeeeiiiioooouuuunc')
+    $$ LANGUAGE sql IMMUTABLE PARALLEL SAFE;
+
+    DO $$
+    BEGIN
+        CREATE EXTENSION IF NOT EXISTS pg_trgm;
+    EXCEPTION WHEN insufficient_privilege OR undefined_file THEN
+        RAISE WARNING 'pg_trgm no disponible; la búsqueda por nombre usará LIKE';
+    END;
+    $$;
+
+    DO $$
+    BEGIN
+        IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm') THEN
+            CREATE INDEX IF NOT EXISTS idx_busqueda_persona_nombre ON persona
+                USING gin (normalizar_busqueda(nombres || ' ' || apellidos) gin_trgm_ops);
+        END IF;
+    END;
+    $$;
+
+    CREATE INDEX IF NOT EXISTS idx_busqueda_persona_dni ON persona (dni text_pattern_ops);
+    CREATE INDEX IF NOT EXISTS idx_busqueda_estudiante_codigo
+        ON estudiante (lower(codigo_universitario) text_pattern_ops);
+    CREATE INDEX IF NOT EXISTS idx_busqueda_docente_codigo
+        ON docente (lower(codigo_docente) text_pattern_ops);
+    CREATE INDEX IF NOT EXISTS idx_busqueda_usuario_correo
+        ON usuario (lower(correo) text_pattern_ops);
+"""
+
+_NOMBRE = "normalizar_busqueda(p.nombres || ' ' || p.apellidos)"
+
+_estado = {"trigramas": None}
+
+
+class ErrorBusqueda(Exception):
+    """Término o parámetros de búsqueda inválidos."""
+
+
+def asegurar_busqueda(cur):
+    """Crea (una vez por proceso) la función de normalización y los índices."""
+    asegurar_esquema("busqueda_personas", ESQUEMA_BUSQUEDA)
+    if _estado["trigramas"] is None:
+        cur.execute("SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm')")
+        _estado["trigramas"] = bool(cur.fetchone()[0])
+    return _estado["trigramas"]
+
+
+def _prefijo(texto):
+    return texto.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+def buscar_personas(cur, termino, tipo=None, limite=LIMITE_DEFECTO):
+    """
+    Estudiantes y docentes que coinciden con el término, de mayor a menor puntaje:
+    1.0 DNI o código exacto, 0.9 prefijo de DNI / código / correo, y la similitud de
+    palabra (0..1) para los nombres. Una persona que es estudiante y docente aparece
+    una vez por rol.
+    """
+    termino = " ".join((termino or "").split())
+    if len(termino) < MIN_CARACTERES:
+        raise ErrorBusqueda(f"Escriba al menos {MIN_CARACTERES} caracteres")
+    if tipo and tipo not in TIPOS:
+        raise ErrorBusqueda(f"Tipo no válido. Opciones: {', '.join(TIPOS)}")
+    try:
+        limite = min(max(int(limite), 1), LIMITE_MAXIMO)
+    except (TypeError, ValueError):
+        raise ErrorBusqueda("El límite debe ser numérico")
+
+    trigramas = asegurar_busqueda(cur)
+    if trigramas:
+        por_nombre = f"""
+            SELECT p.persona_id, word_similarity(normalizar_busqueda(%(termino)s), {_NOMBRE}) AS puntaje
+            FROM persona p WHERE normalizar_busqueda(%(termino)s) <%% {_NOMBRE}
+        """
+    else:
+        por_nombre = f"""
+            SELECT p.persona_id, 0.5 AS puntaje
+            FROM persona p WHERE {_NOMBRE} LIKE normalizar_busqueda(%(contiene)s)
+        """
+
+    parametros = {
+        "termino": termino,
+        "exacto": termino.lower(),
+        "prefijo": _prefijo(termino.lower()),
+        "contiene": "%" + _prefijo(termino),
+        "tipo": tipo,
+        "limite": limite,
+    }
+    cur.execute(f"""
+        WITH candidatos AS (
+            {por_nombre}
+            UNION ALL
+            SELECT p.persona_id, CASE WHEN p.dni = %(termino)s THEN 1.0 ELSE 0.9 END
+            FROM persona p WHERE p.dni LIKE %(prefijo)s
+            UNION ALL
+            SELECT p.persona_id, 0.9
+            FROM usuario u JOIN persona p ON p.usuario_id = u.usuario_id
+            WHERE lower(u.correo) LIKE %(prefijo)s
+        ),
+        por_persona AS (
+            SELECT persona_id, MAX(puntaje) AS puntaje FROM candidatos GROUP BY persona_id
+        ),
+        resultados AS (
+            SELECT 'estudiante' AS tipo, e.estudiante_id AS id, e.persona_id,
+                   e.codigo_universitario AS codigo, pp.puntaje
+            FROM estudiante e JOIN por_persona pp ON pp.persona_id = e.persona_id
+            UNION ALL
+            SELECT 'estudiante', e.estudiante_id, e.persona_id, e.codigo_universitario,
+                   CASE WHEN lower(e.codigo_universitario) = %(exacto)s THEN 1.0 ELSE 0.9 END
+            FROM estudiante e WHERE lower(e.codigo_universitario) LIKE %(prefijo)s
+            UNION ALL
+            SELECT 'docente', d.docente_id, d.persona_id, d.codigo_docente, pp.puntaje
+            FROM docente d JOIN por_persona pp ON pp.persona_id = d.persona_id
+            UNION ALL
+            SELECT 'docente', d.docente_id, d.persona_id, d.codigo_docente,
+                   CASE WHEN lower(d.codigo_docente) = %(exacto)s THEN 1.0 ELSE 0.9 END
+            FROM docente d WHERE lower(d.codigo_docente) LIKE %(prefijo)s
+        )
+        SELECT r.tipo, r.id, r.codigo, p.persona_id, p.nombres, p.apellidos, p.dni,
+               u.correo, u.estado, ROUND(MAX(r.puntaje)::numeric, 3)::float AS puntaje
+        FROM resultados r
+        JOIN persona p ON p.persona_id = r.persona_id
+        LEFT JOIN usuario u ON u.usuario_id = p.usuario_id
+        WHERE %(tipo)s::text IS NULL OR r.tipo = %(tipo)s
+        GROUP BY r.tipo, r.id, r.codigo, p.persona_id, p.nombres, p.apellidos, p.dni, u.correo, u.estado
+        ORDER BY MAX(r.puntaje) DESC, p.apellidos, p.nombres, r.id
+        LIMIT %(limite)s
+    """, parametros)
+    columnas = ("tipo", "id", "codigo", "persona_id", "nombres", "apellidos", "dni",
+                "correo", "estado", "puntaje")
+    return [dict(zip(columnas, fila)) for fila in cur.fetchall()]
@@ -0,0 +1,149 @@
+# services/calendario_ics.py
+# Feeds iCalendar (.ics) del horario de un estudiante o docente.
+# Cada bloque de asignaciones es un evento semanal (RRULE) durante el periodo. El
+# archivo se genera una vez por versión del horario (services.horario_semanal) y se
+# guarda con su ETag, así que los clientes que consultan cada pocos minutos solo
+# cuestan la lectura de versiones y reciben 304.
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+
+from services.horario_semanal import ORDEN_DIAS, obtener_bloques, version_horario
+
+ZONA_HORARIA = os.getenv("ZONA_HORARIA", "America/Lima")
+SEMANAS_PERIODO = int(os.getenv("SEMANAS_PERIODO", "17"))
+DOMINIO_UID = os.getenv("ICS_DOMINIO", "horarios.local")
+MAX_FEEDS = 5000
+
+_BYDAY = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+
+
+class ErrorCalendario(Exception):
+    """Parámetros inválidos para el feed."""
+
+
+def inicio_periodo(valor=None):
+    """
+    Fecha de inicio de clases: ?inicio= o INICIO_PERIODO. Es obligatoria: los UID y
+    DTSTART de los eventos dependen de ella y deben ser estables entre descargas.
+    """
+    valor = valor or os.getenv("INICIO_PERIODO")
+    if not valor:
+        raise ErrorCalendario("Indique la fecha de inicio del periodo (?inicio=AAAA-MM-DD) "
+                              "o configure INICIO_PERIODO")
+    try:
+        return datetime.strptime(valor, "%Y-%m-%d").date()
+    except ValueError:
+        raise ErrorCalendario("La fecha de inicio debe tener el formato AAAA-MM-DD")
+
+
+def _escapar(texto):
+    return (str(texto or "").replace("\\", "\\\\").replace(";", "\\;")
+            .replace(",", "\\,").replace("\n", "\\n"))
+
+
+def _plegar(linea):
+    """Corta las líneas a 75 octetos como pide RFC 5545."""
+    datos = linea.encode("utf-8")
+    if len(datos) <= 75:
+        return linea
+    partes, actual = [], b""
+    for caracter in linea:
+        codificado = caracter.encode("utf-8")
+        if len(actual) + len(codificado) > (75 if not partes else 74):
+            partes.append(actual.decode("utf-8"))
+            actual = b""
+        actual += codificado
+    partes.append(actual.decode("utf-8"))
+    return "\r\n ".join(partes)
+
+
+def _zona(inicio):
+    """VTIMEZONE mínimo con el desfase vigente al inicio del periodo."""
+    try:
+        from zoneinfo import ZoneInfo
+        desfase = datetime.combine(inicio, datetime.min.time(), ZoneInfo(ZONA_HORARIA)).utcoffset()
+    except Exception:
+        desfase = timedelta(hours=-5)
+    minutos = int(desfase.total_seconds() // 60)
+    signo = "+" if minutos >= 0 else "-"
+    texto = f"{signo}{abs(minutos) // 60:02d}{abs(minutos) % 60:02d}"
+    return [
+        "BEGIN:VTIMEZONE", f"TZID:{ZONA_HORARIA}",
+        "BEGIN:STANDARD", "DTSTART:19700101T000000",
+        f"TZOFFSETFROM:{texto}", f"TZOFFSETTO:{texto}",
+        "END:STANDARD", "END:VTIMEZONE",
+    ]
+
+
+def generar_ics(bloques, nombre, inicio, semanas, sello):
+    """Texto del calendario (CRLF) con un evento semanal por bloque con día y hora; `sello` en UTC."""
+    marca = sello.strftime("%Y%m%dT%H%M%SZ")
+    lineas = [
+        "BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//Sistema Academico//Horarios//ES",
+        "CALSCALE:GREGORIAN", "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{_escapar(nombre)}", f"X-WR-TIMEZONE:{ZONA_HORARIA}",
+        *_zona(inicio),
+    ]
+    for bloque in bloques:
+        dia = ORDEN_DIAS.get(bloque["dia"])
+        if dia is None or not bloque["hora_inicio"] or not bloque["hora_fin"]:
+            continue
+        fecha = inicio + timedelta(days=(dia - inicio.weekday()) % 7)
+        desde = fecha.strftime("%Y%m%d") + "T" + bloque["hora_inicio"].replace(":", "") + "00"
+        hasta = fecha.strftime("%Y%m%d") + "T" + bloque["hora_fin"].replace(":", "") + "00"
+        detalle = [f"Sección: {bloque['seccion']}", f"Tipo: {bloque['tipo']}"]
+        if bloque.get("docente"):
+            detalle.append(f"Docente: {bloque['docente']}")
+        if bloque.get("aula"):
+            detalle.append(f"Aula: {bloque['aula']}")
+        lineas += [
+            "BEGIN:VEVENT",
+            f"UID:asignacion-{bloque['asignacion_id']}@{DOMINIO_UID}",
+            f"DTSTAMP:{marca}",
+            f"DTSTART;TZID={ZONA_HORARIA}:{desde}",
+            f"DTEND;TZID={ZONA_HORARIA}:{hasta}",
+            f"RRULE:FREQ=WEEKLY;COUNT={semanas};BYDAY={_BYDAY[dia]}",
+            f"SUMMARY:{_escapar(bloque['curso'])} ({_escapar(bloque['tipo'])})",
+            f"LOCATION:{_escapar(bloque.get('aula') or 'Sin aula')}",
+            f"DESCRIPTION:{_escapar(chr(10).join(detalle))}",
+            "END:VEVENT",
+        ]
+    lineas.append("END:VCALENDAR")
+    return "\r\n".join(_plegar(linea) for linea in lineas) + "\r\n"
+
+
+def obtener_feed(conn, tipo, sujeto_id, nombre, inicio, semanas=SEMANAS_PERIODO):
+    """
+    {"etag", "ultima_modificacion", "contenido"} del feed. Solo se regenera cuando
+    cambia la versión del horario o los parámetros.
+    """
+    if not 1 <= semanas <= 53:
+        raise ErrorCalendario("La cantidad de semanas debe estar entre 1 y 53")
+    firma, fecha = version_horario(conn)
+    clave = (tipo, sujeto_id, inicio, semanas)
+
+    with _lock:
+        entrada = _cache.get(clave)
+        if entrada and entrada[0] == firma:
+            _cache.move_to_end(clave)
+            return entrada[1]
+
+    sello = (fecha or datetime.now(timezone.utc)).replace(microsecond=0)
+    contenido = generar_ics(obtener_bloques(conn, tipo, sujeto_id, firma), nombre, inicio, semanas, sello)
+    feed = {
+        "etag": hashlib.sha1(contenido.encode("utf-8")).hexdigest(),
+        "ultima_modificacion": sello,
+        "contenido": contenido,
+    }
+    with _lock:
+        _cache[clave] = (firma, feed)
+        _cache.move_to_end(clave)
+        while len(_cache) > MAX_FEEDS:
+            _cache.popitem(last=False)
+    return feed
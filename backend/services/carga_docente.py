@@ -0,0 +1,160 @@
+# services/carga_docente.py
+# Carga horaria por docente y periodo, mantenida por la base de datos.
+# Triggers de sentencia (con tablas de transición) sobre asignaciones recalculan solo
+# los pares (docente, periodo) tocados por cada INSERT / UPDATE / DELETE, así que un
+# insert masivo recalcula cada docente una vez. Leer la carga es un JOIN a una tabla
+# pequeña en lugar de agregar asignaciones por docente.
+from database.db import asegurar_esquema
+from services.horarios import DIAS, MINUTOS_BLOQUE, TOTAL_FRANJAS, asegurar_franjas
+
+FRANJAS_SEMANA = len(DIAS) * TOTAL_FRANJAS
+
+ESQUEMA_CARGA = f"""
+    CREATE TABLE IF NOT EXISTS carga_docente (
+        docente_id INT NOT NULL,
+        periodo VARCHAR(20) NOT NULL,
+        bloques INT NOT NULL DEFAULT 0,
+        minutos_semanales INT NOT NULL DEFAULT 0,
+        franjas_ocupadas INT NOT NULL DEFAULT 0,
+        secciones INT NOT NULL DEFAULT 0,
+        cursos INT NOT NULL DEFAULT 0,
+        estudiantes INT NOT NULL DEFAULT 0,
+        fecha_actualizacion TIMESTAMP NOT NULL DEFAULT NOW(),
+        PRIMARY KEY (docente_id, periodo)
+    );
+
+    CREATE INDEX IF NOT EXISTS idx_asignaciones_docente_periodo ON asignaciones (docente_id, periodo);
+
+    CREATE OR REPLACE FUNCTION recalcular_carga_docente(p_docente_id INT, p_periodo VARCHAR) RETURNS void AS $$
+    BEGIN
+        IF p_docente_id IS NULL THEN
+            RETURN;
+        END IF;
+        WITH bloques AS (
+            SELECT a.curso_id, a.seccion_id, COALESCE(a.cantidad_estudiantes, 0) AS estudiantes,
+                   COALESCE(EXTRACT(EPOCH FROM (a.hora_fin - a.hora_inicio)) / 60, 0)::int AS minutos
+            FROM asignaciones a
+            WHERE a.docente_id = p_docente_id AND COALESCE(a.periodo, '') = p_periodo
+        ),
+        grupos AS (
+            -- Teoría y práctica de un mismo curso y sección son los mismos estudiantes
+            SELECT MAX(estudiantes) AS estudiantes FROM bloques GROUP BY curso_id, seccion_id
+        )
+        INSERT INTO carga_docente AS c (docente_id, periodo, bloques, minutos_semanales, franjas_ocupadas,
+                                        secciones, cursos, estudiantes, fecha_actualizacion)
+        SELECT p_docente_id, p_periodo,
+               (SELECT COUNT(*) FROM bloques),
+               (SELECT COALESCE(SUM(minutos), 0) FROM bloques),
+               (SELECT COALESCE(SUM(CEIL(minutos / {MINUTOS_BLOQUE}.0)), 0) FROM bloques),
+               (SELECT COUNT(DISTINCT seccion_id) FROM bloques),
+               (SELECT COUNT(DISTINCT curso_id) FROM bloques),
+               (SELECT COALESCE(SUM(estudiantes), 0) FROM grupos),
+               NOW()
+        ON CONFLICT (docente_id, periodo) DO UPDATE SET
+            bloques = EXCLUDED.bloques,
+            minutos_semanales = EXCLUDED.minutos_semanales,
+            franjas_ocupadas = EXCLUDED.franjas_ocupadas,
+            secciones = EXCLUDED.secciones,
+            cursos = EXCLUDED.cursos,
+            estudiantes = EXCLUDED.estudiantes,
+            fecha_actualizacion = NOW();
+    END;
+    $$ LANGUAGE plpgsql;
+
+    CREATE OR REPLACE FUNCTION actualizar_carga_docente() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            PERFORM recalcular_carga_docente(docente_id, periodo)
+            FROM (SELECT DISTINCT docente_id, COALESCE(periodo, '') AS periodo FROM nuevas) t;
+        ELSIF TG_OP = 'DELETE' THEN
+            PERFORM recalcular_carga_docente(docente_id, periodo)
+            FROM (SELECT DISTINCT docente_id, COALESCE(periodo, '') AS periodo FROM anteriores) t;
+        ELSE
+            PERFORM recalcular_carga_docente(docente_id, periodo)
+            FROM (
+                SELECT docente_id, COALESCE(periodo, '') AS periodo FROM nuevas
+                UNION
+                SELECT docente_id, COALESCE(periodo, '') AS periodo FROM anteriores
+            ) t;
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    -- Los triggers se crean solo si faltan (sin DROP/CREATE en cada arranque)
+    DO $$
+    BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_trigger
+                       WHERE tgname = 'trg_carga_docente_insert' AND tgrelid = 'asignaciones'::regclass) THEN
+            CREATE TRIGGER trg_carga_docente_insert
+                AFTER INSERT ON asignaciones REFERENCING NEW TABLE AS nuevas
+                FOR EACH STATEMENT EXECUTE FUNCTION actualizar_carga_docente();
+        END IF;
+        IF NOT EXISTS (SELECT 1 FROM pg_trigger
+                       WHERE tgname = 'trg_carga_docente_update' AND tgrelid = 'asignaciones'::regclass) THEN
+            CREATE TRIGGER trg_carga_docente_update
+                AFTER UPDATE ON asignaciones REFERENCING OLD TABLE AS anteriores NEW TABLE AS nuevas
+                FOR EACH STATEMENT EXECUTE FUNCTION actualizar_carga_docente();
+        END IF;
+        IF NOT EXISTS (SELECT 1 FROM pg_trigger
+                       WHERE tgname = 'trg_carga_docente_delete' AND tgrelid = 'asignaciones'::regclass) THEN
+            CREATE TRIGGER trg_carga_docente_delete
+                AFTER DELETE ON asignaciones REFERENCING OLD TABLE AS anteriores
+                FOR EACH STATEMENT EXECUTE FUNCTION actualizar_carga_docente();
+        END IF;
+    END;
+    $$;
+
+    CREATE TABLE IF NOT EXISTS carga_docente_carga (
+        fecha_carga TIMESTAMP NOT NULL DEFAULT NOW()
+    );
+
+    DO $$
+    BEGIN
+        -- Carga inicial, una sola vez (marcada en carga_docente_carga); después la
+        -- mantienen los triggers
+        LOCK TABLE carga_docente_carga IN EXCLUSIVE MODE;
+        IF NOT EXISTS (SELECT 1 FROM carga_docente_carga) THEN
+            DELETE FROM carga_docente c
+            WHERE NOT EXISTS (
+                SELECT 1 FROM asignaciones a
+                WHERE a.docente_id = c.docente_id AND COALESCE(a.periodo, '') = c.periodo
+            );
+            PERFORM recalcular_carga_docente(docente_id, periodo)
+            FROM (SELECT DISTINCT docente_id, COALESCE(periodo, '') AS periodo
+                  FROM asignaciones WHERE docente_id IS NOT NULL) t;
+
+            INSERT INTO carga_docente_carga DEFAULT VALUES;
+        END IF;
+    END;
+    $$;
+"""
+
+
+def asegurar_carga_docente():
+    """Crea (una vez por proceso) la tabla carga_docente y sus triggers."""
+    asegurar_franjas()
+    asegurar_esquema("carga_docente", ESQUEMA_CARGA)
+
+
+def init_carga_docente(app):
+    """Instala los triggers al iniciar, antes de la primera escritura en asignaciones."""
+    try:
+        asegurar_carga_docente()
+        app.logger.info("Triggers de carga docente instalados")
+    except Exception as e:
+        print(f"⚠️ No se pudo instalar la carga docente: {e}")
+
+
+def resumen_carga(fila):
+    """Campos derivados de una fila de carga_docente (dict con sus columnas)."""
+    franjas = fila.get("franjas_ocupadas") or 0
+    return {
+        "bloques": fila.get("bloques") or 0,
+        "horas_semanales": round((fila.get("minutos_semanales") or 0) / 60, 1),
+        "horas_academicas": franjas,
+        "franjas_libres": FRANJAS_SEMANA - franjas,
+        "secciones": fila.get("secciones") or 0,
+        "cursos": fila.get("cursos") or 0,
+        "estudiantes": fila.get("estudiantes") or 0,
+    }
@@ -0,0 +1,230 @@
+# services/cascada.py
+# Eliminación en cascada guiada por las llaves foráneas de la base de datos.
+#
+# El grafo de dependencias (tabla padre -> tablas hijas y sus columnas) se lee desde
+# pg_constraint y se recarga cuando cambian las llaves (firma de pg_constraint), así que
+# una migración no deja a los procesos con un grafo viejo. Para una entidad raíz se
+# arma el conjunto de tablas alcanzables y, para cada una, la condición que selecciona
+# sus filas afectadas:
+#     (fk) IN (SELECT pk FROM padre WHERE <condición del padre>)
+# combinando con OR los distintos caminos. Las tablas se borran en orden topológico
+# (hijas antes que padres) con un DELETE por tabla, dentro de la transacción del
+# llamador. En modo simulación solo se cuentan las filas.
+#
+# Solo se siguen las FK ON DELETE CASCADE y las hijas que el llamador autoriza de forma
+# explícita (`permitidas`). Una FK RESTRICT / NO ACTION hacia cualquier otra tabla
+# existe justamente para impedir el borrado: si tiene filas se aborta con ErrorCascada
+# y la lista de dependientes, sin borrar nada.
+import threading
+
+MAX_PROFUNDIDAD = 12
+
+_grafo = {"hijas": None, "llaves": None, "firma": None}
+_lock = threading.Lock()
+
+
+class ErrorCascada(Exception):
+    """La entidad no se puede eliminar (tabla desconocida, ciclo, dependientes protegidos...)."""
+
+    def __init__(self, mensaje, dependientes=None):
+        super().__init__(mensaje)
+        self.dependientes = dependientes or []
+
+
+def _id(nombre):
+    return '"' + nombre.replace('"', '""') + '"'
+
+
+def _columnas(columnas):
+    return ", ".join(_id(c) for c in columnas)
+
+
+def _firma(cur):
+    cur.execute("""
+        SELECT COUNT(*), COALESCE(SUM(c.oid::int8), 0)
+        FROM pg_constraint c
+        JOIN pg_namespace n ON n.oid = c.connamespace
+        WHERE c.contype IN ('f', 'p') AND n.nspname = current_schema()
+    """)
+    return tuple(cur.fetchone())
+
+
+def invalidar_grafo():
+    """Obliga a releer el grafo en la próxima planificación."""
+    _grafo["firma"] = None
+
+
+def cargar_grafo(cur, recargar=False):
+    """
+    {"hijas": {padre: [(hija, cols_hija, cols_padre, constraint, borrado)]}, "llaves": {tabla: [pk]}}
+    borrado es confdeltype: 'c' CASCADE, 'a' NO ACTION o 'r' RESTRICT. Las FK con
+    ON DELETE SET NULL / SET DEFAULT no se incluyen (esas las resuelve la BD).
+    """
+    firma = _firma(cur)
+    if _grafo["hijas"] is not None and not recargar and _grafo["firma"] == firma:
+        return _grafo
+    with _lock:
+        if _grafo["hijas"] is not None and not recargar and _grafo["firma"] == firma:
+            return _grafo
+        cur.execute("""
+            SELECT hija.relname, padre.relname, c.conname, c.confdeltype,
+                   ARRAY(SELECT a.attname FROM unnest(c.conkey) WITH ORDINALITY k(n, i)
+                         JOIN pg_attribute a ON a.attrelid = c.conrelid AND a.attnum = k.n
+                         ORDER BY k.i),
+                   ARRAY(SELECT a.attname FROM unnest(c.confkey) WITH ORDINALITY k(n, i)
+                         JOIN pg_attribute a ON a.attrelid = c.confrelid AND a.attnum = k.n
+                         ORDER BY k.i)
+            FROM pg_constraint c
+            JOIN pg_class hija ON hija.oid = c.conrelid
+            JOIN pg_class padre ON padre.oid = c.confrelid
+            JOIN pg_namespace n ON n.oid = hija.relnamespace
+            WHERE c.contype = 'f' AND n.nspname = current_schema()
+            ORDER BY hija.relname, c.conname
+        """)
+        hijas = {}
+        for hija, padre, nombre, accion, cols_hija, cols_padre in cur.fetchall():
+            if accion in ("n", "d") or hija == padre:
+                continue
+            hijas.setdefault(padre, []).append((hija, list(cols_hija), list(cols_padre), nombre, accion))
+
+        cur.execute("""
+            SELECT t.relname,
+                   ARRAY(SELECT a.attname FROM unnest(i.indkey) WITH ORDINALITY k(n, o)
+                         JOIN pg_attribute a ON a.attrelid = t.oid AND a.attnum = k.n
+                         ORDER BY k.o)
+            FROM pg_index i
+            JOIN pg_class t ON t.oid = i.indrelid
+            JOIN pg_namespace n ON n.oid = t.relnamespace
+            WHERE i.indisprimary AND n.nspname = current_schema()
+        """)
+        llaves = {tabla: list(columnas) for tabla, columnas in cur.fetchall()}
+        _grafo.update(hijas=hijas, llaves=llaves, firma=firma)
+    return _grafo
+
+
+def _se_sigue(arista, permitidas):
+    hija, _, _, _, accion = arista
+    return accion == "c" or hija in permitidas
+
+
+def _alcanzables(hijas, raiz, permitidas):
+    """Tablas alcanzables desde la raíz y orden de borrado (hijas primero)."""
+    orden, estado = [], {}
+
+    def visitar(tabla, profundidad):
+        if profundidad > MAX_PROFUNDIDAD:
+            raise ErrorCascada(f"La cascada desde {raiz} es demasiado profunda")
+        marca = estado.get(tabla)
+        if marca == "hecho":
+            return
+        if marca == "visitando":
+            raise ErrorCascada(f"Dependencia circular en la tabla {tabla}; elimine manualmente")
+        estado[tabla] = "visitando"
+        for arista in hijas.get(tabla, []):
+            if _se_sigue(arista, permitidas):
+                visitar(arista[0], profundidad + 1)
+        estado[tabla] = "hecho"
+        orden.append(tabla)
+
+    visitar(raiz, 0)
+    return orden
+
+
+def planificar(cur, tabla, columna=None, permitidas=()):
+    """
+    (pasos, bloqueos): pasos [(tabla, condición)] en orden de borrado para las filas de
+    `tabla` cuya `columna` (por defecto la PK) esté en %(raiz)s (lista de valores), y
+    bloqueos [(tabla hija, constraint, condición)] de las FK RESTRICT / NO ACTION que
+    no se siguen.
+    """
+    grafo = cargar_grafo(cur)
+    hijas = grafo["hijas"]
+    permitidas = set(permitidas)
+    if columna is None:
+        llave = grafo["llaves"].get(tabla)
+        if not llave or len(llave) != 1:
+            raise ErrorCascada(f"La tabla {tabla} no existe o no tiene una PK simple")
+        columna = llave[0]
+
+    orden = _alcanzables(hijas, tabla, permitidas)
+    condiciones = {tabla: [f"{_id(columna)} = ANY(%(raiz)s)"]}
+    bloqueos = []
+    # Recorrido de padres a hijas: cuando se procesa un padre ya tiene todas sus condiciones
+    for padre in reversed(orden):
+        condicion_padre = " OR ".join(condiciones[padre])
+        for arista in hijas.get(padre, []):
+            hija, cols_hija, cols_padre, constraint, _ = arista
+            condicion = (f"({_columnas(cols_hija)}) IN (SELECT {_columnas(cols_padre)} "
+                         f"FROM {_id(padre)} WHERE {condicion_padre})")
+            if _se_sigue(arista, permitidas):
+                condiciones.setdefault(hija, []).append(condicion)
+            else:
+                bloqueos.append((hija, constraint, condicion))
+    pasos = [(t, " OR ".join(f"({c})" for c in condiciones[t])) for t in orden]
+    # Si la hija protegida también se borra por otro camino, solo cuentan las filas que quedarían
+    borradas = dict(pasos)
+    bloqueos = [(hija, constraint, f"({condicion}) AND NOT ({borradas[hija]})" if hija in borradas else condicion)
+                for hija, constraint, condicion in bloqueos]
+    return pasos, bloqueos
+
+
+def _existe_columna(cur, tabla, columna):
+    cur.execute("""
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = current_schema() AND table_name = %s AND column_name = %s
+    """, (tabla, columna))
+    return cur.fetchone() is not None
+
+
+def eliminar_en_cascada(cur, tabla, valores, columna=None, simular=False, permitidas=(), relacionadas=()):
+    """
+    Borra (o, con simular=True, solo cuenta) las filas de `tabla` indicadas y lo que
+    depende de ellas por FK CASCADE o por FK hacia una tabla de `permitidas`.
+    `relacionadas` son [(tabla, columna)] que apuntan a la raíz sin FK (se borran
+    primero, con sus propias dependencias); si la tabla o la columna no existen se
+    informan en "omitidas".
+    Devuelve {"orden": [...], "conteos": {tabla: filas}, "total": n, "omitidas": [...],
+    "dependientes": [...]}. Si hay filas protegidas por FK RESTRICT / NO ACTION lanza
+    ErrorCascada (en simulación solo las informa). No hace commit.
+    """
+    parametros = {"raiz": list(valores)}
+    planes, omitidas = [], []
+    for tabla_rel, columna_rel in relacionadas:
+        if _existe_columna(cur, tabla_rel, columna_rel):
+            planes.append(planificar(cur, tabla_rel, columna_rel, permitidas))
+        else:
+            omitidas.append(f"{tabla_rel}.{columna_rel}")
+    planes.append(planificar(cur, tabla, columna, permitidas))
+
+    dependientes = []
+    for _, bloqueos in planes:
+        for hija, constraint, condicion in bloqueos:
+            cur.execute(f"SELECT COUNT(*) FROM {_id(hija)} WHERE {condicion}", parametros)
+            filas = cur.fetchone()[0]
+            if filas:
+                dependientes.append({"tabla": hija, "restriccion": constraint, "filas": filas})
+    if dependientes and not simular:
+        detalle = ", ".join(f"{d['tabla']} ({d['filas']})" for d in dependientes)
+        raise ErrorCascada(f"No se puede eliminar: hay registros que dependen de él en {detalle}",
+                           dependientes)
+
+    orden, conteos = [], {}
+    for pasos, _ in planes:
+        for tabla_paso, condicion in pasos:
+            if simular:
+                cur.execute(f"SELECT COUNT(*) FROM {_id(tabla_paso)} WHERE {condicion}", parametros)
+                filas = cur.fetchone()[0]
+            else:
+                cur.execute(f"DELETE FROM {_id(tabla_paso)} WHERE {condicion}", parametros)
+                filas = cur.rowcount
+            conteos[tabla_paso] = conteos.get(tabla_paso, 0) + filas
+            if tabla_paso not in orden:
+                orden.append(tabla_paso)
+    return {
+        "orden": orden,
+        "conteos": conteos,
+        "total": sum(conteos.values()),
+        "omitidas": omitidas,
+        "dependientes": dependientes,
+        "simulacion": simular,
+    }
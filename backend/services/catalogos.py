@@ -0,0 +1,298 @@
+# services/catalogos.py
+# Datos de referencia (ubigeo, escuelas, formaciones, especialidades, pabellones y
+# tipos de aula) en memoria del proceso. Se cargan al iniciar y los endpoints de
+# combos los sirven sin tocar la base de datos. Cada VERIFICAR_SEGUNDOS se compara la
+# versión de las tablas (services.versiones) y, si cambió o pasó el TTL, se recargan
+# todas de una vez; mientras tanto los lectores siguen usando la copia anterior.
+#
+# También arma el paquete de arranque de cada rol (todos los catálogos de sus
+# formularios y el árbol de ubigeo) como JSON con su ETag, para que el frontend lo
+# guarde y lo revalide con una sola petición condicional.
+#
+# Para el autocompletado de ubigeo se mantiene un arreglo ordenado de claves
+# normalizadas (sin tildes, minúsculas, una por cada palabra del nombre); un prefijo
+# se resuelve con bisect y un recorrido corto, sin consultar la base de datos.
+import hashlib
+import json
+import os
+import threading
+import time
+import unicodedata
+from bisect import bisect_left
+
+from database.db import conectar
+from services.versiones import obtener_versiones
+
+VERIFICAR_SEGUNDOS = int(os.getenv("CATALOGOS_VERIFICAR_SEG", "30"))
+TTL_SEGUNDOS = int(os.getenv("CATALOGOS_TTL_SEG", "3600"))
+
+# nombre -> (tabla, consulta); las columnas de la consulta son las claves de cada fila
+CATALOGOS = {
+    "departamentos": ("departamento_geo", """
+        SELECT departamento_id, nombre_departamento
+        FROM departamento_geo ORDER BY nombre_departamento
+    """),
+    "provincias": ("provincia", """
+        SELECT provincia_id, nombre_provincia, departamento_id
+        FROM provincia ORDER BY nombre_provincia
+    """),
+    "distritos": ("distrito", """
+        SELECT distrito_id, nombre_distrito, provincia_id
+        FROM distrito ORDER BY nombre_distrito
+    """),
+    "escuelas": ("escuela", """
+        SELECT escuela_id, nombre_escuela, facultad
+        FROM escuela ORDER BY nombre_escuela
+    """),
+    "formaciones": ("formacion", """
+        SELECT id_formacion, nombre_formacion
+        FROM formacion ORDER BY nombre_formacion
+    """),
+    "especialidades": ("especialidad", """
+        SELECT id_especialidad, nombre_especialidad
+        FROM especialidad ORDER BY nombre_especialidad
+    """),
+    "pabellones": ("pabellon", """
+        SELECT pabellon_id, nombre_pabellon
+        FROM pabellon ORDER BY nombre_pabellon
+    """),
+    "tipos_aula": ("tipo_aula_cat", """
+        SELECT tipo_aula_id, nombre_tipo
+        FROM tipo_aula_cat ORDER BY nombre_tipo
+    """),
+}
+TABLAS_CATALOGOS = tuple(tabla for tabla, _ in CATALOGOS.values())
+
+NIVELES_UBIGEO = ("departamento", "provincia", "distrito")
+LIMITE_UBIGEO = 10
+MAX_LIMITE_UBIGEO = 50
+MAX_COINCIDENCIAS_UBIGEO = 2000
+
+# Catálogos que usan los formularios de cada rol (además del árbol de ubigeo)
+CATALOGOS_ROL = {
+    "admin": ("escuelas",),
+    "superadmin": ("escuelas", "formaciones", "especialidades", "pabellones", "tipos_aula"),
+}
+
+# Instantánea inmutable: se reemplaza completa al recargar
+_estado = {"datos": None, "firma": None, "cargado": None, "verificado": None}
+_lock = threading.Lock()
+
+
+def _agrupar(filas, columna):
+    """{str(valor de la columna): [filas sin esa columna]} conservando el orden."""
+    grupos = {}
+    for fila in filas:
+        resto = {k: v for k, v in fila.items() if k != columna}
+        grupos.setdefault(str(fila[columna]), []).append(resto)
+    return grupos
+
+
+def _firma(conn):
+    versiones = obtener_versiones(conn, TABLAS_CATALOGOS)
+    return tuple(versiones[tabla][0] for tabla in TABLAS_CATALOGOS)
+
+
+def _cargar(conn):
+    firma = _firma(conn)
+    datos = {}
+    cur = conn.cursor()
+    try:
+        for nombre, (_, consulta) in CATALOGOS.items():
+            cur.execute(consulta)
+            columnas = [c[0] for c in cur.description]
+            datos[nombre] = [dict(zip(columnas, fila)) for fila in cur.fetchall()]
+    finally:
+        cur.close()
+    datos["provincias_por_departamento"] = _agrupar(datos["provincias"], "departamento_id")
+    datos["distritos_por_provincia"] = _agrupar(datos["distritos"], "provincia_id")
+    datos["firma"] = firma
+    datos["paquetes"] = {}
+    datos["indice_ubigeo"] = _indice_ubigeo(datos)
+    conn.commit()
+    return firma, datos
+
+
+def _arbol_ubigeo(datos):
+    """[[departamento_id, nombre, [[provincia_id, nombre, [[distrito_id, nombre], ...]], ...]], ...]"""
+    distritos = datos["distritos_por_provincia"]
+    provincias = datos["provincias_por_departamento"]
+    return [
+        [dep["departamento_id"], dep["nombre_departamento"], [
+            [prov["provincia_id"], prov["nombre_provincia"], [
+                [dist["distrito_id"], dist["nombre_distrito"]]
+                for dist in distritos.get(str(prov["provincia_id"]), [])
+            ]]
+            for prov in provincias.get(str(dep["departamento_id"]), [])
+        ]]
+        for dep in datos["departamentos"]
+    ]
+
+
+def _al_dia(ahora):
+    verificado = _estado["verificado"]
+    return _estado["datos"] is not None and verificado is not None and ahora - verificado < VERIFICAR_SEGUNDOS
+
+
+def normalizar(texto):
+    """Minúsculas, sin tildes ni diéresis (ñ -> n) y con espacios simples."""
+    descompuesto = unicodedata.normalize("NFKD", str(texto or "").lower())
+    return " ".join("".join(c for c in descompuesto if not unicodedata.combining(c)).split())
+
+
+def _indice_ubigeo(datos):
+    """
+    (textos, claves, entradas, nombres): claves ordenadas [(texto, posición de palabra,
+    n° de entrada)], entradas con la ruta completa de cada departamento, provincia y
+    distrito, y el nombre normalizado de cada entrada para ordenar.
+    """
+    departamentos = {str(d["departamento_id"]): d for d in datos["departamentos"]}
+    provincias = {str(p["provincia_id"]): p for p in datos["provincias"]}
+    entradas = []
+    for d in datos["departamentos"]:
+        entradas.append({
+            "nivel": "departamento", "id": d["departamento_id"], "nombre": d["nombre_departamento"],
+            "departamento_id": d["departamento_id"], "departamento": d["nombre_departamento"],
+            "ruta": d["nombre_departamento"],
+        })
+    for p in datos["provincias"]:
+        d = departamentos.get(str(p["departamento_id"]))
+        if d is None:
+            continue
+        entradas.append({
+            "nivel": "provincia", "id": p["provincia_id"], "nombre": p["nombre_provincia"],
+            "departamento_id": d["departamento_id"], "departamento": d["nombre_departamento"],
+            "provincia_id": p["provincia_id"], "provincia": p["nombre_provincia"],
+            "ruta": f"{p['nombre_provincia']}, {d['nombre_departamento']}",
+        })
+    for t in datos["distritos"]:
+        p = provincias.get(str(t["provincia_id"]))
+        d = departamentos.get(str(p["departamento_id"])) if p else None
+        if d is None:
+            continue
+        entradas.append({
+            "nivel": "distrito", "id": t["distrito_id"], "nombre": t["nombre_distrito"],
+            "departamento_id": d["departamento_id"], "departamento": d["nombre_departamento"],
+            "provincia_id": p["provincia_id"], "provincia": p["nombre_provincia"],
+            "distrito_id": t["distrito_id"], "distrito": t["nombre_distrito"],
+            "ruta": f"{t['nombre_distrito']}, {p['nombre_provincia']}, {d['nombre_departamento']}",
+        })
+
+    claves, nombres = [], []
+    for n, entrada in enumerate(entradas):
+        nombres.append(normalizar(entrada["nombre"]))
+        palabras = nombres[-1].split(" ")
+        # Una clave por palabra: "lurig" encuentra "San Juan de Lurigancho"
+        for i in range(len(palabras)):
+            claves.append((" ".join(palabras[i:]), i, n))
+    claves.sort()
+    return [c[0] for c in claves], claves, entradas, nombres
+
+
+def _vigente():
+    """Devuelve los datos en memoria, recargándolos si cambió la versión o venció el TTL."""
+    ahora = time.monotonic()
+    if _al_dia(ahora):
+        return _estado["datos"]
+
+    with _lock:
+        if _al_dia(ahora):
+            return _estado["datos"]
+        conn = None
+        try:
+            conn = conectar()
+            if _estado["datos"] is not None and ahora - _estado["cargado"] < TTL_SEGUNDOS:
+                if _firma(conn) == _estado["firma"]:
+                    _estado["verificado"] = ahora
+                    return _estado["datos"]
+            firma, datos = _cargar(conn)
+            _estado.update(datos=datos, firma=firma, cargado=ahora, verificado=ahora)
+            return datos
+        except Exception as e:
+            if _estado["datos"] is None:
+                raise
+            # Sin BD se sigue sirviendo la última copia y se reintenta en el próximo intervalo
+            print(f"⚠️ No se pudieron verificar los catálogos, se usa la copia en memoria: {e}")
+            _estado["verificado"] = ahora
+            return _estado["datos"]
+        finally:
+            if conn is not None:
+                conn.close()
+
+
+def obtener(nombre):
+    """Lista completa de un catálogo (no modificar las filas devueltas)."""
+    return _vigente()[nombre]
+
+
+def provincias_de(departamento_id):
+    return _vigente()["provincias_por_departamento"].get(str(departamento_id), [])
+
+
+def distritos_de(provincia_id):
+    return _vigente()["distritos_por_provincia"].get(str(provincia_id), [])
+
+
+def firma_catalogos():
+    """Versión de los datos en memoria (cambia con cada recarga con cambios)."""
+    return _vigente()["firma"]
+
+
+def paquete_rol(rol):
+    """
+    {"contenido": JSON (bytes), "etag": sha1} con los catálogos del rol y el árbol de
+    ubigeo. Se genera una vez por versión de los catálogos.
+    """
+    if rol not in CATALOGOS_ROL:
+        raise KeyError(rol)
+    datos = _vigente()
+    paquete = datos["paquetes"].get(rol)
+    if paquete is None:
+        cuerpo = {nombre: datos[nombre] for nombre in CATALOGOS_ROL[rol]}
+        cuerpo["ubigeo"] = {
+            "formato": ["id", "nombre", "hijos"],
+            "departamentos": _arbol_ubigeo(datos),
+        }
+        cuerpo["version"] = ".".join(str(v) for v in datos["firma"])
+        contenido = json.dumps(cuerpo, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+        paquete = {"contenido": contenido, "etag": hashlib.sha1(contenido).hexdigest()}
+        datos["paquetes"][rol] = paquete
+    return paquete
+
+
+def buscar_ubigeo(texto, nivel=None, limite=LIMITE_UBIGEO):
+    """
+    Departamentos, provincias y distritos cuyo nombre (o alguna de sus palabras) empieza
+    con `texto`, sin distinguir tildes. Primero los que empiezan por la primera palabra.
+    """
+    prefijo = normalizar(texto)
+    if not prefijo:
+        return []
+    limite = min(max(int(limite), 1), MAX_LIMITE_UBIGEO)
+    textos, claves, entradas, nombres = _vigente()["indice_ubigeo"]
+
+    vistas = {}
+    i = bisect_left(textos, prefijo)
+    while i < len(textos) and textos[i].startswith(prefijo) and len(vistas) < MAX_COINCIDENCIAS_UBIGEO:
+        _, posicion, n = claves[i]
+        if nivel is None or entradas[n]["nivel"] == nivel:
+            vistas[n] = min(posicion, vistas.get(n, posicion))
+        i += 1
+
+    orden = sorted(vistas, key=lambda n: (vistas[n] > 0, NIVELES_UBIGEO.index(entradas[n]["nivel"]),
+                                          nombres[n], n))
+    return [entradas[n] for n in orden[:limite]]
+
+
+def invalidar():
+    """Fuerza la verificación de versión en la próxima lectura."""
+    _estado["verificado"] = None
+
+
+def init_catalogos(app):
+    """Precarga los catálogos al iniciar; si la BD no responde se cargan en la primera petición."""
+    try:
+        _vigente()
+        app.logger.info("Catálogos de referencia cargados en memoria")
+    except Exception as e:
+        print(f"⚠️ No se pudieron precargar los catálogos: {e}")
@@ -0,0 +1,126 @@
+# services/conflictos.py
+# Detector de cruces de horario por barrido (sweep-line).
+#
+# Los bloques se agrupan por (periodo, recurso, día) —recurso = aula, docente o
+# sección—, se ordenan por hora de inicio y se recorren manteniendo un montículo con
+# los bloques "abiertos" ordenados por hora de fin. Cada bloque nuevo cierra los que
+# terminaron antes de su inicio y cruza con todos los que siguen abiertos:
+# O(n log n + k) para k cruces, en lugar de una consulta por par.
+import heapq
+
+from services.horarios import minutos_del_dia
+
+RECURSOS = ("aula", "docente", "seccion")
+
+
+def _hhmm(minutos):
+    return f"{minutos // 60:02d}:{minutos % 60:02d}"
+
+
+def _resumen(bloque):
+    return {
+        clave: bloque.get(clave)
+        for clave in ("asignacion_id", "fila", "curso_id", "curso", "seccion_id", "seccion",
+                      "docente_id", "docente", "aula_id", "aula", "tipo", "dia")
+        if bloque.get(clave) is not None
+    } | {"hora_inicio": _hhmm(bloque["_inicio"]), "hora_fin": _hhmm(bloque["_fin"])}
+
+
+def detectar_conflictos(bloques, solo_con=None):
+    """
+    Devuelve los cruces de aula, docente y sección entre los bloques dados.
+    Cada bloque es un dict con aula_id, docente_id, seccion_id, dia, hora_inicio y
+    hora_fin (time o 'HH:MM'); periodo, asignacion_id y fila son opcionales.
+    `solo_con` (función bloque -> bool) limita el reporte a cruces que involucren
+    al menos un bloque que la cumpla (p. ej. solo los bloques nuevos).
+    """
+    grupos = {}
+    for original in bloques:
+        if not original.get("dia") or not original.get("hora_inicio") or not original.get("hora_fin"):
+            continue
+        bloque = dict(original, _inicio=minutos_del_dia(original["hora_inicio"]),
+                      _fin=minutos_del_dia(original["hora_fin"]))
+        for recurso in RECURSOS:
+            recurso_id = bloque.get(f"{recurso}_id")
+            if recurso_id is None:
+                continue
+            clave = (bloque.get("periodo") or "", recurso, recurso_id, bloque["dia"])
+            grupos.setdefault(clave, []).append(bloque)
+
+    conflictos = []
+    for (periodo, recurso, recurso_id, dia), lista in grupos.items():
+        if len(lista) < 2:
+            continue
+        lista.sort(key=lambda b: (b["_inicio"], b["_fin"]))
+        abiertos = []  # (fin, orden, bloque)
+        for orden, bloque in enumerate(lista):
+            while abiertos and abiertos[0][0] <= bloque["_inicio"]:
+                heapq.heappop(abiertos)
+            for _, _, otro in abiertos:
+                if solo_con and not (solo_con(bloque) or solo_con(otro)):
+                    continue
+                conflictos.append({
+                    "tipo": recurso,
+                    "recurso_id": recurso_id,
+                    "periodo": periodo or None,
+                    "dia": dia,
+                    "desde": _hhmm(max(bloque["_inicio"], otro["_inicio"])),
+                    "hasta": _hhmm(min(bloque["_fin"], otro["_fin"])),
+                    "bloques": [_resumen(otro), _resumen(bloque)],
+                })
+            heapq.heappush(abiertos, (bloque["_fin"], orden, bloque))
+
+    conflictos.sort(key=lambda c: (c["periodo"] or "", c["tipo"], str(c["recurso_id"]), c["dia"], c["desde"]))
+    por_tipo = {recurso: 0 for recurso in RECURSOS}
+    for conflicto in conflictos:
+        por_tipo[conflicto["tipo"]] += 1
+    return {"total": len(conflictos), "por_tipo": por_tipo, "conflictos": conflictos}
+
+
+def cargar_bloques(cur, periodos=None, excluir_ids=None):
+    """Asignaciones con horario (de los periodos dados o de todos) listas para detectar_conflictos."""
+    cur.execute("""
+        SELECT a.asignacion_id, s.periodo, a.curso_id, c.nombre, a.seccion_id, s.codigo,
+               a.docente_id, p.nombres || ' ' || p.apellidos, a.aula_id, au.nombre_aula,
+               a.tipo, a.dia, a.hora_inicio, a.hora_fin
+        FROM asignaciones a
+        JOIN secciones s ON a.seccion_id = s.seccion_id
+        LEFT JOIN curso c ON a.curso_id = c.curso_id
+        LEFT JOIN docente d ON a.docente_id = d.docente_id
+        LEFT JOIN persona p ON d.persona_id = p.persona_id
+        LEFT JOIN aula au ON a.aula_id = au.aula_id
+        WHERE (%s::text[] IS NULL OR s.periodo = ANY(%s::text[]))
+          AND NOT (a.asignacion_id = ANY(%s::int[]))
+          AND a.dia IS NOT NULL AND a.hora_inicio IS NOT NULL AND a.hora_fin IS NOT NULL
+    """, (periodos, periodos, list(excluir_ids or [])))
+    columnas = ("asignacion_id", "periodo", "curso_id", "curso", "seccion_id", "seccion",
+                "docente_id", "docente", "aula_id", "aula", "tipo", "dia", "hora_inicio", "hora_fin")
+    return [dict(zip(columnas, fila)) for fila in cur.fetchall()]
+
+
+def validar_cambios(cur, nuevos, excluir_ids=None):
+    """
+    Validador previo a un cambio masivo: cruza los bloques nuevos (o modificados)
+    contra el horario vigente de sus periodos y entre sí. El periodo de cada bloque
+    sale de su sección si no viene indicado. `excluir_ids` son las asignaciones que
+    el cambio reemplaza o elimina. Solo reporta cruces en los que participa algún
+    bloque nuevo.
+    """
+    sin_periodo = {b["seccion_id"] for b in nuevos if not b.get("periodo") and b.get("seccion_id")}
+    periodo_seccion = {}
+    if sin_periodo:
+        cur.execute("SELECT seccion_id, periodo FROM secciones WHERE seccion_id = ANY(%s)",
+                    ([int(s) for s in sin_periodo],))
+        periodo_seccion = dict(cur.fetchall())
+
+    marcados = []
+    for bloque in nuevos:
+        marcado = dict(bloque, _nuevo=True)
+        for recurso in RECURSOS:
+            if marcado.get(f"{recurso}_id") is not None:
+                marcado[f"{recurso}_id"] = int(marcado[f"{recurso}_id"])
+        marcado["periodo"] = bloque.get("periodo") or periodo_seccion.get(marcado.get("seccion_id"))
+        marcados.append(marcado)
+    periodos = sorted({b["periodo"] for b in marcados if b["periodo"]})
+    existentes = cargar_bloques(cur, periodos, excluir_ids) if periodos else []
+    return detectar_conflictos(existentes + marcados, solo_con=lambda b: b.get("_nuevo", False))
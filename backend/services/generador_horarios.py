@@ -0,0 +1,454 @@
+# services/generador_horarios.py
+# Generador automático de horarios para un periodo.
+#
+# Cada curso de una sección se divide en sus bloques TEORICO / PRACTICO (horas_teoricas
+# y horas_practicas, en horas académicas de 50 min). Cada bloque se ubica en la grilla
+# HORARIOS_VALIDOS con un día, una hora de inicio, un aula y un docente (el mismo para
+# los dos bloques del curso en la sección, como en crear_asignacion).
+#
+# La ocupación de aulas, docentes y secciones se lleva como máscaras de bits por día
+# (un bit por franja), así que comprobar un cruce es un AND. La búsqueda es un
+# backtracking con:
+#   - MRV: se ubica primero el bloque con menos (día, inicio) posibles;
+#   - verificación hacia adelante: tras cada ubicación, todos los bloques pendientes
+#     de la misma sección o docente deben seguir teniendo al menos una opción;
+#   - como mucho MAX_VALORES alternativas por bloque y un tiempo límite.
+# Antes de buscar se descartan los bloques sin ninguna opción (sin aula, sin docente o
+# sin día/hora libre): no tiene sentido agotar el tiempo límite retrocediendo por ellos.
+# Se devuelven en sin_ubicar con el motivo.
+# Si no se encuentra un horario completo se devuelve el mejor parcial y la lista de
+# bloques sin ubicar.
+import time
+
+from services.horarios import (
+    HORARIOS_VALIDOS, DIAS, TOTAL_FRANJAS, hora_fin_bloque, mascara_franjas
+)
+
+MAX_VALORES = 30
+TIEMPO_LIMITE_DEFECTO = 10
+TIEMPO_LIMITE_MAXIMO = 60
+
+
+class ErrorGenerador(Exception):
+    """Parámetros inválidos para generar el horario."""
+
+
+class _Bloque:
+    __slots__ = ("indice", "grupo", "curso_id", "seccion_id", "tipo", "duracion", "estudiantes", "aulas")
+
+    def __init__(self, indice, grupo, curso_id, seccion_id, tipo, duracion, estudiantes, aulas):
+        self.indice = indice
+        self.grupo = grupo
+        self.curso_id = curso_id
+        self.seccion_id = seccion_id
+        self.tipo = tipo
+        self.duracion = duracion
+        self.estudiantes = estudiantes
+        self.aulas = aulas
+
+
+def _lista_ids(valor, nombre):
+    if valor is None:
+        return None
+    try:
+        return [int(v) for v in valor]
+    except (TypeError, ValueError):
+        raise ErrorGenerador(f"'{nombre}' debe ser una lista de IDs numéricos")
+
+
+def cargar_problema(cur, parametros):
+    """Lee de la BD secciones, cursos, docentes, aulas y la ocupación ya registrada."""
+    periodo = parametros.get("periodo")
+    if not periodo:
+        raise ErrorGenerador("El periodo es obligatorio")
+    try:
+        estudiantes_defecto = int(parametros.get("estudiantes", 30))
+    except (TypeError, ValueError):
+        raise ErrorGenerador("'estudiantes' debe ser numérico")
+    estudiantes_por_seccion = {
+        int(k): int(v) for k, v in (parametros.get("estudiantes_por_seccion") or {}).items()
+    }
+    secciones_filtro = _lista_ids(parametros.get("secciones"), "secciones")
+    cursos_filtro = _lista_ids(parametros.get("cursos"), "cursos")
+    docentes_filtro = _lista_ids(parametros.get("docentes"), "docentes")
+    docentes_por_curso = {
+        int(k): _lista_ids(v, "docentes_por_curso") for k, v in (parametros.get("docentes_por_curso") or {}).items()
+    }
+    tipos_aula = {
+        tipo: set(_lista_ids(ids, "tipos_aula") or [])
+        for tipo, ids in (parametros.get("tipos_aula") or {}).items()
+    }
+    dias = parametros.get("dias") or DIAS
+    if any(dia not in DIAS for dia in dias):
+        raise ErrorGenerador(f"Días válidos: {', '.join(DIAS)}")
+
+    # Secciones activas del periodo
+    cur.execute("""
+        SELECT seccion_id, codigo, ciclo_academico
+        FROM secciones
+        WHERE periodo = %s AND UPPER(estado) = 'ACTIVO'
+          AND (%s::int[] IS NULL OR seccion_id = ANY(%s::int[]))
+        ORDER BY codigo
+    """, (periodo, secciones_filtro, secciones_filtro))
+    secciones = cur.fetchall()
+    if not secciones:
+        raise ErrorGenerador("No hay secciones activas para el periodo indicado")
+
+    # Cursos activos del ciclo de cada sección que aún no tienen asignación en ella
+    cur.execute("""
+        SELECT s.seccion_id, c.curso_id, c.codigo, c.nombre,
+               COALESCE(c.horas_teoricas, 0), COALESCE(c.horas_practicas, 0)
+        FROM secciones s
+        JOIN curso c ON c.ciclo = s.ciclo_academico AND c.estado = TRUE
+        WHERE s.seccion_id = ANY(%s)
+          AND (%s::int[] IS NULL OR c.curso_id = ANY(%s::int[]))
+          AND NOT EXISTS (
+              SELECT 1 FROM asignaciones a
+              WHERE a.seccion_id = s.seccion_id AND a.curso_id = c.curso_id
+          )
+        ORDER BY s.seccion_id, c.curso_id
+    """, ([fila[0] for fila in secciones], cursos_filtro, cursos_filtro))
+    cursos_seccion = cur.fetchall()
+
+    cur.execute("""
+        SELECT d.docente_id, p.nombres || ' ' || p.apellidos
+        FROM docente d
+        JOIN persona p ON d.persona_id = p.persona_id
+        WHERE d.estado = TRUE
+          AND (%s::int[] IS NULL OR d.docente_id = ANY(%s::int[]))
+        ORDER BY d.docente_id
+    """, (docentes_filtro, docentes_filtro))
+    docentes = cur.fetchall()
+    if not docentes:
+        raise ErrorGenerador("No hay docentes disponibles")
+
+    cur.execute("""
+        SELECT a.aula_id, a.nombre_aula, a.capacidad, a.tipo_aula_id
+        FROM aula a
+        WHERE UPPER(a.estado) = 'OPERATIVO'
+        ORDER BY a.capacidad, a.aula_id
+    """)
+    aulas = cur.fetchall()
+    if not aulas:
+        raise ErrorGenerador("No hay aulas operativas")
+
+    # Ocupación ya registrada en el periodo
+    cur.execute("""
+        SELECT a.aula_id, a.docente_id, a.seccion_id, a.dia, a.hora_inicio, a.hora_fin
+        FROM asignaciones a
+        JOIN secciones s ON a.seccion_id = s.seccion_id
+        WHERE s.periodo = %s AND a.dia IS NOT NULL AND a.hora_inicio IS NOT NULL AND a.hora_fin IS NOT NULL
+    """, (periodo,))
+    ocupadas = cur.fetchall()
+
+    return {
+        "periodo": periodo,
+        "dias": list(dias),
+        "secciones": {fila[0]: {"codigo": fila[1], "ciclo": fila[2]} for fila in secciones},
+        "cursos_seccion": cursos_seccion,
+        "docentes": {fila[0]: fila[1] for fila in docentes},
+        "aulas": [{"aula_id": f[0], "nombre": f[1], "capacidad": f[2] or 0, "tipo_aula_id": f[3]} for f in aulas],
+        "ocupadas": ocupadas,
+        "estudiantes": estudiantes_defecto,
+        "estudiantes_por_seccion": estudiantes_por_seccion,
+        "docentes_por_curso": docentes_por_curso,
+        "tipos_aula": tipos_aula,
+    }
+
+
+class _Solucionador:
+    def __init__(self, problema):
+        self.dias = problema["dias"]
+        self.n_dias = len(self.dias)
+        self.docentes = problema["docentes"]
+        self.aulas = problema["aulas"]
+        self.cursos = {}
+
+        vacio = lambda: [0] * self.n_dias
+        self.ocupa_aula = {a["aula_id"]: vacio() for a in self.aulas}
+        self.ocupa_docente = {d: vacio() for d in self.docentes}
+        self.ocupa_seccion = {s: vacio() for s in problema["secciones"]}
+        indice_dia = {dia: i for i, dia in enumerate(self.dias)}
+        for aula_id, docente_id, seccion_id, dia, inicio, fin in problema["ocupadas"]:
+            if dia not in indice_dia:
+                continue
+            d, mascara = indice_dia[dia], mascara_franjas(inicio, fin)
+            for tabla, clave in ((self.ocupa_aula, aula_id), (self.ocupa_docente, docente_id),
+                                 (self.ocupa_seccion, seccion_id)):
+                if clave in tabla:
+                    tabla[clave][d] |= mascara
+
+        # Bloques a ubicar y candidatos (docentes por grupo, aulas por bloque)
+        self.bloques = []
+        self.candidatos_docente = {}
+        self.docente_grupo = {}
+        self.bloques_grupo = {}
+        self.sin_opciones = []
+        self.motivos = {}
+        todos_docentes = tuple(self.docentes)
+        for seccion_id, curso_id, codigo, nombre, horas_t, horas_p in problema["cursos_seccion"]:
+            self.cursos[curso_id] = {"codigo": codigo, "nombre": nombre, "horas": {"TEORICO": horas_t, "PRACTICO": horas_p}}
+            grupo = (curso_id, seccion_id)
+            candidatos = problema["docentes_por_curso"].get(curso_id)
+            self.candidatos_docente[grupo] = (
+                tuple(d for d in candidatos if d in self.docentes) if candidatos else todos_docentes
+            )
+            estudiantes = problema["estudiantes_por_seccion"].get(seccion_id, problema["estudiantes"])
+            for tipo, horas in (("TEORICO", horas_t), ("PRACTICO", horas_p)):
+                if horas <= 0:
+                    continue
+                tipos = problema["tipos_aula"].get(tipo)
+                aulas = [a["aula_id"] for a in self.aulas
+                         if a["capacidad"] >= estudiantes and (not tipos or a["tipo_aula_id"] in tipos)]
+                bloque = _Bloque(len(self.bloques), grupo, curso_id, seccion_id, tipo, horas, estudiantes, aulas)
+                if horas > TOTAL_FRANJAS:
+                    motivo = f"dura {horas} horas y la jornada tiene {TOTAL_FRANJAS} franjas"
+                elif not aulas:
+                    motivo = f"ninguna aula operativa del tipo requerido tiene capacidad para {estudiantes} estudiantes"
+                elif not self.candidatos_docente[grupo]:
+                    motivo = "ningún docente activo puede dictar el curso"
+                else:
+                    motivo = None
+                if motivo:
+                    self._descartar(bloque, motivo)
+                    continue
+                self.bloques.append(bloque)
+                self.bloques_grupo.setdefault(grupo, []).append(bloque)
+        for i, bloque in enumerate(self.bloques):
+            bloque.indice = i
+
+        self.asignacion = {}
+        self.carga_docente = {d: 0 for d in self.docentes}
+        self.nodos = 0
+        self._version = 0
+        self._cache_comun = {}
+
+        # Dominio vacío ya con el horario registrado: se descarta antes de buscar
+        for bloque in list(self.bloques):
+            if next(self._valores(bloque), None) is None:
+                self.bloques.remove(bloque)
+                self.bloques_grupo[bloque.grupo].remove(bloque)
+                self._descartar(bloque, "no queda día y hora con la sección, un docente y un aula libres")
+        for i, bloque in enumerate(self.bloques):
+            bloque.indice = i
+
+    def _descartar(self, bloque, motivo):
+        self.sin_opciones.append(bloque)
+        self.motivos[id(bloque)] = motivo
+
+    # ---------------- máscaras y opciones ----------------
+    @staticmethod
+    def _mascara(inicio, duracion):
+        return ((1 << duracion) - 1) << inicio
+
+    def _docentes_posibles(self, bloque):
+        fijo = self.docente_grupo.get(bloque.grupo)
+        return [fijo[0]] if fijo else self.candidatos_docente[bloque.grupo]
+
+    def _ocupacion_comun(self, docentes, d):
+        """Franjas en las que TODOS los docentes indicados están ocupados (cacheado por versión)."""
+        clave = (id(docentes), d)
+        cache = self._cache_comun.get(clave)
+        if cache and cache[0] == self._version:
+            return cache[1]
+        comun = ~0
+        for docente_id in docentes:
+            comun &= self.ocupa_docente[docente_id][d]
+        self._cache_comun[clave] = (self._version, comun)
+        return comun
+
+    def _horarios_libres(self, bloque, limite=None):
+        """
+        (día, inicio) con la sección libre y algún docente posible libre. Si el docente
+        del grupo aún no está fijado la cuenta es optimista (no exige que sea el mismo
+        docente en todas las franjas), lo cual basta para ordenar y podar.
+        """
+        fijo = self.docente_grupo.get(bloque.grupo)
+        seccion = self.ocupa_seccion[bloque.seccion_id]
+        total = 0
+        for d in range(self.n_dias):
+            if fijo:
+                ocupado = seccion[d] | self.ocupa_docente[fijo[0]][d]
+            else:
+                ocupado = seccion[d] | self._ocupacion_comun(self.candidatos_docente[bloque.grupo], d)
+            for inicio in range(TOTAL_FRANJAS - bloque.duracion + 1):
+                if not ocupado & self._mascara(inicio, bloque.duracion):
+                    total += 1
+                    if limite and total >= limite:
+                        return total
+        return total
+
+    def _valores(self, bloque):
+        """Alternativas (día, inicio, docente, aula) en orden de preferencia."""
+        docentes = sorted(self._docentes_posibles(bloque), key=lambda d: self.carga_docente[d])
+        seccion = self.ocupa_seccion[bloque.seccion_id]
+        dias_grupo = {self.asignacion[b.indice][0] for b in self.bloques_grupo[bloque.grupo]
+                      if b.indice in self.asignacion}
+        # Días menos cargados para la sección primero; evitar el día del otro bloque del curso
+        orden_dias = sorted(range(self.n_dias), key=lambda d: (d in dias_grupo, bin(seccion[d]).count("1"), d))
+        generados = 0
+        for d in orden_dias:
+            for inicio in range(TOTAL_FRANJAS - bloque.duracion + 1):
+                mascara = self._mascara(inicio, bloque.duracion)
+                if seccion[d] & mascara:
+                    continue
+                for docente_id in docentes:
+                    if self.ocupa_docente[docente_id][d] & mascara:
+                        continue
+                    # Aulas ordenadas por capacidad: la más ajustada que esté libre
+                    aula_id = next((a for a in bloque.aulas if not self.ocupa_aula[a][d] & mascara), None)
+                    if aula_id is None:
+                        break
+                    yield d, inicio, docente_id, aula_id
+                    generados += 1
+                    if generados >= MAX_VALORES:
+                        return
+                    break
+
+    # ---------------- asignar / deshacer ----------------
+    def _asignar(self, bloque, valor):
+        d, inicio, docente_id, aula_id = valor
+        mascara = self._mascara(inicio, bloque.duracion)
+        self.ocupa_seccion[bloque.seccion_id][d] |= mascara
+        self.ocupa_docente[docente_id][d] |= mascara
+        self.ocupa_aula[aula_id][d] |= mascara
+        self.carga_docente[docente_id] += bloque.duracion
+        self._version += 1
+        fijo = self.docente_grupo.setdefault(bloque.grupo, [docente_id, 0])
+        fijo[1] += 1
+        self.asignacion[bloque.indice] = valor
+
+    def _deshacer(self, bloque):
+        d, inicio, docente_id, aula_id = self.asignacion.pop(bloque.indice)
+        mascara = ~self._mascara(inicio, bloque.duracion)
+        self.ocupa_seccion[bloque.seccion_id][d] &= mascara
+        self.ocupa_docente[docente_id][d] &= mascara
+        self.ocupa_aula[aula_id][d] &= mascara
+        self.carga_docente[docente_id] -= bloque.duracion
+        self._version += 1
+        fijo = self.docente_grupo[bloque.grupo]
+        fijo[1] -= 1
+        if fijo[1] == 0:
+            del self.docente_grupo[bloque.grupo]
+
+    def _verificar_adelante(self, bloque, docente_id):
+        """Los bloques pendientes que comparten sección o docente deben conservar alguna opción."""
+        for otro in self.bloques:
+            if otro.indice in self.asignacion:
+                continue
+            fijo = self.docente_grupo.get(otro.grupo)
+            if otro.seccion_id != bloque.seccion_id and not (fijo and fijo[0] == docente_id):
+                continue
+            if not self._horarios_libres(otro, limite=1):
+                return False
+        return True
+
+    def _elegir_bloque(self):
+        """MRV: el bloque pendiente con menos horarios posibles (desempate: más largo)."""
+        mejor, mejor_clave = None, None
+        for bloque in self.bloques:
+            if bloque.indice in self.asignacion:
+                continue
+            clave = (self._horarios_libres(bloque), -bloque.duracion, len(self._docentes_posibles(bloque)))
+            if mejor_clave is None or clave < mejor_clave:
+                mejor, mejor_clave = bloque, clave
+                if clave[0] == 0:
+                    break
+        return mejor
+
+    def resolver(self, tiempo_limite):
+        limite = time.monotonic() + tiempo_limite
+        mejor = dict(self.asignacion)
+        pila = []
+        completo = not self.bloques
+        agotado = False
+
+        while not completo:
+            if time.monotonic() > limite:
+                break
+            bloque = self._elegir_bloque()
+            pila.append((bloque, self._valores(bloque)))
+
+            # Avanza con la siguiente alternativa válida; si no hay, retrocede
+            while pila:
+                bloque, valores = pila[-1]
+                if bloque.indice in self.asignacion:
+                    self._deshacer(bloque)
+                ubicado = False
+                for valor in valores:
+                    self.nodos += 1
+                    self._asignar(bloque, valor)
+                    if self._verificar_adelante(bloque, valor[2]):
+                        ubicado = True
+                        break
+                    self._deshacer(bloque)
+                if ubicado:
+                    break
+                pila.pop()
+            else:
+                agotado = True
+                break
+
+            if len(self.asignacion) > len(mejor):
+                mejor = dict(self.asignacion)
+            completo = len(self.asignacion) == len(self.bloques)
+
+        return mejor, completo, agotado
+
+
+def _bloque_json(solucionador, problema, bloque, valor=None):
+    curso = solucionador.cursos[bloque.curso_id]
+    datos = {
+        "curso_id": bloque.curso_id,
+        "curso": curso["nombre"],
+        "codigo_curso": curso["codigo"],
+        "seccion_id": bloque.seccion_id,
+        "seccion": problema["secciones"][bloque.seccion_id]["codigo"],
+        "tipo": bloque.tipo,
+        "horas": bloque.duracion,
+        "estudiantes": bloque.estudiantes,
+    }
+    if id(bloque) in solucionador.motivos:
+        datos["motivo"] = solucionador.motivos[id(bloque)]
+    if valor:
+        d, inicio, docente_id, aula_id = valor
+        hora_inicio = HORARIOS_VALIDOS[inicio]
+        aula = next(a for a in solucionador.aulas if a["aula_id"] == aula_id)
+        datos.update({
+            "dia": solucionador.dias[d],
+            "hora_inicio": hora_inicio,
+            "hora_fin": hora_fin_bloque(hora_inicio, bloque.duracion),
+            "docente_id": docente_id,
+            "docente": solucionador.docentes[docente_id],
+            "aula_id": aula_id,
+            "aula": aula["nombre"],
+            "capacidad_aula": aula["capacidad"],
+        })
+    return datos
+
+
+def generar_horario(problema, tiempo_limite=TIEMPO_LIMITE_DEFECTO):
+    """Ejecuta la búsqueda y devuelve la propuesta (sin escribir en la BD)."""
+    tiempo_limite = min(max(float(tiempo_limite), 0.5), TIEMPO_LIMITE_MAXIMO)
+    inicio = time.monotonic()
+    solucionador = _Solucionador(problema)
+    mejor, completo, agotado = solucionador.resolver(tiempo_limite)
+
+    propuesta = [_bloque_json(solucionador, problema, b, mejor[b.indice])
+                 for b in solucionador.bloques if b.indice in mejor]
+    propuesta.sort(key=lambda x: (x["seccion"], DIAS.index(x["dia"]), x["hora_inicio"]))
+    sin_ubicar = [_bloque_json(solucionador, problema, b)
+                  for b in solucionador.bloques if b.indice not in mejor]
+    sin_ubicar += [_bloque_json(solucionador, problema, b) for b in solucionador.sin_opciones]
+
+    return {
+        "periodo": problema["periodo"],
+        "completo": completo and not solucionador.sin_opciones,
+        "busqueda_agotada": agotado,
+        "bloques_total": len(solucionador.bloques) + len(solucionador.sin_opciones),
+        "bloques_ubicados": len(propuesta),
+        "asignaciones": propuesta,
+        "sin_ubicar": sin_ubicar,
+        "nodos_explorados": solucionador.nodos,
+        "tiempo_segundos": round(time.monotonic() - inicio, 3),
+    }
@@ -0,0 +1,192 @@
+# services/historial_academico.py
+from database.db import get_db, asegurar_esquema
+
+# Orden natural de los ciclos académicos (los no reconocidos van al final)
+CICLOS_ORDEN = ["I", "II", "III", "IV", "V", "VI", "VII", "VIII", "IX", "X"]
+NOTA_APROBATORIA = 11
+SIN_CICLO = "S/C"
+
+# La carga inicial de todos los estudiantes se hace una sola vez al crear el esquema
+# (marcada en historial_ciclo_carga); después cada nota actualiza solo su ciclo.
+ESQUEMA_HISTORIAL = f"""
+    CREATE TABLE IF NOT EXISTS historial_ciclo (
+        estudiante_id INTEGER NOT NULL REFERENCES estudiante(estudiante_id) ON DELETE CASCADE,
+        ciclo VARCHAR(10) NOT NULL,
+        cursos_llevados INTEGER NOT NULL DEFAULT 0,
+        cursos_aprobados INTEGER NOT NULL DEFAULT 0,
+        creditos_llevados INTEGER NOT NULL DEFAULT 0,
+        creditos_aprobados INTEGER NOT NULL DEFAULT 0,
+        suma_ponderada NUMERIC(10, 2) NOT NULL DEFAULT 0,
+        promedio_ponderado NUMERIC(5, 2),
+        fecha_actualizacion TIMESTAMP NOT NULL DEFAULT NOW(),
+        PRIMARY KEY (estudiante_id, ciclo)
+    );
+
+    CREATE TABLE IF NOT EXISTS historial_ciclo_carga (
+        fecha_carga TIMESTAMP NOT NULL DEFAULT NOW()
+    );
+
+    DO $$
+    BEGIN
+        -- Serializa la carga si varios procesos arrancan a la vez
+        LOCK TABLE historial_ciclo_carga IN EXCLUSIVE MODE;
+        IF NOT EXISTS (SELECT 1 FROM historial_ciclo_carga) THEN
+            INSERT INTO historial_ciclo (
+                estudiante_id, ciclo, cursos_llevados, cursos_aprobados,
+                creditos_llevados, creditos_aprobados, suma_ponderada, promedio_ponderado, fecha_actualizacion
+            )
+            SELECT
+                estudiante_id,
+                ciclo,
+                COUNT(*),
+                COUNT(*) FILTER (WHERE promedio >= {NOTA_APROBATORIA}),
+                SUM(creditos),
+                COALESCE(SUM(creditos) FILTER (WHERE promedio >= {NOTA_APROBATORIA}), 0),
+                SUM(promedio * creditos),
+                ROUND(SUM(promedio * creditos) / NULLIF(SUM(creditos), 0), 2),
+                NOW()
+            FROM (
+                SELECT DISTINCT ON (cal.estudiante_id, cal.curso_id)
+                    cal.estudiante_id,
+                    COALESCE(c.ciclo, '{SIN_CICLO}') AS ciclo,
+                    COALESCE(c.creditos, 0) AS creditos,
+                    COALESCE(cal.promedio, 0) AS promedio
+                FROM calificaciones cal
+                JOIN curso c ON cal.curso_id = c.curso_id
+                JOIN estudiante e ON cal.estudiante_id = e.estudiante_id
+                ORDER BY cal.estudiante_id, cal.curso_id,
+                         COALESCE(cal.fecha_modificacion, cal.fecha_registro) DESC NULLS LAST
+            ) notas
+            GROUP BY estudiante_id, ciclo
+            -- Las filas ya actualizadas por una nota reciente están al día
+            ON CONFLICT (estudiante_id, ciclo) DO NOTHING;
+
+            INSERT INTO historial_ciclo_carga DEFAULT VALUES;
+        END IF;
+    END;
+    $$;
+"""
+
+# Última nota registrada por curso del estudiante (si hay varias filas, manda la más reciente)
+_NOTAS_VIGENTES = """
+    SELECT DISTINCT ON (cal.curso_id)
+        cal.curso_id,
+        COALESCE(c.ciclo, %(sin_ciclo)s) AS ciclo,
+        COALESCE(c.creditos, 0) AS creditos,
+        COALESCE(cal.promedio, 0) AS promedio
+    FROM calificaciones cal
+    JOIN curso c ON cal.curso_id = c.curso_id
+    WHERE cal.estudiante_id = %(estudiante_id)s
+    {filtro_ciclo}
+    ORDER BY cal.curso_id, COALESCE(cal.fecha_modificacion, cal.fecha_registro) DESC NULLS LAST
+"""
+
+_UPSERT_HISTORIAL = """
+    WITH notas AS ({notas})
+    INSERT INTO historial_ciclo (
+        estudiante_id, ciclo, cursos_llevados, cursos_aprobados,
+        creditos_llevados, creditos_aprobados, suma_ponderada, promedio_ponderado, fecha_actualizacion
+    )
+    SELECT
+        %(estudiante_id)s,
+        ciclo,
+        COUNT(*),
+        COUNT(*) FILTER (WHERE promedio >= %(nota_aprobatoria)s),
+        SUM(creditos),
+        COALESCE(SUM(creditos) FILTER (WHERE promedio >= %(nota_aprobatoria)s), 0),
+        SUM(promedio * creditos),
+        ROUND(SUM(promedio * creditos) / NULLIF(SUM(creditos), 0), 2),
+        NOW()
+    FROM notas
+    GROUP BY ciclo
+    ON CONFLICT (estudiante_id, ciclo) DO UPDATE SET
+        cursos_llevados = EXCLUDED.cursos_llevados,
+        cursos_aprobados = EXCLUDED.cursos_aprobados,
+        creditos_llevados = EXCLUDED.creditos_llevados,
+        creditos_aprobados = EXCLUDED.creditos_aprobados,
+        suma_ponderada = EXCLUDED.suma_ponderada,
+        promedio_ponderado = EXCLUDED.promedio_ponderado,
+        fecha_actualizacion = EXCLUDED.fecha_actualizacion
+"""
+
+
+def _parametros(estudiante_id, **extra):
+    return dict(
+        estudiante_id=estudiante_id,
+        sin_ciclo=SIN_CICLO,
+        nota_aprobatoria=NOTA_APROBATORIA,
+        **extra
+    )
+
+
+def recalcular_historial(cur, estudiante_id, curso_id):
+    """
+    Actualiza solo la fila (estudiante, ciclo) afectada por la nota de un curso.
+    Se llama dentro de la misma transacción que registra la calificación.
+    """
+    asegurar_esquema("historial_ciclo", ESQUEMA_HISTORIAL)
+    filtro = "AND COALESCE(c.ciclo, %(sin_ciclo)s) = (SELECT COALESCE(ciclo, %(sin_ciclo)s) FROM curso WHERE curso_id = %(curso_id)s)"
+    cur.execute(
+        _UPSERT_HISTORIAL.format(notas=_NOTAS_VIGENTES.format(filtro_ciclo=filtro)),
+        _parametros(estudiante_id, curso_id=curso_id)
+    )
+
+
+def _orden_ciclo(ciclo):
+    return CICLOS_ORDEN.index(ciclo) if ciclo in CICLOS_ORDEN else len(CICLOS_ORDEN)
+
+
+def obtener_historial(estudiante_id):
+    """
+    Devuelve los promedios ponderados por ciclo y el resumen acumulado del estudiante.
+    Lectura directa de historial_ciclo (cargada al crear el esquema y mantenida al registrar notas).
+    """
+    asegurar_esquema("historial_ciclo", ESQUEMA_HISTORIAL)
+    conn = get_db()
+    cur = conn.cursor()
+    try:
+        consulta = """
+            SELECT ciclo, cursos_llevados, cursos_aprobados, creditos_llevados,
+                   creditos_aprobados, suma_ponderada, promedio_ponderado, fecha_actualizacion
+            FROM historial_ciclo
+            WHERE estudiante_id = %s
+        """
+        cur.execute(consulta, (estudiante_id,))
+        filas = cur.fetchall()
+    finally:
+        cur.close()
+
+    filas.sort(key=lambda fila: _orden_ciclo(fila[0]))
+
+    ciclos = []
+    total_creditos = 0
+    total_creditos_aprobados = 0
+    total_cursos = 0
+    total_aprobados = 0
+    total_suma = 0.0
+    for fila in filas:
+        total_cursos += fila[1]
+        total_aprobados += fila[2]
+        total_creditos += fila[3]
+        total_creditos_aprobados += fila[4]
+        total_suma += float(fila[5])
+        ciclos.append({
+            "ciclo": fila[0],
+            "cursos_llevados": fila[1],
+            "cursos_aprobados": fila[2],
+            "creditos_llevados": fila[3],
+            "creditos_aprobados": fila[4],
+            "promedio_ponderado": float(fila[6]) if fila[6] is not None else None,
+            "creditos_acumulados": total_creditos_aprobados,
+            "fecha_actualizacion": str(fila[7])
+        })
+
+    resumen = {
+        "cursos_llevados": total_cursos,
+        "cursos_aprobados": total_aprobados,
+        "creditos_llevados": total_creditos,
+        "creditos_aprobados": total_creditos_aprobados,
+        "promedio_ponderado": round(total_suma / total_creditos, 2) if total_creditos else None
+    }
+
+    return {"estudiante_id": estudiante_id, "ciclos": ciclos, "resumen": resumen}
@@ -0,0 +1,115 @@
+# services/horario_semanal.py
+# Horario semanal de un estudiante, un docente o un aula, armado siempre desde
+# asignaciones (día / hora / aula propios del bloque). Los bloques de cada sujeto se
+# guardan en memoria y se descartan cuando cambia la versión de alguna tabla de la
+# que dependen (matrículas, asignaciones, cursos, ...), como el índice de ocupación.
+import threading
+from collections import OrderedDict
+from datetime import timezone
+
+from services.horarios import DIAS
+from services.versiones import obtener_versiones
+
+TABLAS_HORARIO = ("asignaciones", "matriculas", "curso", "secciones", "aula", "docente", "persona",
+                  "bloque_horario")
+MAX_SUJETOS = 5000
+
+# Orden de los días; se aceptan las variantes sin tilde de bloque_horario
+ORDEN_DIAS = {dia: i for i, dia in enumerate(DIAS)}
+ORDEN_DIAS.update({"Miercoles": 2, "Sabado": 5, "Domingo": 6})
+
+_FILTROS = {
+    "estudiante": """a.asignacion_id IN (
+        SELECT asignacion_id FROM matriculas WHERE estudiante_id = %s AND estado = 'ACTIVA'
+    )""",
+    "docente": "a.docente_id = %s",
+    "aula": "a.aula_id = %s",
+}
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+
+
+def _hhmm(hora):
+    return hora.strftime("%H:%M") if hora is not None else None
+
+
+def _cargar(cur, tipo, sujeto_id):
+    cur.execute(f"""
+        SELECT a.asignacion_id, a.curso_id, c.nombre, c.codigo, c.creditos,
+               a.seccion_id, s.codigo, s.periodo,
+               a.dia, a.hora_inicio, a.hora_fin, a.tipo,
+               a.aula_id, au.nombre_aula, au.pabellon_id,
+               a.docente_id, p.nombres || ' ' || p.apellidos,
+               a.cantidad_estudiantes, a.bloque_id, bh.codigo_bloque
+        FROM asignaciones a
+        JOIN curso c ON a.curso_id = c.curso_id
+        JOIN secciones s ON a.seccion_id = s.seccion_id
+        LEFT JOIN aula au ON a.aula_id = au.aula_id
+        LEFT JOIN docente d ON a.docente_id = d.docente_id
+        LEFT JOIN persona p ON d.persona_id = p.persona_id
+        LEFT JOIN bloque_horario bh ON a.bloque_id = bh.bloque_id
+        WHERE {_FILTROS[tipo]}
+    """, (sujeto_id,))
+    bloques = [{
+        "asignacion_id": f[0], "curso_id": f[1], "curso": f[2], "codigo_curso": f[3], "creditos": f[4],
+        "seccion_id": f[5], "seccion": f[6], "periodo": f[7],
+        "dia": f[8], "hora_inicio": _hhmm(f[9]), "hora_fin": _hhmm(f[10]), "tipo": f[11],
+        "aula_id": f[12], "aula": f[13], "pabellon_id": f[14],
+        "docente_id": f[15], "docente": f[16],
+        "cantidad_estudiantes": f[17], "bloque_id": f[18], "codigo_bloque": f[19],
+    } for f in cur.fetchall()]
+    bloques.sort(key=lambda b: (ORDEN_DIAS.get(b["dia"], len(ORDEN_DIAS)),
+                                b["hora_inicio"] is None, b["hora_inicio"] or ""))
+    return bloques
+
+
+def version_horario(conn):
+    """
+    (firma, fecha de la última modificación) de las tablas de las que dependen los
+    horarios; la fecha va en UTC con zona (ICS y Last-Modified la usan tal cual).
+    """
+    versiones = obtener_versiones(conn, TABLAS_HORARIO)
+    firma = tuple(versiones[tabla][0] for tabla in TABLAS_HORARIO)
+    fechas = [fecha for _, fecha in versiones.values() if fecha is not None]
+    return firma, max(fechas).astimezone(timezone.utc) if fechas else None
+
+
+def obtener_bloques(conn, tipo, sujeto_id, firma=None):
+    """
+    Bloques (dicts) del horario de un sujeto ('estudiante', 'docente' o 'aula'),
+    ordenados por día y hora. Se sirven desde caché mientras no cambien los datos.
+    """
+    if tipo not in _FILTROS:
+        raise ValueError(f"Tipo de horario no válido: {tipo}")
+    if firma is None:
+        firma, _ = version_horario(conn)
+    clave = (tipo, sujeto_id)
+
+    with _lock:
+        entrada = _cache.get(clave)
+        if entrada and entrada[0] == firma:
+            _cache.move_to_end(clave)
+            return entrada[1]
+
+    cur = conn.cursor()
+    try:
+        bloques = _cargar(cur, tipo, sujeto_id)
+    finally:
+        cur.close()
+
+    with _lock:
+        _cache[clave] = (firma, bloques)
+        _cache.move_to_end(clave)
+        while len(_cache) > MAX_SUJETOS:
+            _cache.popitem(last=False)
+    return bloques
+
+
+def grilla_semanal(bloques):
+    """{dia: [bloques]} con todos los días de la semana, aunque estén vacíos."""
+    grilla = {dia: [] for dia in DIAS}
+    for bloque in bloques:
+        if bloque["dia"] in grilla:
+            grilla[bloque["dia"]].append(bloque)
+    return grilla
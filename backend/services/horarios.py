@@ -0,0 +1,241 @@
+# services/horarios.py
+# Restricciones de horario de las asignaciones, aplicadas por la base de datos.
+# Cada bloque guarda su franja (rango de horas) y dos restricciones de exclusión
+# GiST impiden que un aula o un docente tengan dos bloques solapados el mismo día
+# del mismo periodo. Las restricciones son DEFERRABLE para permitir cambios masivos
+# (intercambios de aulas, etc.) que solo deben ser válidos al confirmar.
+#
+# Si los datos existentes ya tienen cruces la restricción no se puede crear: se
+# informan las filas en conflicto y, mientras falte, las altas y ediciones
+# validan los cruces con consultas (cruce_sin_restriccion).
+import threading
+import time
+from datetime import datetime, timedelta
+
+from psycopg2 import errors
+
+from database.db import asegurar_esquema, conectar
+
+# Secuencia válida de horarios académicos (cada 50 minutos)
+HORARIOS_VALIDOS = [
+    "08:00", "08:50", "09:40", "10:30", "11:20", "12:10",
+    "13:00", "13:50", "14:40", "15:30", "16:20", "17:10",
+    "18:00", "18:50", "19:40", "20:30", "21:20", "22:10"
+]
+DIAS = ["Lunes", "Martes", "Miércoles", "Jueves", "Viernes", "Sábado"]
+MINUTOS_BLOQUE = 50
+TOTAL_FRANJAS = len(HORARIOS_VALIDOS)
+
+RESTRICCION_AULA = "excl_asignaciones_aula"
+RESTRICCION_DOCENTE = "excl_asignaciones_docente"
+# restricción -> (recurso de services.conflictos, columna)
+RESTRICCIONES = {
+    RESTRICCION_AULA: ("aula", "aula_id"),
+    RESTRICCION_DOCENTE: ("docente", "docente_id"),
+}
+# Cada cuánto se reintenta crear una restricción que faltaba (p. ej. tras corregir cruces)
+REINTENTO_RESTRICCIONES_SEG = 300
+
+ESQUEMA_FRANJAS = """
+    -- Marca de instalación: el DDL de abajo (ALTER TABLE, triggers y el UPDATE de todas
+    -- las asignaciones) corre una sola vez, no en cada arranque
+    CREATE TABLE IF NOT EXISTS asignaciones_franjas_carga (
+        fecha_carga TIMESTAMP NOT NULL DEFAULT NOW()
+    );
+
+    DO $$
+    BEGIN
+        -- Serializa la instalación si varios procesos arrancan a la vez
+        LOCK TABLE asignaciones_franjas_carga IN EXCLUSIVE MODE;
+        IF EXISTS (SELECT 1 FROM asignaciones_franjas_carga) THEN
+            RETURN;
+        END IF;
+
+        CREATE EXTENSION IF NOT EXISTS btree_gist;
+
+        IF NOT EXISTS (SELECT 1 FROM pg_type WHERE typname = 'timerange') THEN
+            CREATE TYPE timerange AS RANGE (subtype = time);
+        END IF;
+
+        -- Periodo de la sección, copiado para acotar los solapamientos a un mismo semestre
+        ALTER TABLE asignaciones ADD COLUMN IF NOT EXISTS periodo VARCHAR(20);
+        ALTER TABLE asignaciones ADD COLUMN IF NOT EXISTS franja timerange
+            GENERATED ALWAYS AS (timerange(hora_inicio, hora_fin, '[)')) STORED;
+
+        CREATE OR REPLACE FUNCTION asignar_periodo_asignacion() RETURNS trigger AS $f$
+        BEGIN
+            SELECT periodo INTO NEW.periodo FROM secciones WHERE seccion_id = NEW.seccion_id;
+            RETURN NEW;
+        END;
+        $f$ LANGUAGE plpgsql;
+
+        DROP TRIGGER IF EXISTS trg_asignaciones_periodo ON asignaciones;
+        CREATE TRIGGER trg_asignaciones_periodo
+            BEFORE INSERT OR UPDATE OF seccion_id ON asignaciones
+            FOR EACH ROW EXECUTE FUNCTION asignar_periodo_asignacion();
+
+        CREATE OR REPLACE FUNCTION propagar_periodo_seccion() RETURNS trigger AS $f$
+        BEGIN
+            UPDATE asignaciones SET periodo = NEW.periodo WHERE seccion_id = NEW.seccion_id;
+            RETURN NULL;
+        END;
+        $f$ LANGUAGE plpgsql;
+
+        DROP TRIGGER IF EXISTS trg_secciones_periodo ON secciones;
+        CREATE TRIGGER trg_secciones_periodo
+            AFTER UPDATE OF periodo ON secciones
+            FOR EACH ROW WHEN (OLD.periodo IS DISTINCT FROM NEW.periodo)
+            EXECUTE FUNCTION propagar_periodo_seccion();
+
+        UPDATE asignaciones a
+        SET periodo = s.periodo
+        FROM secciones s
+        WHERE a.seccion_id = s.seccion_id AND a.periodo IS DISTINCT FROM s.periodo;
+
+        INSERT INTO asignaciones_franjas_carga DEFAULT VALUES;
+    END;
+    $$;
+"""
+
+
+_restricciones = {"activas": None, "verificado": None}
+_lock_restricciones = threading.Lock()
+
+
+def restricciones_existentes(cur):
+    """Nombres de las restricciones de exclusión que existen en la base de datos."""
+    cur.execute("SELECT conname FROM pg_constraint WHERE conname = ANY(%s)", (list(RESTRICCIONES),))
+    return frozenset(fila[0] for fila in cur.fetchall())
+
+
+def _informar_cruces(cur, restriccion):
+    """Imprime las filas que impiden crear la restricción (detector de services.conflictos)."""
+    from services.conflictos import cargar_bloques, detectar_conflictos
+
+    recurso = RESTRICCIONES[restriccion][0]
+    cruces = [c for c in detectar_conflictos(cargar_bloques(cur))["conflictos"] if c["tipo"] == recurso]
+    print(f"❌ No se creó {restriccion}: hay {len(cruces)} cruce(s) de {recurso} en los datos. "
+          f"Corríjalos (GET /admin/horarios/conflictos); mientras tanto los cruces se validan por consulta.")
+    for cruce in cruces[:20]:
+        ids = ", ".join(str(b.get("asignacion_id")) for b in cruce["bloques"])
+        print(f"   - {cruce['periodo'] or 'sin periodo'} {recurso} {cruce['recurso_id']} {cruce['dia']} "
+              f"{cruce['desde']}-{cruce['hasta']}: asignaciones {ids}")
+
+
+def _crear_restricciones():
+    conn = conectar()
+    try:
+        cur = conn.cursor()
+        for restriccion, (recurso, columna) in RESTRICCIONES.items():
+            if restriccion in restricciones_existentes(cur):
+                continue
+            cur.execute("SAVEPOINT restriccion")
+            try:
+                cur.execute(f"""
+                    ALTER TABLE asignaciones ADD CONSTRAINT {restriccion}
+                        EXCLUDE USING gist (COALESCE(periodo, '') WITH =, {columna} WITH =, dia WITH =, franja WITH &&)
+                        DEFERRABLE INITIALLY IMMEDIATE
+                """)
+                cur.execute("RELEASE SAVEPOINT restriccion")
+            except errors.ExclusionViolation:
+                cur.execute("ROLLBACK TO SAVEPOINT restriccion")
+                _informar_cruces(cur, restriccion)
+        activas = restricciones_existentes(cur)
+        conn.commit()
+        cur.close()
+        return activas
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def asegurar_franjas():
+    """
+    Crea (una sola vez, con marca en asignaciones_franjas_carga) la franja y el periodo,
+    y las restricciones de exclusión.
+    Devuelve las restricciones activas; si falta alguna se reintenta cada
+    REINTENTO_RESTRICCIONES_SEG segundos.
+    """
+    asegurar_esquema("asignaciones_franjas", ESQUEMA_FRANJAS)
+    ahora = time.monotonic()
+    activas = _restricciones["activas"]
+    if activas is not None and (len(activas) == len(RESTRICCIONES)
+                                or ahora - _restricciones["verificado"] < REINTENTO_RESTRICCIONES_SEG):
+        return activas
+    with _lock_restricciones:
+        if _restricciones["activas"] is activas:
+            _restricciones.update(activas=_crear_restricciones(), verificado=ahora)
+        return _restricciones["activas"]
+
+
+def cruce_sin_restriccion(cur, activas, seccion_id, docente_id, aula_id, dia, hora_inicio, hora_fin,
+                          excluir_ids=()):
+    """
+    Validación por consulta para las restricciones que no existen en la BD (`activas`
+    es lo que devolvió asegurar_franjas). Mismo criterio que la restricción: mismo
+    periodo, recurso y día con franjas solapadas. Devuelve el nombre de la restricción
+    que se violaría, o None.
+    """
+    valores = {"aula_id": aula_id, "docente_id": docente_id}
+    for restriccion, (_, columna) in RESTRICCIONES.items():
+        if restriccion in activas or valores[columna] is None:
+            continue
+        cur.execute(f"""
+            SELECT 1 FROM asignaciones a
+            WHERE a.{columna} = %s AND a.dia = %s
+              AND a.hora_inicio < %s AND a.hora_fin > %s
+              AND COALESCE(a.periodo, '') = COALESCE((SELECT periodo FROM secciones WHERE seccion_id = %s), '')
+              AND NOT (a.asignacion_id = ANY(%s::int[]))
+            LIMIT 1
+        """, (valores[columna], dia, hora_fin, hora_inicio, seccion_id, list(excluir_ids)))
+        if cur.fetchone():
+            return restriccion
+    return None
+
+
+def mensaje_conflicto(error, bloque, dia, hora_inicio, hora_fin):
+    """
+    Traduce la violación de exclusión al mensaje que ya conocen los usuarios.
+    `error` es la excepción de psycopg2 o el nombre de la restricción.
+    `bloque` es 'teórica' / 'práctica' (o vacío si no aplica).
+    """
+    if isinstance(error, str):
+        restriccion = error
+    else:
+        restriccion = getattr(error.diag, "constraint_name", None)
+    if restriccion == RESTRICCION_DOCENTE:
+        return f"El docente ya tiene una clase el {dia} entre {hora_inicio} y {hora_fin}."
+    aula = f"El aula {bloque}".strip() if bloque else "El aula"
+    return f"{aula} ya está ocupada el {dia} entre {hora_inicio} y {hora_fin}."
+
+
+def minutos_del_dia(hora):
+    if isinstance(hora, str):
+        hora = datetime.strptime(hora[:5], "%H:%M").time()
+    return hora.hour * 60 + hora.minute
+
+
+_INICIO_JORNADA = minutos_del_dia(HORARIOS_VALIDOS[0])
+
+
+def hora_fin_bloque(hora_inicio, horas):
+    """Hora de fin de un bloque de `horas` horas académicas (50 min c/u)."""
+    fin = datetime.strptime(hora_inicio, "%H:%M") + timedelta(minutes=horas * MINUTOS_BLOQUE)
+    return fin.strftime("%H:%M")
+
+
+def mascara_franjas(hora_inicio, hora_fin):
+    """
+    Bits de las franjas de HORARIOS_VALIDOS que toca el intervalo [inicio, fin).
+    Acepta horas fuera de la grilla: se marca toda franja con intersección.
+    """
+    inicio = minutos_del_dia(hora_inicio) - _INICIO_JORNADA
+    fin = minutos_del_dia(hora_fin) - _INICIO_JORNADA
+    primera = max(inicio // MINUTOS_BLOQUE, 0)
+    ultima = min(-(-fin // MINUTOS_BLOQUE), TOTAL_FRANJAS)
+    if ultima <= primera:
+        return 0
+    return ((1 << (ultima - primera)) - 1) << primera
+
@@ -0,0 +1,64 @@
+# services/impacto.py
+# Impacto de eliminar (o editar) varias entidades a la vez: una sola consulta agrupada
+# por id devuelve los conteos que antes pedían /curso/<id>/estudiantes, /docente,
+# /asignaciones, /bloques-horarios/<id>/asignaciones y /secciones-activas, fila por fila.
+
+# tipo de entidad -> columna de asignaciones que la referencia
+COLUMNAS_ENTIDAD = {
+    "curso": "curso_id",
+    "bloque": "bloque_id",
+    "seccion": "seccion_id",
+    "aula": "aula_id",
+    "docente": "docente_id",
+}
+MAX_IDS = 1000
+
+
+class ErrorImpacto(Exception):
+    """Tipo de entidad o lista de ids inválida."""
+
+
+def calcular_impacto(cur, tipo, ids):
+    """{id: {conteos y banderas}} para todos los ids (los que no tienen dependencias valen 0)."""
+    columna = COLUMNAS_ENTIDAD.get(tipo)
+    if not columna:
+        raise ErrorImpacto(f"Tipo no válido. Opciones: {', '.join(COLUMNAS_ENTIDAD)}")
+    try:
+        ids = sorted({int(i) for i in ids})
+    except (TypeError, ValueError):
+        raise ErrorImpacto("Los ids deben ser numéricos")
+    if not ids:
+        raise ErrorImpacto("Debe indicar al menos un id")
+    if len(ids) > MAX_IDS:
+        raise ErrorImpacto(f"Como máximo {MAX_IDS} ids por consulta")
+
+    cur.execute(f"""
+        SELECT r.id,
+               COUNT(DISTINCT a.asignacion_id),
+               COUNT(DISTINCT a.seccion_id),
+               COUNT(DISTINCT a.seccion_id) FILTER (WHERE UPPER(s.estado) = 'ACTIVO'),
+               COUNT(DISTINCT a.seccion_id) FILTER (WHERE a.docente_id IS NOT NULL),
+               COUNT(DISTINCT m.matricula_id),
+               COUNT(DISTINCT m.estudiante_id)
+        FROM unnest(%s::int[]) AS r(id)
+        LEFT JOIN asignaciones a ON a.{columna} = r.id
+        LEFT JOIN secciones s ON a.seccion_id = s.seccion_id
+        LEFT JOIN matriculas m ON m.asignacion_id = a.asignacion_id AND m.estado = 'ACTIVA'
+        GROUP BY r.id
+    """, (ids,))
+
+    impacto = {}
+    for entidad_id, asignaciones, secciones, activas, con_docente, matriculas, estudiantes in cur.fetchall():
+        impacto[entidad_id] = {
+            "asignaciones": asignaciones,
+            "secciones": secciones,
+            "secciones_activas": activas,
+            "secciones_con_docente": con_docente,
+            "matriculas_activas": matriculas,
+            "estudiantes": estudiantes,
+            "tiene_asignaciones": asignaciones > 0,
+            "tiene_secciones_activas": activas > 0,
+            "tiene_docente": con_docente > 0,
+            "tiene_estudiantes": estudiantes > 0,
+        }
+    return impacto
@@ -0,0 +1,269 @@
+# services/importar_horarios.py
+# Importación masiva de asignaciones desde CSV/XLSX.
+# Se cargan una sola vez los catálogos (cursos, secciones, docentes, aulas) y el horario
+# vigente; cada fila se valida en memoria y los cruces de aula/docente/sección se buscan
+# con un único barrido (services.conflictos) sobre el horario vigente más el archivo.
+# Si todas las filas son válidas se insertan en un solo execute_values.
+import unicodedata
+
+from psycopg2.extras import execute_values
+
+from services.conflictos import cargar_bloques, detectar_conflictos
+from services.horarios import DIAS, HORARIOS_VALIDOS, hora_fin_bloque
+
+# Columnas reconocidas (encabezado normalizado -> campo)
+ALIAS_COLUMNAS = {
+    "curso_id": "curso_id", "codigo_curso": "codigo_curso", "curso": "codigo_curso",
+    "seccion_id": "seccion_id", "seccion": "codigo_seccion", "codigo_seccion": "codigo_seccion",
+    "periodo": "periodo",
+    "docente_id": "docente_id", "codigo_docente": "codigo_docente", "dni_docente": "dni_docente",
+    "aula_id": "aula_id", "aula": "codigo_aula", "codigo_aula": "codigo_aula",
+    "dia": "dia", "hora_inicio": "hora_inicio", "tipo": "tipo",
+    "estudiantes": "estudiantes", "cantidad_estudiantes": "estudiantes",
+    "observaciones": "observaciones",
+}
+TIPOS = {"TEORICO": "TEORICO", "TEORIA": "TEORICO", "PRACTICO": "PRACTICO", "PRACTICA": "PRACTICO"}
+_DIAS_NORMALIZADOS = {}
+
+
+class ErrorImportacion(Exception):
+    """El archivo no tiene la estructura esperada."""
+
+
+def _normalizar(texto):
+    texto = unicodedata.normalize("NFKD", str(texto or "")).encode("ascii", "ignore").decode()
+    return texto.strip().lower().replace(" ", "_")
+
+
+for _dia in DIAS:
+    _DIAS_NORMALIZADOS[_normalizar(_dia)] = _dia
+
+
+def _hora(valor):
+    """'8:00', '08:00', '08:00:00' o fracción de día de Excel (0.3333) -> 'HH:MM'."""
+    valor = str(valor or "").strip()
+    if not valor:
+        return None
+    try:
+        fraccion = float(valor)
+        if 0 <= fraccion < 1:
+            minutos = round(fraccion * 24 * 60)
+            return f"{minutos // 60:02d}:{minutos % 60:02d}"
+    except ValueError:
+        pass
+    partes = valor.split(":")
+    if len(partes) < 2 or not partes[0].isdigit() or not partes[1][:2].isdigit():
+        return None
+    return f"{int(partes[0]):02d}:{partes[1][:2]}"
+
+
+def _entero(valor):
+    try:
+        return int(float(str(valor).strip()))
+    except (TypeError, ValueError):
+        return None
+
+
+def interpretar_filas(filas):
+    """Convierte las filas crudas (con encabezado) en dicts con los campos reconocidos."""
+    if not filas:
+        raise ErrorImportacion("El archivo está vacío")
+    encabezados = [ALIAS_COLUMNAS.get(_normalizar(e)) for e in filas[0]]
+    if not any(encabezados):
+        raise ErrorImportacion(f"Encabezados no reconocidos. Columnas válidas: {', '.join(sorted(ALIAS_COLUMNAS))}")
+
+    registros = []
+    for numero, fila in enumerate(filas[1:], start=2):
+        if not any(str(c).strip() for c in fila):
+            continue
+        registro = {"fila": numero}
+        for campo, valor in zip(encabezados, fila):
+            if campo:
+                registro[campo] = str(valor).strip()
+        registros.append(registro)
+    return registros
+
+
+def _catalogos(cur, periodo_defecto):
+    cur.execute("SELECT curso_id, codigo, nombre, COALESCE(horas_teoricas, 0), COALESCE(horas_practicas, 0) FROM curso")
+    cursos = {f[0]: {"codigo": f[1], "nombre": f[2], "TEORICO": f[3], "PRACTICO": f[4]} for f in cur.fetchall()}
+
+    cur.execute("SELECT seccion_id, codigo, periodo FROM secciones")
+    secciones = {f[0]: {"codigo": f[1], "periodo": f[2]} for f in cur.fetchall()}
+
+    cur.execute("""
+        SELECT d.docente_id, d.codigo_docente, p.dni, d.estado
+        FROM docente d JOIN persona p ON d.persona_id = p.persona_id
+    """)
+    docentes = {f[0]: {"codigo": f[1], "dni": f[2], "activo": bool(f[3])} for f in cur.fetchall()}
+
+    cur.execute("SELECT aula_id, codigo_a, capacidad, UPPER(estado) = 'OPERATIVO' FROM aula")
+    aulas = {f[0]: {"codigo": f[1], "capacidad": f[2] or 0, "operativa": f[3]} for f in cur.fetchall()}
+
+    cur.execute("SELECT curso_id, seccion_id, tipo FROM asignaciones")
+    existentes = {tuple(f) for f in cur.fetchall()}
+
+    return {
+        "cursos": cursos,
+        "curso_por_codigo": {str(c["codigo"]).upper(): i for i, c in cursos.items() if c["codigo"]},
+        "secciones": secciones,
+        "seccion_por_codigo": {(str(s["codigo"]).upper(), s["periodo"]): i for i, s in secciones.items()},
+        "docentes": docentes,
+        "docente_por_codigo": {str(d["codigo"]).upper(): i for i, d in docentes.items() if d["codigo"]},
+        "docente_por_dni": {str(d["dni"]): i for i, d in docentes.items() if d["dni"]},
+        "aulas": aulas,
+        "aula_por_codigo": {str(a["codigo"]).upper(): i for i, a in aulas.items() if a["codigo"]},
+        "asignaciones_existentes": existentes,
+        "periodo_defecto": periodo_defecto,
+    }
+
+
+def _resolver(registro, campo_id, campo_codigo, tabla, por_codigo, errores, nombre, clave=None):
+    if registro.get(campo_id):
+        identificador = _entero(registro[campo_id])
+        if identificador in tabla:
+            return identificador
+    elif registro.get(campo_codigo):
+        identificador = por_codigo.get(clave or registro[campo_codigo].upper())
+        if identificador is not None:
+            return identificador
+    else:
+        errores.append(f"Falta {nombre}")
+        return None
+    errores.append(f"{nombre.capitalize()} no encontrado")
+    return None
+
+
+def _validar_fila(registro, cat, vistos):
+    errores = []
+    cursos, aulas = cat["cursos"], cat["aulas"]
+
+    curso_id = _resolver(registro, "curso_id", "codigo_curso", cursos, cat["curso_por_codigo"], errores, "curso")
+    periodo = registro.get("periodo") or cat["periodo_defecto"]
+    seccion_id = _resolver(
+        registro, "seccion_id", "codigo_seccion", cat["secciones"], cat["seccion_por_codigo"], errores, "sección",
+        clave=(registro.get("codigo_seccion", "").upper(), periodo)
+    )
+    if registro.get("docente_id") or registro.get("codigo_docente"):
+        docente_id = _resolver(registro, "docente_id", "codigo_docente", cat["docentes"],
+                               cat["docente_por_codigo"], errores, "docente")
+    else:
+        docente_id = _resolver(registro, "docente_id", "dni_docente", cat["docentes"],
+                               cat["docente_por_dni"], errores, "docente",
+                               clave=registro.get("dni_docente"))
+    aula_id = _resolver(registro, "aula_id", "codigo_aula", aulas, cat["aula_por_codigo"], errores, "aula")
+
+    dia = _DIAS_NORMALIZADOS.get(_normalizar(registro.get("dia")))
+    if not dia:
+        errores.append(f"Día no válido ({registro.get('dia') or 'vacío'})")
+    hora_inicio = _hora(registro.get("hora_inicio"))
+    if hora_inicio not in HORARIOS_VALIDOS:
+        errores.append(f"Hora de inicio fuera de la grilla ({registro.get('hora_inicio') or 'vacía'})")
+    tipo = TIPOS.get(_normalizar(registro.get("tipo")).upper())
+    if not tipo:
+        errores.append("Tipo debe ser TEORICO o PRACTICO")
+    estudiantes = _entero(registro.get("estudiantes"))
+    if not estudiantes or estudiantes <= 0:
+        errores.append("La cantidad de estudiantes debe ser mayor a 0")
+
+    if docente_id is not None and not cat["docentes"][docente_id]["activo"]:
+        errores.append("El docente no está activo")
+    if aula_id is not None:
+        aula = aulas[aula_id]
+        if not aula["operativa"]:
+            errores.append("Aula no operativa")
+        elif estudiantes and estudiantes > aula["capacidad"]:
+            errores.append(f"Capacidad insuficiente en el aula (Capacidad: {aula['capacidad']})")
+
+    hora_fin = None
+    if curso_id is not None and tipo:
+        horas = cursos[curso_id][tipo]
+        if horas <= 0:
+            errores.append(f"El curso no tiene horas {tipo.lower()}s")
+        elif hora_inicio in HORARIOS_VALIDOS:
+            if HORARIOS_VALIDOS.index(hora_inicio) + horas > len(HORARIOS_VALIDOS):
+                errores.append("El bloque termina después de la última franja del día")
+            else:
+                hora_fin = hora_fin_bloque(hora_inicio, horas)
+
+    if curso_id is not None and seccion_id is not None and tipo:
+        clave = (curso_id, seccion_id, tipo)
+        if clave in cat["asignaciones_existentes"]:
+            errores.append(f"El curso ya tiene una asignación {tipo.lower()} en esta sección")
+        elif clave in vistos:
+            errores.append(f"Bloque repetido en el archivo (fila {vistos[clave]})")
+        else:
+            vistos[clave] = registro["fila"]
+
+    bloque = None
+    if not errores:
+        bloque = {
+            "fila": registro["fila"],
+            "curso_id": curso_id,
+            "curso": cursos[curso_id]["nombre"],
+            "seccion_id": seccion_id,
+            "seccion": cat["secciones"][seccion_id]["codigo"],
+            "periodo": cat["secciones"][seccion_id]["periodo"],
+            "docente_id": docente_id,
+            "aula_id": aula_id,
+            "dia": dia,
+            "hora_inicio": hora_inicio,
+            "hora_fin": hora_fin,
+            "tipo": tipo,
+            "estudiantes": estudiantes,
+            "observaciones": registro.get("observaciones") or tipo,
+        }
+    return bloque, errores
+
+
+def validar_importacion(cur, registros, periodo_defecto=None):
+    """
+    Valida todas las filas en memoria. Devuelve (bloques_validos, errores_por_fila),
+    con errores_por_fila = {fila: [mensajes]}.
+    """
+    cat = _catalogos(cur, periodo_defecto)
+    vistos = {}
+    bloques, errores = [], {}
+    for registro in registros:
+        bloque, mensajes = _validar_fila(registro, cat, vistos)
+        if mensajes:
+            errores[registro["fila"]] = mensajes
+        else:
+            bloques.append(bloque)
+
+    # Cruces contra el horario vigente y entre filas del archivo, en un solo barrido
+    periodos = sorted({b["periodo"] for b in bloques if b["periodo"]})
+    if bloques:
+        vigentes = cargar_bloques(cur, periodos) if periodos else []
+        reporte = detectar_conflictos(vigentes + bloques, solo_con=lambda b: b.get("fila") is not None)
+        etiquetas = {"aula": "el aula", "docente": "el docente", "seccion": "la sección"}
+        for conflicto in reporte["conflictos"]:
+            uno, otro = conflicto["bloques"]
+            for bloque, contrario in ((uno, otro), (otro, uno)):
+                if bloque.get("fila") is None:
+                    continue
+                origen = (f"la fila {contrario['fila']}" if contrario.get("fila") is not None
+                          else f"la asignación {contrario.get('asignacion_id')}")
+                errores.setdefault(bloque["fila"], []).append(
+                    f"Cruce de {etiquetas[conflicto['tipo']]} el {conflicto['dia']} "
+                    f"entre {conflicto['desde']} y {conflicto['hasta']} con {origen}"
+                )
+        bloques = [b for b in bloques if b["fila"] not in errores]
+    return bloques, errores
+
+
+def insertar_bloques(cur, bloques):
+    """Inserta los bloques en un solo INSERT por lotes; devuelve los asignacion_id."""
+    filas = [(
+        b["curso_id"], b["seccion_id"], b["docente_id"], b["estudiantes"], b["observaciones"],
+        b["dia"], b["hora_inicio"], b["hora_fin"], b["aula_id"], b["tipo"]
+    ) for b in bloques]
+    resultado = execute_values(cur, """
+        INSERT INTO asignaciones (
+            curso_id, seccion_id, docente_id, cantidad_estudiantes,
+            observaciones, dia, hora_inicio, hora_fin, aula_id, tipo
+        )
+        VALUES %s
+        RETURNING asignacion_id
+    """, filas, page_size=500, fetch=True)
+    return [fila[0] for fila in resultado]
@@ -0,0 +1,108 @@
+# services/ocupacion_aulas.py
+# Índice en memoria de la ocupación de aulas: por periodo, aula y día, una máscara
+# de bits con las franjas de HORARIOS_VALIDOS ocupadas. Se reconstruye solo cuando
+# cambia la versión de asignaciones / aula / secciones (triggers de version_datos),
+# así que buscar aulas libres no recorre la tabla de asignaciones.
+#
+# Cada reconstrucción arma un índice nuevo y reemplaza la referencia de una vez: los
+# lectores que ya tomaron el anterior lo siguen usando completo, nunca a medio armar.
+import threading
+
+from services.horarios import DIAS, mascara_franjas
+from services.periodos import periodo_activo
+from services.versiones import obtener_versiones
+
+TABLAS_INDICE = ("asignaciones", "aula", "secciones")
+
+_estado = {"indice": None}
+_lock = threading.Lock()
+
+
+def _construir(cur, versiones):
+    cur.execute("""
+        SELECT a.aula_id, a.nombre_aula, a.capacidad, a.tipo_aula_id, ta.nombre_tipo,
+               a.pabellon_id, p.nombre_pabellon
+        FROM aula a
+        LEFT JOIN pabellon p ON a.pabellon_id = p.pabellon_id
+        LEFT JOIN tipo_aula_cat ta ON a.tipo_aula_id = ta.tipo_aula_id
+        WHERE UPPER(a.estado) = 'OPERATIVO'
+        ORDER BY a.capacidad, p.nombre_pabellon, a.nombre_aula
+    """)
+    aulas = [{
+        "aula_id": fila[0],
+        "nombre": fila[1],
+        "capacidad": fila[2] or 0,
+        "tipo_aula_id": fila[3],
+        "tipo_aula": fila[4],
+        "pabellon_id": fila[5],
+        "pabellon": fila[6],
+    } for fila in cur.fetchall()]
+
+    cur.execute("""
+        SELECT asig.aula_id, s.periodo, asig.dia, asig.hora_inicio, asig.hora_fin
+        FROM asignaciones asig
+        LEFT JOIN secciones s ON asig.seccion_id = s.seccion_id
+        WHERE asig.aula_id IS NOT NULL AND asig.dia IS NOT NULL
+          AND asig.hora_inicio IS NOT NULL AND asig.hora_fin IS NOT NULL
+    """)
+    indice_dia = {dia: i for i, dia in enumerate(DIAS)}
+    ocupacion = {}
+    for aula_id, periodo, dia, inicio, fin in cur.fetchall():
+        d = indice_dia.get(dia)
+        if d is None:
+            continue
+        mascara = mascara_franjas(inicio, fin)
+        ocupacion.setdefault(periodo or "", {}).setdefault(aula_id, [0] * len(DIAS))[d] |= mascara
+
+    return {
+        "versiones": versiones,
+        "aulas": aulas,
+        "ocupacion": ocupacion,
+        "periodo_activo": periodo_activo(cur),
+    }
+
+
+def _indice_vigente(conn):
+    versiones = obtener_versiones(conn, TABLAS_INDICE)
+    firma = tuple(versiones[tabla][0] for tabla in TABLAS_INDICE)
+    indice = _estado["indice"]
+    if indice is not None and indice["versiones"] == firma:
+        return indice
+    with _lock:
+        indice = _estado["indice"]
+        if indice is None or indice["versiones"] != firma:
+            cur = conn.cursor()
+            try:
+                indice = _construir(cur, firma)
+            finally:
+                cur.close()
+            _estado["indice"] = indice
+    return indice
+
+
+def buscar_aulas_libres(conn, dia, franja_inicio, horas, capacidad=0,
+                        tipo_aula_id=None, pabellon_id=None, periodo=None):
+    """
+    Aulas operativas libres el `dia` desde la franja `franja_inicio` durante `horas`
+    franjas, con capacidad suficiente, en el `periodo` (por defecto el vigente: el más
+    reciente con secciones activas). Devuelve (periodo, aulas), de menor a mayor capacidad.
+    """
+    indice = _indice_vigente(conn)
+    periodo = periodo or indice["periodo_activo"]
+    d = DIAS.index(dia)
+    mascara = ((1 << horas) - 1) << franja_inicio
+    ocupacion = indice["ocupacion"].get(periodo, {})
+    sin_ocupar = [0] * len(DIAS)
+
+    libres = []
+    for aula in indice["aulas"]:
+        if aula["capacidad"] < capacidad:
+            continue
+        if tipo_aula_id and aula["tipo_aula_id"] != tipo_aula_id:
+            continue
+        if pabellon_id and aula["pabellon_id"] != pabellon_id:
+            continue
+        if ocupacion.get(aula["aula_id"], sin_ocupar)[d] & mascara:
+            continue
+        libres.append(aula)
+    return periodo, libres
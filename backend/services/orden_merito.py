@@ -0,0 +1,173 @@
+# services/orden_merito.py
+# Orden de mérito por cohorte (escuela, ciclo), materializado a partir de historial_ciclo.
+# Cada cohorte guarda la firma (version_datos) de historial_ciclo, curso y estudiante y
+# se recalcula al leerla si la firma cambió (una nota, un curso editado, un estudiante
+# que cambia de escuela), sin invalidar a mano desde cada endpoint que los modifica.
+from database.db import get_db, asegurar_esquema
+from services.historial_academico import ESQUEMA_HISTORIAL
+from services.versiones import obtener_versiones
+
+TABLAS_ORDEN_MERITO = ("historial_ciclo", "curso", "estudiante")
+
+ESQUEMA_ORDEN_MERITO = """
+    CREATE TABLE IF NOT EXISTS orden_merito (
+        escuela_id INTEGER NOT NULL,
+        ciclo VARCHAR(10) NOT NULL,
+        estudiante_id INTEGER NOT NULL REFERENCES estudiante(estudiante_id) ON DELETE CASCADE,
+        promedio_ponderado NUMERIC(5, 2) NOT NULL,
+        creditos INTEGER NOT NULL,
+        creditos_aprobados INTEGER NOT NULL,
+        puesto INTEGER NOT NULL,
+        percentil NUMERIC(5, 2) NOT NULL,
+        PRIMARY KEY (escuela_id, ciclo, estudiante_id)
+    );
+    CREATE INDEX IF NOT EXISTS idx_orden_merito_puesto ON orden_merito (escuela_id, ciclo, puesto);
+
+    CREATE TABLE IF NOT EXISTS orden_merito_estado (
+        escuela_id INTEGER NOT NULL,
+        ciclo VARCHAR(10) NOT NULL,
+        vigente BOOLEAN NOT NULL DEFAULT FALSE,
+        total_estudiantes INTEGER NOT NULL DEFAULT 0,
+        fecha_calculo TIMESTAMP,
+        PRIMARY KEY (escuela_id, ciclo)
+    );
+    ALTER TABLE orden_merito_estado ADD COLUMN IF NOT EXISTS firma BIGINT[];
+"""
+
+# Puesto y percentil de toda la cohorte en una sola consulta, desde el historial por ciclo
+_CALCULO_COHORTE = """
+    WITH promedios AS (
+        SELECT h.estudiante_id, h.creditos_llevados AS creditos, h.creditos_aprobados, h.promedio_ponderado
+        FROM historial_ciclo h
+        JOIN estudiante e ON h.estudiante_id = e.estudiante_id
+        WHERE e.escuela_id = %(escuela_id)s AND h.ciclo = %(ciclo)s
+          AND h.creditos_llevados > 0
+    )
+    INSERT INTO orden_merito (
+        escuela_id, ciclo, estudiante_id, promedio_ponderado,
+        creditos, creditos_aprobados, puesto, percentil
+    )
+    SELECT
+        %(escuela_id)s,
+        %(ciclo)s,
+        estudiante_id,
+        promedio_ponderado,
+        creditos,
+        creditos_aprobados,
+        RANK() OVER w,
+        ROUND((100 * (1 - PERCENT_RANK() OVER w))::numeric, 2)
+    FROM promedios
+    WINDOW w AS (ORDER BY promedio_ponderado DESC)
+"""
+
+
+def _refrescar_si_hace_falta(conn, escuela_id, ciclo):
+    """Recalcula la cohorte solo si sus datos cambiaron desde el último cálculo."""
+    versiones = obtener_versiones(conn, TABLAS_ORDEN_MERITO)
+    firma = [versiones[tabla][0] for tabla in TABLAS_ORDEN_MERITO]
+    cur = conn.cursor()
+    try:
+        cur.execute("""
+            SELECT vigente AND firma = %s::bigint[] FROM orden_merito_estado
+            WHERE escuela_id = %s AND ciclo = %s
+        """, (firma, escuela_id, ciclo))
+        estado = cur.fetchone()
+        if estado and estado[0]:
+            return
+
+        # Bloquea la cohorte para que dos peticiones no la recalculen a la vez
+        cur.execute("""
+            INSERT INTO orden_merito_estado (escuela_id, ciclo, vigente)
+            VALUES (%s, %s, FALSE)
+            ON CONFLICT (escuela_id, ciclo) DO NOTHING
+        """, (escuela_id, ciclo))
+        cur.execute("""
+            SELECT vigente AND firma = %s::bigint[] FROM orden_merito_estado
+            WHERE escuela_id = %s AND ciclo = %s
+            FOR UPDATE
+        """, (firma, escuela_id, ciclo))
+        if cur.fetchone()[0]:
+            conn.commit()
+            return
+
+        cur.execute("DELETE FROM orden_merito WHERE escuela_id = %s AND ciclo = %s", (escuela_id, ciclo))
+        cur.execute(_CALCULO_COHORTE, {"escuela_id": escuela_id, "ciclo": ciclo})
+        total = cur.rowcount
+        cur.execute("""
+            UPDATE orden_merito_estado
+            SET vigente = TRUE, firma = %s::bigint[], total_estudiantes = %s, fecha_calculo = NOW()
+            WHERE escuela_id = %s AND ciclo = %s
+        """, (firma, total, escuela_id, ciclo))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+
+
+def obtener_orden_merito(escuela_id, ciclo, limite=None):
+    """Devuelve el orden de mérito materializado de la cohorte (escuela, ciclo)."""
+    asegurar_esquema("historial_ciclo", ESQUEMA_HISTORIAL)
+    asegurar_esquema("orden_merito", ESQUEMA_ORDEN_MERITO)
+    conn = get_db()
+    _refrescar_si_hace_falta(conn, escuela_id, ciclo)
+
+    cur = conn.cursor()
+    try:
+        cur.execute("""
+            SELECT total_estudiantes, fecha_calculo
+            FROM orden_merito_estado
+            WHERE escuela_id = %s AND ciclo = %s
+        """, (escuela_id, ciclo))
+        total, fecha_calculo = cur.fetchone()
+
+        consulta = """
+            SELECT
+                om.puesto,
+                om.estudiante_id,
+                e.codigo_universitario,
+                p.nombres,
+                p.apellidos,
+                om.promedio_ponderado,
+                om.creditos,
+                om.creditos_aprobados,
+                om.percentil
+            FROM orden_merito om
+            JOIN estudiante e ON om.estudiante_id = e.estudiante_id
+            JOIN persona p ON e.persona_id = p.persona_id
+            WHERE om.escuela_id = %s AND om.ciclo = %s
+            ORDER BY om.puesto, p.apellidos, p.nombres
+        """
+        parametros = [escuela_id, ciclo]
+        if limite:
+            consulta += " LIMIT %s"
+            parametros.append(limite)
+        cur.execute(consulta, parametros)
+        filas = cur.fetchall()
+    finally:
+        cur.close()
+
+    # Tercio superior: puestos dentro del primer tercio de la cohorte
+    limite_tercio = -(-total // 3) if total else 0
+
+    ranking = [{
+        "puesto": fila[0],
+        "estudiante_id": fila[1],
+        "codigo_universitario": fila[2],
+        "nombres": fila[3],
+        "apellidos": fila[4],
+        "promedio_ponderado": float(fila[5]),
+        "creditos": fila[6],
+        "creditos_aprobados": fila[7],
+        "percentil": float(fila[8]),
+        "tercio_superior": fila[0] <= limite_tercio
+    } for fila in filas]
+
+    return {
+        "escuela_id": escuela_id,
+        "ciclo": ciclo,
+        "total_estudiantes": total,
+        "fecha_calculo": str(fecha_calculo) if fecha_calculo else None,
+        "ranking": ranking
+    }
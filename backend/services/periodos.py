@@ -0,0 +1,157 @@
+# services/periodos.py
+# Paso de periodo: copia las secciones y asignaciones de un periodo a otro en una sola
+# transacción. Las validaciones se hacen por conjunto (una consulta para aulas/docentes,
+# un barrido para cruces) y no fila por fila. El llamador decide si confirma o, en modo
+# simulación, deshace la transacción y solo devuelve el diff.
+from services.conflictos import validar_cambios
+from services.importar_horarios import insertar_bloques
+
+
+class ErrorPeriodo(Exception):
+    """Parámetros inválidos para el paso de periodo."""
+
+
+def periodo_activo(cur):
+    """Periodo vigente: el más reciente con secciones activas ('' si no hay ninguno)."""
+    cur.execute("SELECT MAX(periodo) AS periodo FROM secciones WHERE UPPER(estado) = 'ACTIVO'")
+    fila = cur.fetchone()
+    if fila is None:
+        return ""
+    # Admite cursores normales y RealDictCursor
+    return (fila["periodo"] if isinstance(fila, dict) else fila[0]) or ""
+
+
+def _mapear_secciones(cur, origen, destino, copiar_secciones):
+    """{seccion_id origen: seccion_id destino} emparejando por código y ciclo; crea las que falten."""
+    creadas = []
+    if copiar_secciones:
+        cur.execute("""
+            INSERT INTO secciones (codigo, ciclo_academico, periodo, estado)
+            SELECT o.codigo, o.ciclo_academico, %s, o.estado
+            FROM secciones o
+            WHERE o.periodo = %s
+              AND NOT EXISTS (
+                  SELECT 1 FROM secciones d
+                  WHERE d.periodo = %s AND d.codigo = o.codigo AND d.ciclo_academico = o.ciclo_academico
+              )
+            RETURNING seccion_id, codigo, ciclo_academico
+        """, (destino, origen, destino))
+        creadas = [{"seccion_id": f[0], "codigo": f[1], "ciclo_academico": f[2]} for f in cur.fetchall()]
+
+    cur.execute("""
+        SELECT o.seccion_id, d.seccion_id
+        FROM secciones o
+        JOIN secciones d ON d.codigo = o.codigo AND d.ciclo_academico = o.ciclo_academico AND d.periodo = %s
+        WHERE o.periodo = %s
+    """, (destino, origen))
+    return dict(cur.fetchall()), creadas
+
+
+def clonar_periodo(cur, origen, destino, copiar_secciones=True):
+    """
+    Copia las asignaciones de `origen` a `destino`. Omite (con motivo) las que ya existen en
+    el destino, las de aulas no operativas o docentes inactivos, las que no tienen sección
+    equivalente y las que cruzan con el horario del destino. No hace commit.
+    """
+    if not origen or not destino:
+        raise ErrorPeriodo("Debe indicar el periodo de origen y el de destino")
+    if origen == destino:
+        raise ErrorPeriodo("El periodo de destino debe ser distinto al de origen")
+
+    cur.execute("SELECT COUNT(*) FROM secciones WHERE periodo = %s", (origen,))
+    if not cur.fetchone()[0]:
+        raise ErrorPeriodo(f"El periodo {origen} no tiene secciones")
+
+    mapa, secciones_creadas = _mapear_secciones(cur, origen, destino, copiar_secciones)
+
+    # Una sola consulta trae cada asignación de origen con el estado de su aula y su docente.
+    cur.execute("""
+        SELECT a.asignacion_id, a.curso_id, c.nombre, a.seccion_id, s.codigo, a.docente_id, a.aula_id,
+               a.cantidad_estudiantes, a.observaciones, a.dia, a.hora_inicio, a.hora_fin, a.tipo,
+               COALESCE(UPPER(au.estado) = 'OPERATIVO', FALSE) AS aula_operativa,
+               COALESCE(d.estado, FALSE) AS docente_activo
+        FROM asignaciones a
+        JOIN secciones s ON a.seccion_id = s.seccion_id
+        LEFT JOIN curso c ON a.curso_id = c.curso_id
+        LEFT JOIN aula au ON a.aula_id = au.aula_id
+        LEFT JOIN docente d ON a.docente_id = d.docente_id
+        WHERE s.periodo = %s
+        ORDER BY a.asignacion_id
+    """, (origen,))
+    origenes = cur.fetchall()
+
+    cur.execute("""
+        SELECT a.curso_id, a.seccion_id, a.tipo
+        FROM asignaciones a JOIN secciones s ON a.seccion_id = s.seccion_id
+        WHERE s.periodo = %s
+    """, (destino,))
+    existentes = {tuple(f) for f in cur.fetchall()}
+
+    candidatos, omitidas = [], []
+    for (asignacion_id, curso_id, curso, seccion_id, seccion, docente_id, aula_id, estudiantes,
+         observaciones, dia, hora_inicio, hora_fin, tipo, aula_operativa, docente_activo) in origenes:
+        seccion_destino = mapa.get(seccion_id)
+        motivo = None
+        if seccion_destino is None:
+            motivo = f"La sección {seccion} no existe en {destino}"
+        elif (curso_id, seccion_destino, tipo) in existentes:
+            motivo = "Ya existe en el periodo de destino"
+        elif not aula_operativa:
+            motivo = "Aula no operativa"
+        elif not docente_activo:
+            motivo = "Docente inactivo"
+        if motivo:
+            omitidas.append({"asignacion_id": asignacion_id, "curso": curso, "seccion": seccion,
+                             "tipo": tipo, "motivo": motivo})
+            continue
+        candidatos.append({
+            "origen_id": asignacion_id,
+            "curso_id": curso_id,
+            "curso": curso,
+            "seccion_id": seccion_destino,
+            "seccion": seccion,
+            "periodo": destino,
+            "docente_id": docente_id,
+            "aula_id": aula_id,
+            "estudiantes": estudiantes or 0,
+            "observaciones": observaciones,
+            "dia": dia,
+            "hora_inicio": hora_inicio.strftime("%H:%M") if hasattr(hora_inicio, "strftime") else hora_inicio,
+            "hora_fin": hora_fin.strftime("%H:%M") if hasattr(hora_fin, "strftime") else hora_fin,
+            "tipo": tipo,
+        })
+
+    # Cruces contra lo que ya tenga el destino (y entre las copias): se omiten todas las
+    # copias involucradas. `fila` identifica a cada copia en el reporte.
+    for fila, bloque in enumerate(candidatos):
+        bloque["fila"] = fila
+    reporte = validar_cambios(cur, candidatos) if candidatos else {"conflictos": []}
+    en_conflicto = {}
+    for conflicto in reporte["conflictos"]:
+        for resumen in conflicto["bloques"]:
+            if resumen.get("fila") is not None:
+                en_conflicto.setdefault(resumen["fila"], f"Cruce de {conflicto['tipo']} el {conflicto['dia']} "
+                                                         f"entre {conflicto['desde']} y {conflicto['hasta']}")
+
+    copias = []
+    for bloque in candidatos:
+        motivo = en_conflicto.get(bloque["fila"])
+        if motivo:
+            omitidas.append({"asignacion_id": bloque["origen_id"], "curso": bloque["curso"],
+                             "seccion": bloque["seccion"], "tipo": bloque["tipo"], "motivo": motivo})
+        else:
+            copias.append(bloque)
+
+    asignacion_ids = insertar_bloques(cur, copias) if copias else []
+    return {
+        "origen": origen,
+        "destino": destino,
+        "secciones_creadas": secciones_creadas,
+        "asignaciones_origen": len(origenes),
+        "copiadas": [
+            {"origen_id": b["origen_id"], "asignacion_id": nuevo_id, "curso": b["curso"], "seccion": b["seccion"],
+             "tipo": b["tipo"], "dia": b["dia"], "hora_inicio": b["hora_inicio"], "hora_fin": b["hora_fin"]}
+            for b, nuevo_id in zip(copias, asignacion_ids)
+        ],
+        "omitidas": omitidas,
+    }
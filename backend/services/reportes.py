@@ -0,0 +1,261 @@
+# services/reportes.py
+# Constructores de reportes: reciben un cursor y devuelven un dict serializable.
+# Los usan tanto los endpoints síncronos como la cola de tareas en segundo plano.
+from datetime import datetime
+
+
+def docente_tiene_curso(cur, docente_id, curso_id):
+    """Verifica que el docente tenga el curso asignado."""
+    cur.execute("""
+        SELECT COUNT(*) FROM cursos_docentes
+        WHERE docente_id = %s AND curso_id = %s
+    """, (docente_id, curso_id))
+    return cur.fetchone()[0] > 0
+
+
+def docente_tiene_asignacion(cur, usuario_id, asignacion_id):
+    """Verifica que la asignación sea del docente del usuario autenticado."""
+    cur.execute("""
+        SELECT 1
+        FROM asignaciones a
+        JOIN docente d ON a.docente_id = d.docente_id
+        JOIN persona p ON d.persona_id = p.persona_id
+        WHERE a.asignacion_id = %s AND p.usuario_id = %s
+    """, (asignacion_id, usuario_id))
+    return cur.fetchone() is not None
+
+
+def construir_informe_asistencia(cur, asignacion_id):
+    """
+    Informe completo de asistencia de una asignación: sesiones y, por estudiante,
+    su asistencia en cada sesión con totales y porcentaje. None si no existe.
+    """
+    # 1. Obtener información del curso
+    cur.execute("""
+        SELECT c.nombre, s.codigo, a.docente_id
+        FROM asignaciones a
+        JOIN curso c ON a.curso_id = c.curso_id
+        JOIN secciones s ON a.seccion_id = s.seccion_id
+        WHERE a.asignacion_id = %s
+    """, (asignacion_id,))
+
+    curso_info = cur.fetchone()
+    if not curso_info:
+        return None
+
+    # 2. Obtener todas las sesiones del curso
+    cur.execute("""
+        SELECT
+            sc.sesion_id,
+            sc.fecha,
+            sc.hora_inicio,
+            sc.hora_fin
+        FROM sesion_clase sc
+        JOIN asignaciones a ON sc.curso_id = a.curso_id AND sc.seccion_id = a.seccion_id
+        WHERE a.asignacion_id = %s
+        ORDER BY sc.fecha ASC
+    """, (asignacion_id,))
+
+    sesiones = []
+    for row in cur.fetchall():
+        sesiones.append({
+            'sesion_id': row[0],
+            'fecha': str(row[1]),
+            'hora_inicio': str(row[2]) if row[2] else None,
+            'hora_fin': str(row[3]) if row[3] else None
+        })
+
+    # 3. Obtener estudiantes con su asistencia
+    cur.execute("""
+        SELECT
+            e.estudiante_id,
+            p.nombres,
+            p.apellidos,
+            e.codigo_universitario,
+            m.matricula_id
+        FROM matriculas m
+        JOIN estudiante e ON m.estudiante_id = e.estudiante_id
+        JOIN persona p ON e.persona_id = p.persona_id
+        WHERE m.asignacion_id = %s
+        AND m.estado = 'ACTIVA'
+        ORDER BY p.apellidos, p.nombres
+    """, (asignacion_id,))
+
+    estudiantes = []
+    for row in cur.fetchall():
+        estudiante_id = row[0]
+        matricula_id = row[4]
+
+        # Obtener todas las asistencias del estudiante
+        cur.execute("""
+            SELECT
+                a.sesion_id,
+                a.estado,
+                sc.fecha
+            FROM asistencia a
+            JOIN sesion_clase sc ON a.sesion_id = sc.sesion_id
+            WHERE a.matricula_id = %s
+            ORDER BY sc.fecha ASC
+        """, (matricula_id,))
+
+        asistencias_dict = {}
+        total_sesiones = 0
+        presentes = 0
+        ausentes = 0
+        tardanzas = 0
+
+        for ast_row in cur.fetchall():
+            sesion_id = ast_row[0]
+            estado = ast_row[1]
+
+            asistencias_dict[sesion_id] = estado
+            total_sesiones += 1
+
+            if estado == 'Presente':
+                presentes += 1
+            elif estado == 'Ausente':
+                ausentes += 1
+            elif estado == 'Tardanza':
+                tardanzas += 1
+
+        # Calcular porcentaje
+        porcentaje = round((presentes / total_sesiones * 100), 2) if total_sesiones > 0 else 0
+
+        estudiantes.append({
+            'estudiante_id': estudiante_id,
+            'nombres': row[1],
+            'apellidos': row[2],
+            'codigo_universitario': row[3],
+            'matricula_id': matricula_id,
+            'asistencias': asistencias_dict,
+            'total_sesiones': total_sesiones,
+            'presentes': presentes,
+            'ausentes': ausentes,
+            'tardanzas': tardanzas,
+            'porcentaje': porcentaje
+        })
+
+    return {
+        'curso': {
+            'nombre': curso_info[0],
+            'seccion': curso_info[1]
+        },
+        'sesiones': sesiones,
+        'estudiantes': estudiantes
+    }
+
+
+def construir_reporte_resumen(cur, curso_id):
+    """Resumen del curso: estudiantes, calificaciones, clases y materiales."""
+    # Total de estudiantes matriculados
+    cur.execute("SELECT COUNT(*) FROM matriculas WHERE curso_id = %s", (curso_id,))
+    total_estudiantes = cur.fetchone()[0]
+
+    # Total de materiales subidos
+    cur.execute("SELECT COUNT(*) FROM materiales_didacticos WHERE curso_id = %s", (curso_id,))
+    total_materiales = cur.fetchone()[0]
+
+    # Estadísticas de calificaciones
+    cur.execute("""
+        SELECT AVG(nota), MAX(nota), MIN(nota),
+               COUNT(CASE WHEN nota >= 11 THEN 1 END),
+               COUNT(CASE WHEN nota < 11 THEN 1 END)
+        FROM calificaciones
+        WHERE curso_id = %s
+    """, (curso_id,))
+    cal_stats = cur.fetchone()
+    promedio, nota_max, nota_min, aprobados, desaprobados = [x or 0 for x in cal_stats]
+
+    # Total de clases dictadas (por fecha única)
+    cur.execute("""
+        SELECT COUNT(DISTINCT fecha_clase)
+        FROM asistencias
+        WHERE curso_id = %s
+    """, (curso_id,))
+    total_clases = cur.fetchone()[0] or 0
+
+    # Datos del curso
+    cur.execute("""
+        SELECT curso_id, nombre, codigo, creditos
+        FROM cursos
+        WHERE curso_id = %s
+    """, (curso_id,))
+    curso = cur.fetchone()
+
+    return {
+        'curso': {
+            'curso_id': curso[0],
+            'nombre': curso[1],
+            'codigo': curso[2],
+            'creditos': curso[3]
+        },
+        'estudiantes': {'total': total_estudiantes},
+        'calificaciones': {
+            'total_registradas': aprobados + desaprobados,
+            'promedio_general': round(float(promedio), 2) if promedio else 0,
+            'nota_maxima': float(nota_max),
+            'nota_minima': float(nota_min),
+            'aprobados': int(aprobados),
+            'desaprobados': int(desaprobados)
+        },
+        'asistencia': {'total_clases': total_clases},
+        'materiales': {'total_subidos': total_materiales},
+        'fecha_generacion': datetime.utcnow().isoformat()
+    }
+
+
+def construir_reporte_calificaciones(cur, curso_id):
+    """Reporte detallado de calificaciones por estudiante, ordenado por promedio."""
+    # Obtener todos los estudiantes y sus calificaciones
+    cur.execute("""
+        SELECT u.usuario_id, u.nombre, u.apellidos, u.email,
+               c.periodo, c.nota
+        FROM usuarios u
+        JOIN matriculas m ON u.usuario_id = m.estudiante_id
+        LEFT JOIN calificaciones c ON u.usuario_id = c.estudiante_id AND c.curso_id = m.curso_id
+        WHERE m.curso_id = %s
+        ORDER BY u.apellidos, u.nombre
+    """, (curso_id,))
+    filas = cur.fetchall()
+
+    # Agrupar por estudiante
+    estudiantes = {}
+    for row in filas:
+        est_id, nombre, apellidos, email, periodo, nota = row
+        if est_id not in estudiantes:
+            estudiantes[est_id] = {
+                'estudiante_id': est_id,
+                'nombre': f"{nombre} {apellidos}",
+                'email': email,
+                'calificaciones': {},
+                'notas': []
+            }
+        if periodo:
+            estudiantes[est_id]['calificaciones'][periodo] = float(nota)
+            estudiantes[est_id]['notas'].append(float(nota))
+
+    # Calcular promedio y estado
+    reporte_estudiantes = []
+    for est in estudiantes.values():
+        notas = est['notas']
+        promedio = sum(notas) / len(notas) if notas else 0
+        est['promedio'] = round(promedio, 2)
+        est['estado'] = "Aprobado" if promedio >= 11 else "Desaprobado"
+        reporte_estudiantes.append(est)
+
+    # Ordenar por promedio descendente
+    reporte_estudiantes.sort(key=lambda x: x['promedio'], reverse=True)
+
+    # Datos del curso
+    cur.execute("SELECT curso_id, nombre, codigo FROM cursos WHERE curso_id = %s", (curso_id,))
+    curso = cur.fetchone()
+
+    return {
+        'curso': {
+            'curso_id': curso[0],
+            'nombre': curso[1],
+            'codigo': curso[2]
+        },
+        'estudiantes': reporte_estudiantes,
+        'fecha_generacion': datetime.utcnow().isoformat()
+    }
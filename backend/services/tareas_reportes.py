@@ -0,0 +1,271 @@
+# services/tareas_reportes.py
+# Cola de reportes pesados: se encolan, se generan en un pool de hilos con su propia
+# conexión y el resultado queda guardado en tarea_reporte. La clave de caché combina
+# el tipo, los parámetros y la versión de las tablas que lee el reporte, así que
+# mientras los datos no cambien se reutiliza el resultado ya generado.
+import hashlib
+import json
+import os
+import threading
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from psycopg2.extras import Json
+
+from database.db import conectar, asegurar_esquema
+from services.versiones import obtener_versiones
+from services.reportes import (
+    docente_tiene_curso,
+    docente_tiene_asignacion,
+    construir_informe_asistencia,
+    construir_reporte_resumen,
+    construir_reporte_calificaciones,
+)
+
+ESQUEMA_TAREAS = """
+    CREATE TABLE IF NOT EXISTS tarea_reporte (
+        tarea_id VARCHAR(32) PRIMARY KEY,
+        tipo VARCHAR(40) NOT NULL,
+        parametros JSONB NOT NULL,
+        clave_cache CHAR(64) NOT NULL,
+        estado VARCHAR(15) NOT NULL DEFAULT 'PENDIENTE'
+            CHECK (estado IN ('PENDIENTE', 'EN_PROCESO', 'COMPLETADO', 'FALLIDO')),
+        resultado JSONB,
+        error TEXT,
+        fecha_creacion TIMESTAMP NOT NULL DEFAULT NOW(),
+        fecha_inicio TIMESTAMP,
+        fecha_fin TIMESTAMP
+    );
+    CREATE INDEX IF NOT EXISTS idx_tarea_reporte_clave ON tarea_reporte (clave_cache, fecha_creacion DESC);
+
+    -- Usuario (identidad del token) que encoló la tarea: solo él puede verla
+    ALTER TABLE tarea_reporte ADD COLUMN IF NOT EXISTS usuario_id INT;
+"""
+
+# Una tarea pendiente más antigua que esto se considera perdida (p. ej. reinicio del proceso)
+MINUTOS_TAREA_ACTIVA = 30
+HORAS_RETENCION = int(os.getenv("REPORTES_TTL_HORAS", "24"))
+
+
+class ErrorTarea(Exception):
+    """Error de validación al encolar un reporte."""
+
+
+class ErrorPermiso(ErrorTarea):
+    """El usuario del token no tiene acceso a los datos del reporte."""
+
+
+def _curso_del_docente(cur, usuario_id, parametros):
+    # Mismo criterio que los reportes síncronos (reportes_routes.py)
+    return docente_tiene_curso(cur, usuario_id, parametros["curso_id"])
+
+
+def _verificar_acceso(cur, definicion, usuario_id, parametros):
+    if not definicion["acceso"](cur, usuario_id, parametros):
+        raise ErrorPermiso("No tienes permisos para generar este reporte")
+
+
+# tipo -> parámetros obligatorios, tablas que lee (para la versión), verificación de
+# acceso del usuario del token y generador. El docente nunca sale de los parámetros.
+TIPOS_REPORTE = {
+    "informe_asistencia": {
+        "parametros": ("asignacion_id",),
+        "tablas": ("asignaciones", "curso", "secciones", "sesion_clase", "asistencia", "matriculas", "estudiante", "persona"),
+        "acceso": lambda cur, u, p: docente_tiene_asignacion(cur, u, p["asignacion_id"]),
+        "generar": lambda cur, p: construir_informe_asistencia(cur, p["asignacion_id"]),
+    },
+    "resumen_curso": {
+        "parametros": ("curso_id",),
+        "tablas": ("cursos", "cursos_docentes", "matriculas", "materiales_didacticos", "calificaciones", "asistencias"),
+        "acceso": _curso_del_docente,
+        "generar": lambda cur, p: construir_reporte_resumen(cur, p["curso_id"]),
+    },
+    "calificaciones_curso": {
+        "parametros": ("curso_id",),
+        "tablas": ("cursos", "cursos_docentes", "matriculas", "calificaciones", "usuarios"),
+        "acceso": _curso_del_docente,
+        "generar": lambda cur, p: construir_reporte_calificaciones(cur, p["curso_id"]),
+    },
+}
+
+_executor = None
+_lock_executor = threading.Lock()
+
+
+def _obtener_executor():
+    global _executor
+    if _executor is None:
+        with _lock_executor:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=int(os.getenv("REPORTES_WORKERS", "2")),
+                    thread_name_prefix="reportes"
+                )
+    return _executor
+
+
+def _validar(tipo, parametros):
+    definicion = TIPOS_REPORTE.get(tipo)
+    if not definicion:
+        raise ErrorTarea(f"Tipo de reporte no válido. Opciones: {', '.join(TIPOS_REPORTE)}")
+    limpios = {}
+    for nombre in definicion["parametros"]:
+        try:
+            limpios[nombre] = int(parametros[nombre])
+        except (KeyError, TypeError, ValueError):
+            raise ErrorTarea(f"Parámetro '{nombre}' obligatorio y numérico")
+    return definicion, limpios
+
+
+def _clave_cache(conn, tipo, parametros, tablas, usuario_id):
+    versiones = obtener_versiones(conn, tablas)
+    contenido = json.dumps({
+        "tipo": tipo,
+        "usuario_id": usuario_id,
+        "parametros": parametros,
+        "versiones": {tabla: versiones[tabla][0] for tabla in sorted(tablas)}
+    }, sort_keys=True)
+    return hashlib.sha256(contenido.encode("utf-8")).hexdigest()
+
+
+def _serializar(fila):
+    tarea_id, tipo, parametros, estado, error, creacion, inicio, fin = fila
+    return {
+        "tarea_id": tarea_id,
+        "tipo": tipo,
+        "parametros": parametros,
+        "estado": estado,
+        "error": error,
+        "fecha_creacion": str(creacion) if creacion else None,
+        "fecha_inicio": str(inicio) if inicio else None,
+        "fecha_fin": str(fin) if fin else None
+    }
+
+
+_COLUMNAS = "tarea_id, tipo, parametros, estado, error, fecha_creacion, fecha_inicio, fecha_fin"
+
+
+def encolar_reporte(conn, tipo, parametros, usuario_id):
+    """
+    Encola un reporte para el usuario autenticado y devuelve (tarea, reutilizada).
+    Si ya existe un resultado suyo para los mismos datos, o una tarea en curso, se devuelve esa.
+    Lanza ErrorPermiso si el usuario no tiene acceso a los datos pedidos.
+    """
+    asegurar_esquema("tarea_reporte", ESQUEMA_TAREAS)
+    definicion, parametros = _validar(tipo, parametros)
+    usuario_id = int(usuario_id)
+
+    cur = conn.cursor()
+    try:
+        _verificar_acceso(cur, definicion, usuario_id, parametros)
+    finally:
+        cur.close()
+    clave = _clave_cache(conn, tipo, parametros, definicion["tablas"], usuario_id)
+
+    cur = conn.cursor()
+    try:
+        # Serializa los envíos idénticos para no generar dos veces el mismo reporte
+        cur.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", (clave,))
+        cur.execute(f"""
+            SELECT {_COLUMNAS}
+            FROM tarea_reporte
+            WHERE clave_cache = %s AND usuario_id = %s
+              AND (estado = 'COMPLETADO'
+                   OR (estado IN ('PENDIENTE', 'EN_PROCESO')
+                       AND fecha_creacion > NOW() - make_interval(mins => %s)))
+            ORDER BY fecha_creacion DESC
+            LIMIT 1
+        """, (clave, usuario_id, MINUTOS_TAREA_ACTIVA))
+        existente = cur.fetchone()
+        if existente:
+            conn.commit()
+            return _serializar(existente), True
+
+        # Limpieza de resultados vencidos
+        cur.execute("""
+            DELETE FROM tarea_reporte
+            WHERE fecha_creacion < NOW() - make_interval(hours => %s)
+        """, (HORAS_RETENCION,))
+
+        tarea_id = uuid.uuid4().hex
+        cur.execute(f"""
+            INSERT INTO tarea_reporte (tarea_id, tipo, parametros, clave_cache, usuario_id)
+            VALUES (%s, %s, %s, %s, %s)
+            RETURNING {_COLUMNAS}
+        """, (tarea_id, tipo, Json(parametros), clave, usuario_id))
+        tarea = _serializar(cur.fetchone())
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+
+    _obtener_executor().submit(_ejecutar, tarea_id)
+    return tarea, False
+
+
+def _ejecutar(tarea_id):
+    """Genera el reporte en segundo plano con una conexión propia."""
+    conn = conectar()
+    cur = conn.cursor()
+    try:
+        cur.execute("""
+            UPDATE tarea_reporte
+            SET estado = 'EN_PROCESO', fecha_inicio = NOW()
+            WHERE tarea_id = %s
+            RETURNING tipo, parametros, usuario_id
+        """, (tarea_id,))
+        tipo, parametros, usuario_id = cur.fetchone()
+        conn.commit()
+
+        # El acceso se vuelve a comprobar al generar (pudo cambiar la asignación)
+        definicion = TIPOS_REPORTE[tipo]
+        _verificar_acceso(cur, definicion, usuario_id, parametros)
+        resultado = definicion["generar"](cur, parametros)
+        if resultado is None:
+            raise ErrorTarea("No se encontraron datos para el reporte")
+
+        cur.execute("""
+            UPDATE tarea_reporte
+            SET estado = 'COMPLETADO', resultado = %s, fecha_fin = NOW()
+            WHERE tarea_id = %s
+        """, (Json(resultado, dumps=lambda obj: json.dumps(obj, default=str)), tarea_id))
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        if not isinstance(e, ErrorTarea):
+            print(f"❌ Error generando reporte {tarea_id}:")
+            traceback.print_exc()
+        cur.execute("""
+            UPDATE tarea_reporte
+            SET estado = 'FALLIDO', error = %s, fecha_fin = NOW()
+            WHERE tarea_id = %s
+        """, (str(e), tarea_id))
+        conn.commit()
+    finally:
+        cur.close()
+        conn.close()
+
+
+def obtener_tarea(conn, tarea_id, usuario_id, con_resultado=False):
+    """
+    Estado de una tarea del usuario (y su resultado si se pide).
+    None si no existe o la encoló otro usuario.
+    """
+    asegurar_esquema("tarea_reporte", ESQUEMA_TAREAS)
+    cur = conn.cursor()
+    try:
+        columnas = _COLUMNAS + (", resultado" if con_resultado else "")
+        cur.execute(f"SELECT {columnas} FROM tarea_reporte WHERE tarea_id = %s AND usuario_id = %s",
+                    (tarea_id, int(usuario_id)))
+        fila = cur.fetchone()
+    finally:
+        cur.close()
+    if not fila:
+        return None
+    tarea = _serializar(fila[:8])
+    if con_resultado:
+        tarea["resultado"] = fila[8]
+    return tarea
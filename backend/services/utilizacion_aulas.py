@@ -0,0 +1,249 @@
+# services/utilizacion_aulas.py
+# Uso de aulas: mapa de calor día × franja por aula y por pabellón, y un optimizador
+# que reubica bloques en el aula más pequeña que les alcance (best-fit decreciente),
+# para dejar libres las aulas grandes.
+#
+# La ocupación se agrega en una sola consulta (GROUP BY aula, día, horas) y se expande
+# a la grilla HORARIOS_VALIDOS con las máscaras de franjas de services.horarios.
+from psycopg2.extras import execute_values
+
+from services.horarios import (
+    DIAS, HORARIOS_VALIDOS, RESTRICCION_AULA, TOTAL_FRANJAS, mascara_franjas, restricciones_existentes
+)
+
+_INDICE_DIA = {dia: i for i, dia in enumerate(DIAS)}
+
+
+class ErrorOptimizacion(Exception):
+    """Las reubicaciones ya no corresponden al horario vigente."""
+
+
+def _hhmm(hora):
+    return hora.strftime("%H:%M") if hasattr(hora, "strftime") else hora
+
+
+def _franjas(mascara):
+    return [f for f in range(TOTAL_FRANJAS) if mascara >> f & 1]
+
+
+def _cargar_aulas(cur, pabellon_id=None):
+    cur.execute("""
+        SELECT a.aula_id, a.nombre_aula, COALESCE(a.capacidad, 0), a.tipo_aula_id,
+               a.pabellon_id, p.nombre_pabellon, UPPER(a.estado) = 'OPERATIVO'
+        FROM aula a
+        LEFT JOIN pabellon p ON a.pabellon_id = p.pabellon_id
+        WHERE (%s::int IS NULL OR a.pabellon_id = %s::int)
+        ORDER BY p.nombre_pabellon, a.nombre_aula
+    """, (pabellon_id, pabellon_id))
+    return {
+        fila[0]: {
+            "aula_id": fila[0], "nombre": fila[1], "capacidad": fila[2], "tipo_aula_id": fila[3],
+            "pabellon_id": fila[4], "pabellon": fila[5], "operativa": fila[6],
+        }
+        for fila in cur.fetchall()
+    }
+
+
+def mapa_utilizacion(cur, periodo=None, pabellon_id=None):
+    """
+    Por aula: matriz día × franja con la fracción de asientos usada (0 = libre) y
+    totales de ocupación horaria y de asientos. Por pabellón: fracción de sus aulas
+    ocupadas en cada celda.
+    """
+    aulas = _cargar_aulas(cur, pabellon_id)
+    cur.execute("""
+        SELECT a.aula_id, a.dia, a.hora_inicio, a.hora_fin,
+               COUNT(*), SUM(COALESCE(a.cantidad_estudiantes, 0))
+        FROM asignaciones a
+        JOIN secciones s ON a.seccion_id = s.seccion_id
+        WHERE a.aula_id = ANY(%s)
+          AND (%s::text IS NULL OR s.periodo = %s::text)
+          AND a.dia IS NOT NULL AND a.hora_inicio IS NOT NULL AND a.hora_fin IS NOT NULL
+        GROUP BY a.aula_id, a.dia, a.hora_inicio, a.hora_fin
+    """, (list(aulas), periodo, periodo))
+
+    matrices = {aula_id: [[0.0] * TOTAL_FRANJAS for _ in DIAS] for aula_id in aulas}
+    for aula_id, dia, inicio, fin, _, estudiantes in cur.fetchall():
+        d = _INDICE_DIA.get(dia)
+        if d is None:
+            continue
+        capacidad = aulas[aula_id]["capacidad"] or 1
+        fila = matrices[aula_id][d]
+        for f in _franjas(mascara_franjas(inicio, fin)):
+            fila[f] = min(round(fila[f] + estudiantes / capacidad, 3), 9.99)
+
+    celdas = len(DIAS) * TOTAL_FRANJAS
+    resultado_aulas, pabellones = [], {}
+    for aula_id, aula in aulas.items():
+        matriz = matrices[aula_id]
+        ocupadas = [valor for fila in matriz for valor in fila if valor > 0]
+        resultado_aulas.append({
+            **{k: v for k, v in aula.items() if k != "operativa"},
+            "estado_operativo": aula["operativa"],
+            "franjas_ocupadas": len(ocupadas),
+            "ocupacion_horaria": round(len(ocupadas) / celdas, 3),
+            "ocupacion_asientos": round(sum(min(v, 1) for v in ocupadas) / len(ocupadas), 3) if ocupadas else 0,
+            "matriz": matriz,
+        })
+
+        pabellon = pabellones.setdefault(aula["pabellon_id"], {
+            "pabellon_id": aula["pabellon_id"], "pabellon": aula["pabellon"], "aulas": 0,
+            "franjas_ocupadas": 0, "matriz": [[0] * TOTAL_FRANJAS for _ in DIAS],
+        })
+        pabellon["aulas"] += 1
+        pabellon["franjas_ocupadas"] += len(ocupadas)
+        for d, fila in enumerate(matriz):
+            for f, valor in enumerate(fila):
+                if valor > 0:
+                    pabellon["matriz"][d][f] += 1
+
+    for pabellon in pabellones.values():
+        total = pabellon["aulas"]
+        pabellon["ocupacion_horaria"] = round(pabellon["franjas_ocupadas"] / (celdas * total), 3)
+        pabellon["matriz"] = [[round(n / total, 3) for n in fila] for fila in pabellon["matriz"]]
+
+    return {
+        "periodo": periodo,
+        "dias": DIAS,
+        "franjas": HORARIOS_VALIDOS,
+        "aulas": resultado_aulas,
+        "pabellones": sorted(pabellones.values(), key=lambda p: p["pabellon"] or ""),
+    }
+
+
+def proponer_reubicaciones(cur, periodo, mismo_pabellon=False):
+    """
+    Best-fit decreciente: cada bloque (de mayor a menor cantidad de estudiantes) se
+    intenta mover al aula operativa más pequeña del mismo tipo que le alcance y esté
+    libre en sus franjas. Solo se propone el cambio si el aula nueva es más chica.
+    """
+    aulas = {aula_id: aula for aula_id, aula in _cargar_aulas(cur).items() if aula["operativa"]}
+    cur.execute("""
+        SELECT a.asignacion_id, a.aula_id, a.dia, a.hora_inicio, a.hora_fin,
+               COALESCE(a.cantidad_estudiantes, 0), c.nombre, s.codigo, a.tipo
+        FROM asignaciones a
+        JOIN secciones s ON a.seccion_id = s.seccion_id
+        LEFT JOIN curso c ON a.curso_id = c.curso_id
+        WHERE s.periodo = %s AND a.aula_id IS NOT NULL
+          AND a.dia IS NOT NULL AND a.hora_inicio IS NOT NULL AND a.hora_fin IS NOT NULL
+    """, (periodo,))
+    bloques = []
+    ocupacion = {aula_id: [0] * len(DIAS) for aula_id in aulas}
+    for asignacion_id, aula_id, dia, inicio, fin, estudiantes, curso, seccion, tipo in cur.fetchall():
+        d = _INDICE_DIA.get(dia)
+        if d is None:
+            continue
+        mascara = mascara_franjas(inicio, fin)
+        if aula_id in ocupacion:
+            ocupacion[aula_id][d] |= mascara
+        bloques.append({
+            "asignacion_id": asignacion_id, "aula_id": aula_id, "dia": dia, "d": d, "mascara": mascara,
+            "hora_inicio": _hhmm(inicio), "hora_fin": _hhmm(fin),
+            "estudiantes": estudiantes, "curso": curso, "seccion": seccion, "tipo": tipo,
+        })
+
+    ordenadas = sorted(aulas.values(), key=lambda a: (a["capacidad"], a["aula_id"]))
+    bloques.sort(key=lambda b: (-b["estudiantes"], b["asignacion_id"]))
+
+    propuestas = []
+    for bloque in bloques:
+        actual = aulas.get(bloque["aula_id"])
+        if actual is None:
+            continue
+        d, mascara = bloque["d"], bloque["mascara"]
+        for aula in ordenadas:
+            if aula["capacidad"] >= actual["capacidad"]:
+                break
+            if aula["capacidad"] < bloque["estudiantes"] or aula["tipo_aula_id"] != actual["tipo_aula_id"]:
+                continue
+            if mismo_pabellon and aula["pabellon_id"] != actual["pabellon_id"]:
+                continue
+            if ocupacion[aula["aula_id"]][d] & mascara:
+                continue
+            ocupacion[actual["aula_id"]][d] &= ~mascara
+            ocupacion[aula["aula_id"]][d] |= mascara
+            propuestas.append({
+                "asignacion_id": bloque["asignacion_id"],
+                "curso": bloque["curso"], "seccion": bloque["seccion"], "tipo": bloque["tipo"],
+                "dia": bloque["dia"], "hora_inicio": bloque["hora_inicio"], "hora_fin": bloque["hora_fin"],
+                "estudiantes": bloque["estudiantes"],
+                "aula_actual_id": actual["aula_id"], "aula_actual": actual["nombre"],
+                "capacidad_actual": actual["capacidad"],
+                "aula_propuesta_id": aula["aula_id"], "aula_propuesta": aula["nombre"],
+                "capacidad_propuesta": aula["capacidad"],
+            })
+            break
+
+    origenes = {p["aula_actual_id"] for p in propuestas}
+    liberadas = [aulas[a]["nombre"] for a in sorted(origenes) if not any(ocupacion[a])]
+    return {
+        "periodo": periodo,
+        "bloques_revisados": len(bloques),
+        "asientos_liberados": sum(p["capacidad_actual"] - p["capacidad_propuesta"] for p in propuestas),
+        "aulas_liberadas": liberadas,
+        "propuestas": propuestas,
+    }
+
+
+def aplicar_reubicaciones(cur, cambios):
+    """
+    Aplica los cambios [(asignacion_id, aula_actual_id, aula_propuesta_id)] en un único
+    UPDATE. La restricción de aula se difiere al commit para admitir intercambios; si
+    alguna asignación ya no está en el aula esperada se aborta todo. Si la restricción
+    no existe (datos previos con cruces) los cruces se validan por consulta.
+    Antes del UPDATE se vuelven a verificar, en la misma transacción, las reglas de la
+    propuesta: el aula nueva existe, está operativa, es del mismo tipo que la actual y
+    le alcanza a la cantidad de estudiantes (los cambios pueden venir editados).
+    """
+    invalidas = execute_values(cur, """
+        SELECT v.asignacion_id,
+               CASE
+                   WHEN a.asignacion_id IS NULL THEN 'la asignación no existe'
+                   WHEN nueva.aula_id IS NULL THEN 'el aula propuesta no existe'
+                   WHEN UPPER(COALESCE(nueva.estado, '')) <> 'OPERATIVO' THEN 'el aula propuesta no está operativa'
+                   WHEN nueva.tipo_aula_id IS DISTINCT FROM actual.tipo_aula_id THEN 'el aula propuesta es de otro tipo'
+                   ELSE 'el aula propuesta no tiene capacidad para ' || COALESCE(a.cantidad_estudiantes, 0) || ' estudiantes'
+               END
+        FROM (VALUES %s) AS v(asignacion_id, aula_anterior, aula_nueva)
+        LEFT JOIN asignaciones a ON a.asignacion_id = v.asignacion_id
+        LEFT JOIN aula actual ON actual.aula_id = v.aula_anterior
+        LEFT JOIN aula nueva ON nueva.aula_id = v.aula_nueva
+        WHERE a.asignacion_id IS NULL OR nueva.aula_id IS NULL
+           OR UPPER(COALESCE(nueva.estado, '')) <> 'OPERATIVO'
+           OR nueva.tipo_aula_id IS DISTINCT FROM actual.tipo_aula_id
+           OR COALESCE(nueva.capacidad, 0) < COALESCE(a.cantidad_estudiantes, 0)
+        ORDER BY v.asignacion_id
+    """, cambios, template="(%s::int, %s::int, %s::int)", page_size=500, fetch=True)
+    if invalidas:
+        detalle = "; ".join(f"asignación {asignacion_id}: {motivo}" for asignacion_id, motivo in invalidas[:10])
+        raise ErrorOptimizacion(f"{len(invalidas)} cambio(s) no válido(s) ({detalle})")
+
+    con_restriccion = RESTRICCION_AULA in restricciones_existentes(cur)
+    if con_restriccion:
+        cur.execute(f"SET CONSTRAINTS {RESTRICCION_AULA} DEFERRED")
+    actualizadas = execute_values(cur, """
+        UPDATE asignaciones a
+        SET aula_id = v.aula_nueva
+        FROM (VALUES %s) AS v(asignacion_id, aula_anterior, aula_nueva)
+        WHERE a.asignacion_id = v.asignacion_id AND a.aula_id = v.aula_anterior
+        RETURNING a.asignacion_id
+    """, cambios, template="(%s::int, %s::int, %s::int)", page_size=500, fetch=True)
+    if len(actualizadas) != len(cambios):
+        raise ErrorOptimizacion(
+            f"{len(cambios) - len(actualizadas)} asignación(es) cambiaron de aula desde la propuesta"
+        )
+    ids = [fila[0] for fila in actualizadas]
+    if not con_restriccion:
+        cur.execute("""
+            SELECT 1
+            FROM asignaciones a
+            JOIN asignaciones b
+              ON b.aula_id = a.aula_id AND b.dia = a.dia AND b.asignacion_id <> a.asignacion_id
+             AND COALESCE(b.periodo, '') = COALESCE(a.periodo, '')
+             AND b.hora_inicio < a.hora_fin AND b.hora_fin > a.hora_inicio
+            WHERE a.asignacion_id = ANY(%s)
+            LIMIT 1
+        """, (ids,))
+        if cur.fetchone():
+            raise ErrorOptimizacion("Las reubicaciones generan un cruce de aula")
+    return ids
@@ -0,0 +1,66 @@
+# services/versiones.py
+# Contador de versión por tabla, incrementado por triggers de sentencia.
+# Permite invalidar cachés comparando un número en lugar de recalcular datos.
+from database.db import asegurar_esquema
+
+ESQUEMA_VERSIONES = """
+    CREATE TABLE IF NOT EXISTS version_datos (
+        ambito VARCHAR(60) PRIMARY KEY,
+        version BIGINT NOT NULL DEFAULT 0,
+        fecha_actualizacion TIMESTAMP NOT NULL DEFAULT NOW()
+    );
+
+    CREATE OR REPLACE FUNCTION incrementar_version_datos() RETURNS trigger AS $$
+    BEGIN
+        INSERT INTO version_datos (ambito, version, fecha_actualizacion)
+        VALUES (TG_ARGV[0], 1, NOW())
+        ON CONFLICT (ambito) DO UPDATE
+            SET version = version_datos.version + 1,
+                fecha_actualizacion = NOW();
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+"""
+
+_TRIGGER_TABLA = """
+    DO $$
+    BEGIN
+        IF to_regclass('{tabla}') IS NOT NULL AND NOT EXISTS (
+            SELECT 1 FROM pg_trigger
+            WHERE tgname = 'trg_version_{tabla}' AND tgrelid = to_regclass('{tabla}')
+        ) THEN
+            CREATE TRIGGER trg_version_{tabla}
+                AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {tabla}
+                FOR EACH STATEMENT EXECUTE FUNCTION incrementar_version_datos('{tabla}');
+        END IF;
+    END;
+    $$;
+"""
+
+
+def versionar_tablas(*tablas):
+    """Instala (una vez por proceso) el trigger de versión en cada tabla indicada."""
+    asegurar_esquema("version_datos", ESQUEMA_VERSIONES)
+    for tabla in tablas:
+        asegurar_esquema(f"version_datos:{tabla}", _TRIGGER_TABLA.format(tabla=tabla))
+
+
+def obtener_versiones(conn, tablas):
+    """
+    Devuelve {tabla: (version, fecha_actualizacion)}; las tablas sin cambios registrados
+    valen 0. La fecha viene con zona horaria (la columna guarda la hora local de la BD).
+    """
+    versionar_tablas(*tablas)
+    cur = conn.cursor()
+    try:
+        cur.execute("""
+            SELECT ambito, version, fecha_actualizacion AT TIME ZONE current_setting('TimeZone')
+            FROM version_datos
+            WHERE ambito = ANY(%s)
+        """, (list(tablas),))
+        versiones = {tabla: (0, None) for tabla in tablas}
+        for ambito, version, fecha in cur.fetchall():
+            versiones[ambito] = (version, fecha)
+        return versiones
+    finally:
+        cur.close()
@@ -0,0 +1,17 @@
+# utils/cache_http.py
+# Respuestas con GET condicional (ETag / Last-Modified): si el cliente ya tiene la
+# versión vigente se responde 304 sin cuerpo.
+from flask import Response, request
+
+
+def respuesta_condicional(contenido, mimetype, etag, ultima_modificacion=None,
+                          nombre_archivo=None, cache_control="private, no-cache"):
+    """Arma la respuesta con sus validadores y la convierte en 304 si corresponde."""
+    respuesta = Response(contenido, mimetype=mimetype)
+    respuesta.set_etag(etag)
+    if ultima_modificacion is not None:
+        respuesta.last_modified = ultima_modificacion
+    if nombre_archivo:
+        respuesta.headers["Content-Disposition"] = f'inline; filename="{nombre_archivo}"'
+    respuesta.headers["Cache-Control"] = cache_control
+    return respuesta.make_conditional(request)
@@ -0,0 +1,242 @@
+# utils/hojas_calculo.py
+# Generadores de CSV y XLSX en streaming: reciben encabezados y un iterable de filas
+# y van entregando bytes a medida que se producen, sin armar el archivo en memoria.
+# El XLSX se escribe directamente con zipfile (formato SpreadsheetML mínimo con
+# cadenas en línea), así que no requiere dependencias adicionales.
+# También incluye un lector mínimo de CSV/XLSX (primera hoja, valores como texto).
+import csv
+import io
+import re
+import zipfile
+from datetime import date, datetime, time
+from decimal import Decimal
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape
+
+MIMETYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+# Cada cuántas filas se vacía el búfer hacia la respuesta
+_FILAS_POR_BLOQUE = 500
+
+
+def generar_csv(encabezados, filas):
+    """CSV en UTF-8 con BOM (Excel lo abre con tildes correctas)."""
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    buffer.write("\ufeff")
+    escritor.writerow(encabezados)
+    for i, fila in enumerate(filas, 1):
+        escritor.writerow(["" if valor is None else valor for valor in fila])
+        if i % _FILAS_POR_BLOQUE == 0:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode("utf-8")
+
+
+class _SalidaZip:
+    """Destino no posicionable para zipfile: acumula bytes hasta que se recogen."""
+
+    def __init__(self):
+        self._partes = []
+
+    def write(self, datos):
+        self._partes.append(bytes(datos))
+        return len(datos)
+
+    def flush(self):
+        pass
+
+    def recoger(self):
+        datos = b"".join(self._partes)
+        self._partes = []
+        return datos
+
+
+_CONTENT_TYPES = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
+<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
+<Default Extension="xml" ContentType="application/xml"/>
+<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>
+<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>
+<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>
+</Types>"""
+
+_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>
+</Relationships>"""
+
+_WORKBOOK = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">
+<sheets><sheet name="{hoja}" sheetId="1" r:id="rId1"/></sheets>
+</workbook>"""
+
+_WORKBOOK_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>
+<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>
+</Relationships>"""
+
+# Estilo 1: encabezado en negrita
+_STYLES = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">
+<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font><font><b/><sz val="11"/><name val="Calibri"/></font></fonts>
+<fills count="2"><fill><patternFill patternType="none"/></fill><fill><patternFill patternType="gray125"/></fill></fills>
+<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>
+<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>
+<cellXfs count="2"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/><xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/></cellXfs>
+</styleSheet>"""
+
+
+def _celda(valor, estilo=0):
+    atributo_estilo = f' s="{estilo}"' if estilo else ""
+    if valor is None or valor == "":
+        return "<c/>"
+    if isinstance(valor, bool):
+        return f'<c t="b"{atributo_estilo}><v>{int(valor)}</v></c>'
+    if isinstance(valor, (int, float, Decimal)):
+        return f'<c{atributo_estilo}><v>{valor}</v></c>'
+    if isinstance(valor, (datetime, date, time)):
+        valor = valor.isoformat(sep=" ") if isinstance(valor, datetime) else valor.isoformat()
+    return f'<c t="inlineStr"{atributo_estilo}><is><t>{escape(str(valor))}</t></is></c>'
+
+
+def _fila_xml(valores, estilo=0):
+    return ("<row>" + "".join(_celda(v, estilo) for v in valores) + "</row>").encode("utf-8")
+
+
+def generar_xlsx(encabezados, filas, hoja="Hoja1"):
+    """Libro XLSX de una hoja; la primera fila (encabezados) queda en negrita y fija."""
+    salida = _SalidaZip()
+    with zipfile.ZipFile(salida, "w", compression=zipfile.ZIP_DEFLATED) as libro:
+        libro.writestr("[Content_Types].xml", _CONTENT_TYPES)
+        libro.writestr("_rels/.rels", _RELS)
+        # Excel no admite []:*?/\\ en el nombre de hoja ni más de 31 caracteres
+        nombre_hoja = re.sub(r'[\[\]:*?/\\]', '-', hoja)[:31]
+        libro.writestr("xl/workbook.xml", _WORKBOOK.format(hoja=escape(nombre_hoja)))
+        libro.writestr("xl/_rels/workbook.xml.rels", _WORKBOOK_RELS)
+        libro.writestr("xl/styles.xml", _STYLES)
+        yield salida.recoger()
+
+        with libro.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as hoja_xml:
+            hoja_xml.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                b'<sheetViews><sheetView workbookViewId="0"><pane ySplit="1" topLeftCell="A2" state="frozen"/></sheetView></sheetViews>'
+                b'<sheetData>'
+            )
+            hoja_xml.write(_fila_xml(encabezados, estilo=1))
+            for i, fila in enumerate(filas, 1):
+                hoja_xml.write(_fila_xml(fila))
+                if i % _FILAS_POR_BLOQUE == 0:
+                    yield salida.recoger()
+            hoja_xml.write(b"</sheetData></worksheet>")
+    yield salida.recoger()
+
+
+def generar_hoja(formato, encabezados, filas, hoja="Hoja1"):
+    """Despacha al generador según el formato ('csv' o 'xlsx')."""
+    if formato == "xlsx":
+        return generar_xlsx(encabezados, filas, hoja)
+    return generar_csv(encabezados, filas)
+
+
+# ==========================================================
+# LECTURA
+# ==========================================================
+_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_NS_REL = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+
+
+class ErrorHoja(Exception):
+    """El archivo no se pudo leer como CSV/XLSX."""
+
+
+def _leer_csv(contenido):
+    for codificacion in ("utf-8-sig", "latin-1"):
+        try:
+            texto = contenido.decode(codificacion)
+            break
+        except UnicodeDecodeError:
+            continue
+    primera_linea = texto.split("\n", 1)[0]
+    delimitador = ";" if primera_linea.count(";") > primera_linea.count(",") else ","
+    return [fila for fila in csv.reader(io.StringIO(texto), delimiter=delimitador)]
+
+
+def _columna(referencia):
+    """'BC12' -> índice de columna 0-based (54)."""
+    indice = 0
+    for caracter in referencia:
+        if not caracter.isalpha():
+            break
+        indice = indice * 26 + (ord(caracter.upper()) - 64)
+    return indice - 1
+
+
+def _texto(elemento):
+    return "".join(t.text or "" for t in elemento.iter(f"{_NS}t"))
+
+
+def _leer_xlsx(contenido):
+    try:
+        libro = zipfile.ZipFile(io.BytesIO(contenido))
+    except zipfile.BadZipFile:
+        raise ErrorHoja("El archivo no es un XLSX válido")
+
+    compartidas = []
+    if "xl/sharedStrings.xml" in libro.namelist():
+        raiz = ElementTree.fromstring(libro.read("xl/sharedStrings.xml"))
+        compartidas = [_texto(si) for si in raiz.iter(f"{_NS}si")]
+
+    # Primera hoja según el orden del libro
+    ruta_hoja = "xl/worksheets/sheet1.xml"
+    try:
+        workbook = ElementTree.fromstring(libro.read("xl/workbook.xml"))
+        relaciones = ElementTree.fromstring(libro.read("xl/_rels/workbook.xml.rels"))
+        primera = next(workbook.iter(f"{_NS}sheet"))
+        destino = next(r.get("Target") for r in relaciones
+                       if r.get("Id") == primera.get(f"{_NS_REL}id"))
+        ruta_hoja = destino.lstrip("/") if destino.startswith("/") else f"xl/{destino}"
+    except (KeyError, StopIteration):
+        pass
+    if ruta_hoja not in libro.namelist():
+        raise ErrorHoja("El XLSX no contiene hojas")
+
+    filas = []
+    with libro.open(ruta_hoja) as hoja:
+        for _, elemento in ElementTree.iterparse(hoja):
+            if elemento.tag != f"{_NS}row":
+                continue
+            fila = []
+            for celda in elemento.iter(f"{_NS}c"):
+                referencia = celda.get("r")
+                if referencia:
+                    columna = _columna(referencia)
+                    fila.extend([""] * (columna - len(fila)))
+                tipo = celda.get("t")
+                valor = celda.find(f"{_NS}v")
+                if tipo == "s" and valor is not None:
+                    fila.append(compartidas[int(valor.text)])
+                elif tipo == "inlineStr":
+                    fila.append(_texto(celda))
+                else:
+                    fila.append(valor.text if valor is not None and valor.text is not None else "")
+            filas.append(fila)
+            elemento.clear()
+    return filas
+
+
+def leer_hoja(contenido, nombre_archivo):
+    """Filas (listas de texto) de un CSV o de la primera hoja de un XLSX."""
+    extension = nombre_archivo.rsplit(".", 1)[-1].lower() if "." in nombre_archivo else ""
+    if extension == "xlsx":
+        return _leer_xlsx(contenido)
+    if extension == "csv":
+        return _leer_csv(contenido)
+    raise ErrorHoja("Formato no soportado. Use .csv o .xlsx")
+
@@ -0,0 +1,200 @@
+# utils/idempotencia.py
+# Claves de idempotencia para los endpoints que modifican datos (POST/PUT/PATCH/DELETE).
+# Si el cliente envía la cabecera Idempotency-Key, la primera respuesta se guarda y
+# los reintentos con la misma clave la reciben tal cual, sin volver a ejecutar la
+# validación ni tocar las tablas de negocio. La clave es propia de cada llamante (sujeto
+# del JWT o, si no se puede leer, hash de la cabecera Authorization): un cliente nunca
+# recibe la respuesta guardada de otro. La reserva y el guardado usan conexiones cortas
+# que se cierran enseguida, sin retener una conexión extra durante el endpoint.
+import hashlib
+import json
+import os
+import random
+
+from flask import Response, g, jsonify, request
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+
+from database.db import conectar, asegurar_esquema
+
+CABECERA_CLAVE = "Idempotency-Key"
+CABECERA_REPETIDA = "Idempotent-Replayed"
+METODOS = {"POST", "PUT", "PATCH", "DELETE"}
+HORAS_VIGENCIA = int(os.getenv("IDEMPOTENCIA_TTL_HORAS", "24"))
+LONGITUD_MAXIMA_CLAVE = 255
+
+# Cabeceras de la respuesta original que se reproducen en los reintentos
+_CABECERAS_GUARDADAS = ("Content-Type", "Location", "Content-Disposition")
+
+ESQUEMA_IDEMPOTENCIA = """
+    CREATE TABLE IF NOT EXISTS idempotencia (
+        llamante VARCHAR(80) NOT NULL DEFAULT '',
+        clave VARCHAR(255) NOT NULL,
+        metodo VARCHAR(10) NOT NULL,
+        ruta VARCHAR(255) NOT NULL,
+        huella CHAR(64) NOT NULL,
+        estado VARCHAR(12) NOT NULL DEFAULT 'EN_PROCESO',
+        codigo INTEGER,
+        cabeceras JSONB,
+        cuerpo BYTEA,
+        fecha_creacion TIMESTAMP NOT NULL DEFAULT NOW(),
+        fecha_expiracion TIMESTAMP NOT NULL,
+        PRIMARY KEY (llamante, clave, metodo, ruta)
+    );
+
+    -- Tablas creadas antes de separar las claves por llamante
+    DO $$
+    BEGIN
+        IF NOT EXISTS (SELECT 1 FROM information_schema.columns
+                       WHERE table_name = 'idempotencia' AND column_name = 'llamante') THEN
+            DELETE FROM idempotencia;
+            ALTER TABLE idempotencia ADD COLUMN llamante VARCHAR(80) NOT NULL DEFAULT '';
+            ALTER TABLE idempotencia DROP CONSTRAINT idempotencia_pkey;
+            ALTER TABLE idempotencia ADD PRIMARY KEY (llamante, clave, metodo, ruta);
+        END IF;
+    END;
+    $$;
+    CREATE INDEX IF NOT EXISTS idx_idempotencia_expiracion ON idempotencia (fecha_expiracion);
+"""
+
+
+def _huella():
+    """Hash del método, la ruta, la query y el cuerpo: detecta reutilizar la clave con otros datos."""
+    contenido = hashlib.sha256()
+    contenido.update(request.method.encode())
+    contenido.update(request.full_path.encode())
+    contenido.update(request.get_data(cache=True))
+    return contenido.hexdigest()
+
+
+def _llamante():
+    """Identifica a quien llama: sujeto del JWT, hash del token o vacío si es anónimo."""
+    try:
+        verify_jwt_in_request(optional=True)
+        identidad = get_jwt_identity()
+        if identidad is not None:
+            return f"sub:{identidad}"[:80]
+    except Exception:
+        pass
+    autorizacion = request.headers.get("Authorization", "")
+    if autorizacion:
+        return "tok:" + hashlib.sha256(autorizacion.encode()).hexdigest()
+    return ""
+
+
+def _ejecutar(consulta, parametros):
+    """Ejecuta una sentencia en una conexión corta (autocommit) y la cierra."""
+    conn = conectar()
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cur:
+            cur.execute(consulta, parametros)
+    finally:
+        conn.close()
+
+
+def _reproducir(codigo, cabeceras, cuerpo):
+    respuesta = Response(bytes(cuerpo or b""), status=codigo)
+    for nombre, valor in (cabeceras or {}).items():
+        respuesta.headers[nombre] = valor
+    respuesta.headers[CABECERA_REPETIDA] = "true"
+    return respuesta
+
+
+def _reservar_clave():
+    clave = request.headers.get(CABECERA_CLAVE, "").strip()
+    if not clave or request.method not in METODOS:
+        return None
+    if len(clave) > LONGITUD_MAXIMA_CLAVE:
+        return jsonify({"error": f"{CABECERA_CLAVE} no puede superar {LONGITUD_MAXIMA_CLAVE} caracteres"}), 400
+
+    asegurar_esquema("idempotencia", ESQUEMA_IDEMPOTENCIA)
+    huella = _huella()
+    llave = (_llamante(), clave, request.method, request.path)
+    conn = conectar()
+    conn.autocommit = True
+    cur = conn.cursor()
+    try:
+        # Limpieza ocasional de claves vencidas (no hace falta en cada petición)
+        if random.random() < 0.01:
+            cur.execute("DELETE FROM idempotencia WHERE fecha_expiracion < NOW()")
+        else:
+            cur.execute("""
+                DELETE FROM idempotencia
+                WHERE llamante = %s AND clave = %s AND metodo = %s AND ruta = %s
+                  AND fecha_expiracion < NOW()
+            """, llave)
+
+        cur.execute("""
+            INSERT INTO idempotencia (llamante, clave, metodo, ruta, huella, fecha_expiracion)
+            VALUES (%s, %s, %s, %s, %s, NOW() + make_interval(hours => %s))
+            ON CONFLICT (llamante, clave, metodo, ruta) DO NOTHING
+        """, (*llave, huella, HORAS_VIGENCIA))
+        if cur.rowcount == 1:
+            g.idempotencia = {"llave": llave, "pendiente": True}
+            return None
+
+        cur.execute("""
+            SELECT huella, estado, codigo, cabeceras, cuerpo
+            FROM idempotencia
+            WHERE llamante = %s AND clave = %s AND metodo = %s AND ruta = %s
+        """, llave)
+        fila = cur.fetchone()
+    finally:
+        cur.close()
+        conn.close()
+
+    if fila is None:
+        # La fila expiró y se borró entre las dos consultas: el cliente puede reintentar
+        return jsonify({"error": "La solicitud original aún se está procesando"}), 409
+    huella_guardada, estado, codigo, cabeceras, cuerpo = fila
+    if huella_guardada != huella:
+        return jsonify({"error": f"La {CABECERA_CLAVE} ya se usó con otros datos"}), 422
+    if estado != "COMPLETADO":
+        respuesta = jsonify({"error": "La solicitud original aún se está procesando"})
+        respuesta.headers["Retry-After"] = "1"
+        return respuesta, 409
+    return _reproducir(codigo, cabeceras, cuerpo)
+
+
+def _guardar_respuesta(respuesta):
+    reserva = g.get("idempotencia")
+    if not reserva or not reserva["pendiente"]:
+        return respuesta
+
+    try:
+        # Los errores del servidor y las respuestas en streaming no se guardan: el reintento se ejecuta de nuevo
+        if respuesta.status_code >= 500 or respuesta.is_streamed:
+            _ejecutar("""
+                DELETE FROM idempotencia WHERE llamante = %s AND clave = %s AND metodo = %s AND ruta = %s
+            """, reserva["llave"])
+        else:
+            cabeceras = {nombre: respuesta.headers[nombre] for nombre in _CABECERAS_GUARDADAS
+                         if nombre in respuesta.headers}
+            _ejecutar("""
+                UPDATE idempotencia
+                SET estado = 'COMPLETADO', codigo = %s, cabeceras = %s, cuerpo = %s
+                WHERE llamante = %s AND clave = %s AND metodo = %s AND ruta = %s
+            """, (respuesta.status_code, json.dumps(cabeceras), respuesta.get_data(), *reserva["llave"]))
+        reserva["pendiente"] = False
+    except Exception as e:
+        print(f"❌ Error al guardar respuesta idempotente: {e}")
+    return respuesta
+
+
+def _liberar(exception):
+    reserva = g.pop("idempotencia", None)
+    if not reserva or not reserva["pendiente"]:
+        return
+    try:
+        # Si la petición terminó sin respuesta guardada, se libera la clave
+        _ejecutar("""
+            DELETE FROM idempotencia WHERE llamante = %s AND clave = %s AND metodo = %s AND ruta = %s
+        """, reserva["llave"])
+    except Exception as e:
+        print(f"❌ Error al liberar clave de idempotencia: {e}")
+
+
+def init_idempotencia(app):
+    app.before_request(_reservar_clave)
+    app.after_request(_guardar_respuesta)
+    app.teardown_request(_liberar)
@@ -0,0 +1,76 @@
+# utils/json_provider.py
+# Proveedor JSON de la app: usa orjson (en C) cuando está instalado y, si no, el json
+# de la biblioteca estándar con el mismo tratamiento de tipos. Fechas, horas y
+# datetime salen en ISO 8601 ("2025-03-10", "08:00:00", "2025-03-10T08:00:00") y los
+# Decimal como número, así que los endpoints pueden devolver las filas de psycopg2
+# tal cual, sin convertir columna por columna.
+import dataclasses
+import decimal
+import json
+import uuid
+from datetime import date, datetime, time, timedelta
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depende del entorno
+    orjson = None
+
+
+def _por_defecto(valor):
+    """Tipos que ninguno de los dos codificadores serializa por sí solo."""
+    if isinstance(valor, decimal.Decimal):
+        return float(valor)
+    if isinstance(valor, (datetime, date, time)):
+        return valor.isoformat()
+    if isinstance(valor, timedelta):
+        return str(valor)
+    if isinstance(valor, uuid.UUID):
+        return str(valor)
+    if isinstance(valor, (set, frozenset)):
+        return list(valor)
+    if isinstance(valor, (bytes, bytearray, memoryview)):
+        return bytes(valor).decode("utf-8", errors="replace")
+    if dataclasses.is_dataclass(valor) and not isinstance(valor, type):
+        return dataclasses.asdict(valor)
+    if hasattr(valor, "__html__"):
+        return str(valor.__html__())
+    raise TypeError(f"El objeto de tipo {type(valor).__name__} no es serializable a JSON")
+
+
+class ProveedorJSON(DefaultJSONProvider):
+    """Reemplaza al proveedor por defecto de Flask (mismo orden de claves)."""
+
+    def _opciones(self):
+        opciones = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            opciones |= orjson.OPT_SORT_KEYS
+        if self.compact is False or (self.compact is None and self._app.debug):
+            opciones |= orjson.OPT_INDENT_2
+        return opciones
+
+    def dumps(self, obj, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.dumps(obj, default=_por_defecto, option=self._opciones()).decode("utf-8")
+        kwargs.setdefault("default", _por_defecto)
+        kwargs.setdefault("ensure_ascii", self.ensure_ascii)
+        kwargs.setdefault("sort_keys", self.sort_keys)
+        return json.dumps(obj, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        if orjson is not None:
+            cuerpo = orjson.dumps(obj, default=_por_defecto, option=self._opciones())
+        else:
+            cuerpo = self.dumps(obj, **self._argumentos_stdlib())
+        return self._app.response_class(cuerpo, mimetype=self.mimetype)
+
+    def _argumentos_stdlib(self):
+        if self.compact is False or (self.compact is None and self._app.debug):
+            return {"indent": 2}
+        return {"separators": (",", ":")}
+
+
+def init_json(app):
+    app.json = ProveedorJSON(app)
@@ -0,0 +1,55 @@
+# utils/json_stream.py
+# Respuestas JSON enviadas por partes desde un cursor de servidor. Las filas se leen
+# por lotes (database.db.iterar_consulta) y cada lote se codifica y se envía de
+# inmediato: la memoria no depende del tamaño del listado y el primer byte sale sin
+# esperar a la última fila. Usa su propia conexión porque la del request se cierra
+# antes de que termine el envío.
+import json
+
+from flask import Response, current_app
+from psycopg2.extras import RealDictCursor
+
+from database.db import conectar, iterar_consulta
+
+TAMANO_LOTE = 1000
+
+
+def respuesta_json_stream(consulta, parametros=None, clave=None, extra=None,
+                          transformar=None, tamano_lote=TAMANO_LOTE):
+    """
+    Envía las filas (dicts) de la consulta como arreglo JSON, o como
+    {clave: [...], **extra} si se indica `clave`. La consulta se ejecuta antes de
+    devolver la respuesta, así que sus errores aún pueden responderse con 500.
+    """
+    conn = conectar()
+    try:
+        filas = iterar_consulta(conn, consulta, parametros, tamano_lote, cursor_factory=RealDictCursor)
+        primera = next(filas, None)
+    except Exception:
+        conn.close()
+        raise
+
+    codificar = current_app.json.dumps
+    if clave is None:
+        inicio, fin = "[", "]"
+    else:
+        inicio = "{" + json.dumps(clave) + ":["
+        fin = "]," + codificar(extra)[1:] if extra else "]}"
+
+    def generar():
+        try:
+            yield inicio
+            if primera is not None:
+                lote = [codificar(transformar(primera) if transformar else primera)]
+                for fila in filas:
+                    if len(lote) >= tamano_lote:
+                        yield ",".join(lote) + ","
+                        lote = []
+                    lote.append(codificar(transformar(fila) if transformar else fila))
+                yield ",".join(lote)
+            yield fin
+        finally:
+            filas.close()
+            conn.close()
+
+    return Response(generar(), mimetype="application/json")
@@ -0,0 +1,279 @@
+# utils/paginacion.py
+# Capa común para los listados: filtros y claves de orden permitidos (lista blanca),
+# paginación por cursor (keyset) y conteo total opcional.
+#
+# La consulta base de cada listado (sin ORDER BY) se envuelve como subconsulta:
+#     SELECT t.*, <claves> FROM (<base>) t WHERE <filtros> AND <después del cursor>
+#     ORDER BY <claves>, <llave> LIMIT n + 1
+# El cursor guarda los valores de orden de la última fila, así que pedir la página
+# siguiente no recorre las anteriores como haría un OFFSET. Los metadatos van en
+# cabeceras (X-Next-Cursor, Link, X-Total-Count) y el cuerpo conserva su forma.
+#
+# Parámetros de la petición: ?limite=50&cursor=...&ordenar=apellidos,-nombres&total=true
+# y los filtros que declare cada listado. Sin limite ni cursor se devuelven todas las
+# filas (compatibilidad con las pantallas actuales), igualmente filtradas y ordenadas;
+# en ese caso consulta_completa() permite enviarlas en streaming (utils/json_stream.py).
+import base64
+import json
+import re
+from urllib.parse import urlencode
+
+from database.db import conectar
+
+LIMITE_DEFECTO = 50
+LIMITE_MAXIMO = 500
+
+# Listados definidos (al importar las rutas); sus índices se crean al iniciar la app
+_listados = []
+
+
+class ErrorListado(Exception):
+    """Parámetros de listado inválidos (orden, filtro o cursor)."""
+
+
+def _verdadero(valor):
+    return str(valor).strip().lower() in ("1", "true", "si", "sí", "activo")
+
+
+class Listado:
+    """
+    Definición de un listado.
+      consulta: SELECT base sin ORDER BY (sus columnas se referencian como t.<alias>)
+      llave: columna única para desempatar (p. ej. "estudiante_id")
+      orden: {clave pública: expresión sobre t}; columnas simples o expresiones con un
+             índice de expresión igual en `indices`, para que el índice sirva el orden;
+             admiten NULL
+      orden_defecto: [(clave, "asc" | "desc"), ...]
+      filtros: {parámetro: (expresión sobre t, operador[, tipo])}; operador "=", "contiene",
+               "booleano", ">=" o "<="; tipo (p. ej. int) convierte el valor y, si no
+               se puede, responde ErrorListado en lugar de dejar fallar la consulta
+      indices: CREATE INDEX CONCURRENTLY IF NOT EXISTS ... que respaldan las claves de
+               orden / filtros (los crea crear_indices_listados al iniciar)
+    """
+
+    def __init__(self, nombre, consulta, llave, orden, orden_defecto, filtros=None, indices=()):
+        self.nombre = nombre
+        self.consulta = consulta
+        self.llave = llave
+        self.orden = orden
+        self.orden_defecto = orden_defecto
+        self.filtros = filtros or {}
+        self.indices = indices
+        _listados.append(self)
+
+    def _claves(self, ordenar):
+        if not ordenar:
+            return list(self.orden_defecto)
+        claves = []
+        for parte in ordenar.split(","):
+            parte = parte.strip()
+            direccion = "desc" if parte.startswith("-") else "asc"
+            clave = parte.lstrip("-+")
+            if clave not in self.orden:
+                raise ErrorListado(f"No se puede ordenar por '{clave}'. Opciones: {', '.join(self.orden)}")
+            claves.append((clave, direccion))
+        return claves
+
+    def _filtros(self, args):
+        condiciones, parametros = [], []
+        for nombre, (expresion, operador, *tipo) in self.filtros.items():
+            valor = args.get(nombre)
+            if valor is None or valor == "":
+                continue
+            if tipo:
+                try:
+                    valor = tipo[0](valor)
+                except (TypeError, ValueError):
+                    raise ErrorListado(f"Valor inválido para el filtro '{nombre}': {valor}")
+            if operador == "contiene":
+                texto = valor.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+                condiciones.append(f"{expresion} ILIKE %s")
+                parametros.append(f"%{texto}%")
+            elif operador == "booleano":
+                condiciones.append(f"{expresion} = %s")
+                parametros.append(_verdadero(valor))
+            elif operador in ("=", ">=", "<="):
+                condiciones.append(f"{expresion} {operador} %s")
+                parametros.append(valor)
+            else:
+                raise ErrorListado(f"Operador de filtro desconocido: {operador}")
+        return condiciones, parametros
+
+
+def _codificar_cursor(valores):
+    datos = json.dumps(valores, default=str, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(datos).decode("ascii").rstrip("=")
+
+
+def _decodificar_cursor(cursor, cantidad):
+    try:
+        relleno = "=" * (-len(cursor) % 4)
+        valores = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+    except (ValueError, TypeError):
+        raise ErrorListado("Cursor inválido")
+    if not isinstance(valores, list) or len(valores) != cantidad:
+        raise ErrorListado("El cursor no corresponde a este orden")
+    return valores
+
+
+def _despues_de(expresiones, direcciones, valores):
+    """
+    Condición lexicográfica (admite direcciones mixtas) para seguir después del cursor.
+    Respeta el orden de NULL de PostgreSQL: al final en ASC y al inicio en DESC.
+    """
+    alternativas, parametros = [], []
+    for i, (expresion, direccion, valor) in enumerate(zip(expresiones, direcciones, valores)):
+        partes, parametros_alternativa = [], []
+        for e, v in zip(expresiones[:i], valores[:i]):
+            if v is None:
+                partes.append(f"{e} IS NULL")
+            else:
+                partes.append(f"{e} = %s")
+                parametros_alternativa.append(v)
+        if direccion == "desc":
+            if valor is None:
+                partes.append(f"{expresion} IS NOT NULL")
+            else:
+                partes.append(f"{expresion} < %s")
+                parametros_alternativa.append(valor)
+        else:
+            if valor is None:
+                continue  # en ASC nada va después de NULL
+            partes.append(f"({expresion} > %s OR {expresion} IS NULL)")
+            parametros_alternativa.append(valor)
+        alternativas.append("(" + " AND ".join(partes) + ")")
+        parametros += parametros_alternativa
+    return "(" + (" OR ".join(alternativas) or "FALSE") + ")", parametros
+
+
+def _armar(listado, args):
+    """Expresiones y direcciones de orden (con la llave al final) y filtros de la petición."""
+    claves = listado._claves(args.get("ordenar"))
+    expresiones = [listado.orden[clave] for clave, _ in claves] + [f"t.{listado.llave}"]
+    direcciones = [direccion for _, direccion in claves] + [claves[-1][1] if claves else "asc"]
+    condiciones, parametros = listado._filtros(args)
+    return expresiones, direcciones, " AND ".join(condiciones) or "TRUE", parametros
+
+
+def crear_indices_listados():
+    """
+    Crea los índices de todos los listados con CREATE INDEX CONCURRENTLY (sin bloquear
+    escrituras). CONCURRENTLY no admite transacción: conexión en autocommit y una
+    sentencia a la vez. Un índice que quedó inválido por un intento fallido se borra y
+    se vuelve a crear (IF NOT EXISTS lo saltaría).
+    """
+    sentencias = list(dict.fromkeys(ddl for listado in _listados for ddl in listado.indices))
+    conn = conectar()
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cur:
+            for ddl in sentencias:
+                nombre = re.search(r"IF NOT EXISTS (\w+)", ddl).group(1)
+                try:
+                    cur.execute("""
+                        SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+                        WHERE c.relname = %s AND NOT i.indisvalid
+                    """, (nombre,))
+                    if cur.fetchone():
+                        cur.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {nombre}")
+                    cur.execute(ddl)
+                except Exception as e:
+                    print(f"⚠️ No se pudo crear el índice {nombre}: {e}")
+    finally:
+        conn.close()
+
+
+def init_listados(app):
+    """Crea al iniciar los índices de los listados (no en la primera petición)."""
+    try:
+        crear_indices_listados()
+        app.logger.info("Índices de listados verificados")
+    except Exception as e:
+        print(f"⚠️ No se pudieron crear los índices de listados: {e}")
+
+
+def _orden_sql(expresiones, direcciones):
+    return ", ".join(f"{e} {d.upper()}" for e, d in zip(expresiones, direcciones))
+
+
+def es_paginado(args):
+    """Si la petición pide página, cursor o total (si no, se puede enviar el listado completo)."""
+    return "limite" in args or "cursor" in args or _verdadero(args.get("total", "false"))
+
+
+def consulta_completa(listado, args, parametros_base=()):
+    """(sql, parámetros) del listado filtrado y ordenado, sin límite (para enviarlo en streaming)."""
+    expresiones, direcciones, donde_filtros, parametros = _armar(listado, args)
+    sql = f"""
+        SELECT t.*
+        FROM ({listado.consulta}) AS t
+        WHERE {donde_filtros}
+        ORDER BY {_orden_sql(expresiones, direcciones)}
+    """
+    return sql, (*parametros_base, *parametros)
+
+
+def paginar(cur, listado, args, parametros_base=()):
+    """
+    Ejecuta el listado con los parámetros de la petición. Devuelve (filas, meta) con
+    meta = {"siguiente": cursor o None, "total": int o None, "limite": int o None}.
+    `cur` debe ser un RealDictCursor.
+    """
+    expresiones, direcciones, donde_filtros, parametros = _armar(listado, args)
+    alias = [f"_orden_{i}" for i in range(len(expresiones))]
+
+    paginado = "limite" in args or "cursor" in args
+    limite = None
+    if paginado:
+        try:
+            limite = min(max(int(args.get("limite", LIMITE_DEFECTO)), 1), LIMITE_MAXIMO)
+        except ValueError:
+            raise ErrorListado("El límite debe ser numérico")
+
+    condicion_cursor, parametros_cursor = "TRUE", []
+    if args.get("cursor"):
+        valores = _decodificar_cursor(args["cursor"], len(expresiones))
+        condicion_cursor, parametros_cursor = _despues_de(expresiones, direcciones, valores)
+
+    columnas_orden = ", ".join(f"{e} AS {a}" for e, a in zip(expresiones, alias))
+    sql = f"""
+        SELECT t.*, {columnas_orden}
+        FROM ({listado.consulta}) AS t
+        WHERE {donde_filtros} AND {condicion_cursor}
+        ORDER BY {_orden_sql(expresiones, direcciones)}
+    """
+    if limite is not None:
+        sql += f" LIMIT {limite + 1}"
+    cur.execute(sql, (*parametros_base, *parametros, *parametros_cursor))
+    filas = cur.fetchall()
+
+    siguiente = None
+    if limite is not None and len(filas) > limite:
+        filas = filas[:limite]
+        siguiente = _codificar_cursor([filas[-1][a] for a in alias])
+    for fila in filas:
+        for a in alias:
+            fila.pop(a, None)
+
+    total = None
+    if _verdadero(args.get("total", "false")):
+        cur.execute(f"SELECT COUNT(*) AS total FROM ({listado.consulta}) AS t WHERE {donde_filtros}",
+                    (*parametros_base, *parametros))
+        total = cur.fetchone()["total"]
+
+    return filas, {"siguiente": siguiente, "total": total, "limite": limite}
+
+
+def aplicar_cabeceras(respuesta, meta, url_base=None, args=None):
+    """Agrega X-Next-Cursor / Link / X-Total-Count a la respuesta."""
+    if meta.get("siguiente"):
+        respuesta.headers["X-Next-Cursor"] = meta["siguiente"]
+        if url_base is not None:
+            consulta = {k: v for k, v in (args or {}).items() if k != "cursor"}
+            consulta["cursor"] = meta["siguiente"]
+            respuesta.headers["Link"] = f'<{url_base}?{urlencode(consulta)}>; rel="next"'
+    if meta.get("total") is not None:
+        respuesta.headers["X-Total-Count"] = str(meta["total"])
+    expuestas = "X-Next-Cursor, X-Total-Count, Link"
+    respuesta.headers["Access-Control-Expose-Headers"] = expuestas
+    return respuesta